@@ -10,12 +10,15 @@ from app.config.settings import SettingsDep
 from app.llm.provider.base_llm import BaseLLM
 from app.llm.provider.ollama import Ollama
 from app.llm.provider.openai import OpenAi
+from app.services.rag.reranker.base_reranker import BaseReranker
+
+
+CONFIG_PATH = Path(__file__).parent / "config.yaml"
 
 
 @lru_cache
 def _load_config() -> dict:
-    config_path = Path(__file__).parent / "config.yaml"
-    with open(config_path) as f:
+    with open(CONFIG_PATH) as f:
         return yaml.safe_load(f)
 
 
@@ -61,28 +64,82 @@ def get_llm_provider(
 
 def get_embedding_provider(
     settings: SettingsDep,
+    provider: Optional[str] = None,
+    model: Optional[str] = None,
 ) -> BaseEmbedding:
+    """
+    Build the embedding provider configured in config.yaml.
+
+    Args:
+        provider: Provider name overriding the configured one, e.g. for benchmarks
+        model: Model name or local directory overriding the configured one
+    """
     config = _load_config()
     embedding_config = config.get("embedding", {})
-    provider = embedding_config.get("provider")
-    model = embedding_config.get("default_model")
+    provider = provider or embedding_config.get("provider")
+    model = model or embedding_config.get("default_model")
+    output_dimension = embedding_config.get("output_dimension")
     
     if not provider:
         raise ValueError("Embedding provider not specified in config or parameter")
     if not model:
         raise ValueError("Embedding model not specified in config or parameter")
 
+    provider_config = embedding_config.get("providers", {}).get(provider, {})
+
     provider_lower = provider.lower()
     match provider_lower:
         case "sentence_transformer":
             return SentenceTransformerEmbedding(
                 settings=settings,
                 model_name=model,
+                output_dimension=output_dimension,
             )
         case "ollama":
             return OllamaEmbedding(
                 settings=settings,
                 model_name=model,
+                output_dimension=output_dimension,
             )
+        case "onnx":
+            # onnxruntime is only needed on nodes that use this backend
+            from app.embedding.provider.onnx import OnnxEmbedding
+
+            return OnnxEmbedding(
+                settings=settings,
+                model_name=model,
+                quantize=provider_config.get("quantize", True),
+                num_threads=provider_config.get("num_threads", 4),
+                thread_affinity=provider_config.get("thread_affinity"),
+                output_dimension=output_dimension,
+            )
+        case _:
+            raise ValueError(f"Unknown embedding provider '{provider}'")
+
+
+def get_reranker(
+    settings: SettingsDep,
+) -> Optional[BaseReranker]:
+    reranker_config = _load_config().get("reranker", {})
+    provider = reranker_config.get("provider")
+    if not provider:
+        return None
+
+    provider_config = reranker_config.get("providers", {}).get(provider, {})
+    match provider.lower():
+        case "cross_encoder":
+            # torch/transformers are only loaded when reranking is enabled
+            from app.services.rag.reranker.cross_encoder import CrossEncoderReranker
+
+            return CrossEncoderReranker(
+                model_name=reranker_config.get("default_model"),
+                batch_size=provider_config.get("batch_size", 16),
+                max_length=provider_config.get("max_length", 512),
+                cache_size=provider_config.get("cache_size", 10000),
+            )
+        case "rank_llm":
+            from app.services.rag.reranker.rank_llm import RankLlm
+
+            return RankLlm(top_n=provider_config.get("top_n", 10), settings=settings)
         case _:
-            raise ValueError(f"Unknown embedding provider '{provider}'")
\ No newline at end of file
+            raise ValueError(f"Unknown reranker provider '{provider}'")
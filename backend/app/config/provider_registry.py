@@ -0,0 +1,139 @@
+"""Process-wide registry of LLM, embedding and reranker providers."""
+
+import json
+import threading
+from typing import Annotated, Any, Callable, Dict, Optional
+
+from fastapi import Depends
+
+from app.config.app_config import (
+    CONFIG_PATH,
+    _load_config,
+    get_embedding_provider,
+    get_llm_provider,
+    get_reranker,
+)
+from app.config.logger import logger
+from app.config.settings import Settings, get_settings
+from app.embedding.provider.base_embedding import BaseEmbedding
+from app.llm.provider.base_llm import BaseLLM
+from app.services.rag.reranker.base_reranker import BaseReranker
+
+WARM_UP_QUERY = "warm-up"
+
+
+def _section_fingerprint(section: str) -> str:
+    return json.dumps(_load_config().get(section, {}), sort_keys=True, default=str)
+
+
+class ProviderRegistry:
+    """
+    Builds each configured provider once per process and hands out shared instances.
+
+    Providers are rebuilt only when their section of config.yaml changes, so a
+    config edit hot-swaps the affected provider on the next lookup while the
+    other one keeps its loaded state.
+    """
+
+    def __init__(self, settings: Settings):
+        self._settings = settings
+        self._lock = threading.RLock()
+        self._providers: Dict[str, Any] = {}
+        self._fingerprints: Dict[str, str] = {}
+        self._config_mtime: Optional[float] = None
+        self.generation = 0
+
+    def get_llm_provider(self) -> BaseLLM:
+        return self._get("llm", get_llm_provider)
+
+    def get_embedding_provider(self) -> BaseEmbedding:
+        return self._get("embedding", get_embedding_provider)
+
+    def get_reranker(self) -> Optional[BaseReranker]:
+        return self._get("reranker", get_reranker)
+
+    def reload_if_changed(self) -> bool:
+        """Drop the cached config if config.yaml changed on disk since the last check."""
+        try:
+            mtime = CONFIG_PATH.stat().st_mtime
+        except OSError as e:
+            logger.warning(f"Could not stat config file {CONFIG_PATH}: {e}")
+            return False
+
+        with self._lock:
+            if self._config_mtime is None:
+                self._config_mtime = mtime
+                return False
+            if mtime == self._config_mtime:
+                return False
+
+            self._config_mtime = mtime
+            _load_config.cache_clear()
+            logger.info("Configuration changed, providers will be rebuilt on next use")
+            return True
+
+    async def warm_up(self) -> None:
+        """Build all configured providers and run a first embedding so weights are loaded."""
+        self.get_llm_provider()
+        self.get_reranker()
+        embedding_provider = self.get_embedding_provider()
+        try:
+            await embedding_provider.embed_query(WARM_UP_QUERY)
+            # Probes the model once and rejects an output_dimension it can't provide
+            await embedding_provider.get_dimension()
+            logger.info("Embedding provider warmed up")
+        except ValueError:
+            raise
+        except Exception as e:
+            logger.warning(f"Embedding provider warm-up failed: {e}")
+
+    def _get(self, section: str, factory: Callable[[Settings], Any]) -> Any:
+        self.reload_if_changed()
+        with self._lock:
+            fingerprint = _section_fingerprint(section)
+            # A disabled provider is cached as None
+            if section in self._providers and self._fingerprints.get(section) == fingerprint:
+                return self._providers[section]
+
+            action = "Rebuilding" if section in self._providers else "Building"
+            logger.info(f"{action} {section} provider")
+            provider = factory(self._settings)
+
+            self._providers[section] = provider
+            self._fingerprints[section] = fingerprint
+            self.generation += 1
+            return provider
+
+
+_registry_instance: ProviderRegistry | None = None
+_registry_lock = threading.Lock()
+
+
+def get_provider_registry() -> ProviderRegistry:
+    """Get the provider registry instance (singleton pattern)."""
+    global _registry_instance
+    if _registry_instance is None:
+        with _registry_lock:
+            if _registry_instance is None:
+                _registry_instance = ProviderRegistry(get_settings())
+    return _registry_instance
+
+
+def get_shared_llm_provider() -> BaseLLM:
+    """Dependency for getting the process-wide LLM provider."""
+    return get_provider_registry().get_llm_provider()
+
+
+def get_shared_embedding_provider() -> BaseEmbedding:
+    """Dependency for getting the process-wide embedding provider."""
+    return get_provider_registry().get_embedding_provider()
+
+
+def get_shared_reranker() -> Optional[BaseReranker]:
+    """Dependency for getting the process-wide reranker, None if reranking is disabled."""
+    return get_provider_registry().get_reranker()
+
+
+LlmProviderDep = Annotated[BaseLLM, Depends(get_shared_llm_provider)]
+EmbeddingProviderDep = Annotated[BaseEmbedding, Depends(get_shared_embedding_provider)]
+RerankerDep = Annotated[Optional[BaseReranker], Depends(get_shared_reranker)]
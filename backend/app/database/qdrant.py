@@ -1,13 +1,14 @@
 """Qdrant vector database connection management."""
 
 from typing import Annotated, Generator
-from qdrant_client import QdrantClient
+from qdrant_client import AsyncQdrantClient, QdrantClient
 from fastapi import Depends
 
 from app.config.settings import get_settings
 from app.config.logger import logger
 
 _qdrant_client: QdrantClient | None = None
+_async_qdrant_client: AsyncQdrantClient | None = None
 
 
 def get_qdrant_client() -> QdrantClient:
@@ -42,6 +43,31 @@ def close_qdrant_client() -> None:
             _qdrant_client = None
 
 
+def get_async_qdrant_client() -> AsyncQdrantClient:
+    """Get or create the shared async Qdrant client instance (singleton pattern)."""
+    global _async_qdrant_client
+    if _async_qdrant_client is None:
+        settings = get_settings()
+        _async_qdrant_client = AsyncQdrantClient(
+            url=settings.QDRANT_URI,
+            api_key=settings.QDRANT_API_KEY,
+        )
+    return _async_qdrant_client
+
+
+async def close_async_qdrant_client() -> None:
+    """Close the shared async Qdrant client connection."""
+    global _async_qdrant_client
+    if _async_qdrant_client is not None:
+        try:
+            await _async_qdrant_client.close()
+            logger.info("Async Qdrant connection closed")
+        except Exception as e:
+            logger.error(f"Error closing async Qdrant connection: {e}")
+        finally:
+            _async_qdrant_client = None
+
+
 def get_qdrant_session() -> Generator[QdrantClient, None, None]:
     """Dependency for getting Qdrant client session."""
     client = get_qdrant_client()
@@ -52,4 +78,5 @@ def get_qdrant_session() -> Generator[QdrantClient, None, None]:
         pass
 
 
-QdrantClientDep = Annotated[QdrantClient, Depends(get_qdrant_session)]
\ No newline at end of file
+QdrantClientDep = Annotated[QdrantClient, Depends(get_qdrant_session)]
+AsyncQdrantClientDep = Annotated[AsyncQdrantClient, Depends(get_async_qdrant_client)]
@@ -1,30 +1,91 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
 
+import numpy as np
 from attr import dataclass
 
 from app.config.settings import SettingsDep
+from app.embedding.utils import truncate_embeddings
+
+DIMENSION_PROBE_TEXT = "dimension probe"
 
 
 
 class BaseEmbedding(ABC):
     """Abstract base class for LLM implementations (OpenAI, Ollama, etc.)"""
 
-    def __init__(self, settings: SettingsDep, model_name: str):
+    def __init__(
+        self,
+        settings: SettingsDep,
+        model_name: str,
+        output_dimension: Optional[int] = None,
+    ):
         """
         Initialize the LLM with settings and model name.
 
         Args:
             settings: Application settings containing API keys and configuration
             model_name: Name of the model to use
+            output_dimension: Optional Matryoshka truncation of the model's embeddings
         """
         self._settings = settings
         self._model_name = model_name
+        self._output_dimension = output_dimension
+        self._dimension: Optional[int] = None
+        # Model calls block; one thread keeps them off the event loop and never runs a
+        # model concurrently with itself (EmbeddingModel keeps per-call state)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedding")
+
+    async def _run_model(self, function: Callable[..., np.ndarray], *args) -> np.ndarray:
+        """
+        Run a blocking model call on the provider's thread.
+
+        Args:
+            function: The model call, e.g. the model's encode
+            args: Its arguments
+
+        Returns:
+            The call's result
+        """
+        return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
 
     @abstractmethod
+    async def _embed_documents(
+        self, texts: List[str]
+    ) -> np.ndarray:
+        """
+        Embed a batch of texts with the underlying model.
+
+        Args:
+            texts: The texts to embed
+
+        Returns:
+            A contiguous float32 matrix with one full-size embedding per row
+        """
+        pass
+
+    async def embed_documents(
+        self, texts: List[str]
+    ) -> np.ndarray:
+        """
+        Embed a batch of texts.
+
+        Args:
+            texts: The texts to embed
+
+        Returns:
+            A contiguous float32 matrix with one embedding per row
+        """
+        embeddings = await self._embed_documents(texts)
+        if self._output_dimension:
+            embeddings = truncate_embeddings(embeddings, self._output_dimension)
+        return embeddings
+
     async def embed_query(
         self, query: str
-    ) -> List[float]:
+    ) -> np.ndarray:
         """
         Embed a query.
 
@@ -32,9 +93,34 @@ class BaseEmbedding(ABC):
             query: The query to embed
 
         Returns:
-            The embedding of the query
+            The embedding of the query as a float32 vector (a view into the batch result)
         """
-        pass
-    
+        embeddings = await self.embed_documents([query])
+        return embeddings[0]
+
+    async def get_dimension(self) -> int:
+        """
+        Get the dimension of the vectors returned by this provider.
+
+        The model is probed once with a short text, so this also works for
+        remote providers that don't expose their output size. The configured
+        output_dimension is validated against the model's size here.
+
+        Returns:
+            The embedding dimension
+
+        Raises:
+            ValueError: If output_dimension is larger than the model's embeddings
+        """
+        if self._dimension is None:
+            probe = await self._embed_documents([DIMENSION_PROBE_TEXT])
+            native_dimension = int(probe.shape[-1])
+            if self._output_dimension and self._output_dimension > native_dimension:
+                raise ValueError(
+                    f"output_dimension {self._output_dimension} is larger than the "
+                    f"{native_dimension}-d embeddings of {self._model_name}"
+                )
+            self._dimension = min(self._output_dimension or native_dimension, native_dimension)
+        return self._dimension
 
 
@@ -1,15 +1,20 @@
-from typing import List
+from typing import List, Optional
+import numpy as np
 import ollama
 from app.config.settings import SettingsDep
 from app.embedding.provider.base_embedding import BaseEmbedding
 
 
 class OllamaEmbedding(BaseEmbedding):
-    def __init__(self, settings: SettingsDep, model_name: str):
-        super().__init__(settings, model_name)
-
-    async def embed_query(self, query: str) -> List[float]:
-        response = ollama.embed(model=self._model_name, input=query)
-        embeddings = response.embeddings
-        
-        return list(embeddings[0])
\ No newline at end of file
+    def __init__(
+        self,
+        settings: SettingsDep,
+        model_name: str,
+        output_dimension: Optional[int] = None,
+    ):
+        super().__init__(settings, model_name, output_dimension)
+
+    async def _embed_documents(self, texts: List[str]) -> np.ndarray:
+        response = await self._run_model(lambda: ollama.embed(model=self._model_name, input=texts))
+
+        return np.asarray(response.embeddings, dtype=np.float32)
@@ -0,0 +1,181 @@
+from typing import List, Optional
+import os
+
+import numpy as np
+from transformers import AutoTokenizer
+
+try:
+    import onnxruntime as ort
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+except ImportError as e:
+    raise ImportError(
+        "The onnx embedding provider needs onnx and onnxruntime, "
+        "install them with `uv sync --extra onnx`"
+    ) from e
+
+from app.config.settings import SettingsDep
+from app.config.logger import logger
+from app.embedding.provider.base_embedding import BaseEmbedding
+from app.embedding.utils import download_embedding_model, load_file
+
+ONNX_DIR = "onnx"
+FP32_MODEL_FILE = "model.onnx"
+INT8_MODEL_FILE = "model_int8.onnx"
+ONNX_OPSET_VERSION = 17
+DEFAULT_NUM_THREADS = 4
+
+
+def export_onnx_model(model_name: str, output_path: str) -> None:
+    """Export the transformer of a sentence-transformer model to ONNX."""
+    import torch
+    from app.embedding.provider.sentence_transformer import EmbeddingModel
+
+    model = EmbeddingModel(model_name)
+    dummy = model.tokenizer(["export"], return_tensors="pt")
+
+    class _TokenEmbeddings(torch.nn.Module):
+        def __init__(self, auto_model):
+            super().__init__()
+            self.auto_model = auto_model
+
+        def forward(self, input_ids, attention_mask):
+            return self.auto_model(
+                input_ids=input_ids, attention_mask=attention_mask, return_dict=False
+            )[0]
+
+    wrapper = _TokenEmbeddings(model.auto_model.to("cpu")).eval()
+    with torch.inference_mode():
+        torch.onnx.export(
+            wrapper,
+            (dummy["input_ids"], dummy["attention_mask"]),
+            output_path,
+            input_names=["input_ids", "attention_mask"],
+            output_names=["token_embeddings"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "token_embeddings": {0: "batch", 1: "sequence"},
+            },
+            opset_version=ONNX_OPSET_VERSION,
+            # The TorchScript exporter, the dynamo one also needs onnxscript
+            dynamo=False,
+        )
+
+
+def ensure_onnx_model(model_name: str, model_path: str, quantize: bool = True) -> str:
+    """Return the path of the (optionally int8-quantized) ONNX model, exporting it once."""
+    onnx_dir = os.path.join(model_path, ONNX_DIR)
+    os.makedirs(onnx_dir, exist_ok=True)
+
+    fp32_path = os.path.join(onnx_dir, FP32_MODEL_FILE)
+    if not os.path.exists(fp32_path):
+        logger.info(f"Exporting {model_name} to ONNX")
+        export_onnx_model(model_name, fp32_path)
+
+    if not quantize:
+        return fp32_path
+
+    int8_path = os.path.join(onnx_dir, INT8_MODEL_FILE)
+    if not os.path.exists(int8_path):
+        logger.info(f"Quantizing {fp32_path} to int8")
+        quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8, per_channel=True)
+    return int8_path
+
+
+def create_session_options(
+    num_threads: int, thread_affinity: Optional[List[int]] = None
+) -> ort.SessionOptions:
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+    options.intra_op_num_threads = num_threads
+    options.inter_op_num_threads = 1
+    # Don't busy-wait between batches, the worker shares its cores with other jobs
+    options.add_session_config_entry("session.intra_op.allow_spinning", "0")
+
+    if thread_affinity:
+        # onnxruntime expects one entry per intra-op thread except the calling thread,
+        # with 1-based logical processor ids
+        cores = thread_affinity[: max(num_threads - 1, 0)]
+        if cores:
+            options.add_session_config_entry(
+                "session.intra_op_thread_affinities",
+                ";".join(str(core + 1) for core in cores),
+            )
+    return options
+
+
+class OnnxEmbeddingModel:
+    """Int8 ONNX Runtime counterpart of EmbeddingModel with the same pooling and normalization."""
+
+    def __init__(
+        self,
+        model_name: str,
+        quantize: bool = True,
+        num_threads: int = DEFAULT_NUM_THREADS,
+        thread_affinity: Optional[List[int]] = None,
+    ):
+        self.model_name = model_name
+        self.model_path = download_embedding_model(model_name)
+        self.max_seq_length = load_file(
+            os.path.join(self.model_path, "sentence_bert_config.json")
+        )["max_seq_length"]
+        self.tokenizer = AutoTokenizer.from_pretrained(self.model_path, use_fast=True)
+
+        onnx_path = ensure_onnx_model(model_name, self.model_path, quantize)
+        self.session = ort.InferenceSession(
+            onnx_path,
+            sess_options=create_session_options(num_threads, thread_affinity),
+            providers=["CPUExecutionProvider"],
+        )
+
+    def encode(self, input_texts, batch_size=32):
+        tokenized = self.tokenizer(
+            input_texts,
+            padding=True,
+            truncation="longest_first",
+            return_tensors="np",
+            max_length=self.max_seq_length,
+        )
+
+        input_ids = tokenized["input_ids"].astype(np.int64)
+        attention_mask = tokenized["attention_mask"].astype(np.int64)
+
+        all_embeddings = []
+        for start_idx in range(0, input_ids.shape[0], batch_size):
+            end_idx = start_idx + batch_size
+            (token_embeddings,) = self.session.run(
+                ["token_embeddings"],
+                {
+                    "input_ids": input_ids[start_idx:end_idx],
+                    "attention_mask": attention_mask[start_idx:end_idx],
+                },
+            )
+            # CLS pooling followed by L2 normalization, as in EmbeddingModel
+            cls_embeddings = token_embeddings[:, 0]
+            norms = np.linalg.norm(cls_embeddings, axis=1, keepdims=True)
+            all_embeddings.append(cls_embeddings / np.maximum(norms, 1e-12))
+
+        return np.ascontiguousarray(np.concatenate(all_embeddings, axis=0), dtype=np.float32)
+
+
+class OnnxEmbedding(BaseEmbedding):
+    def __init__(
+        self,
+        settings: SettingsDep,
+        model_name: str,
+        quantize: bool = True,
+        num_threads: int = DEFAULT_NUM_THREADS,
+        thread_affinity: Optional[List[int]] = None,
+        output_dimension: Optional[int] = None,
+    ):
+        super().__init__(settings, model_name, output_dimension)
+        self.model = OnnxEmbeddingModel(
+            model_name,
+            quantize=quantize,
+            num_threads=num_threads,
+            thread_affinity=thread_affinity,
+        )
+
+    async def _embed_documents(self, texts: List[str]) -> np.ndarray:
+        return await self._run_model(self.model.encode, texts)
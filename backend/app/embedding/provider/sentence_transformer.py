@@ -1,4 +1,5 @@
-from typing import List
+from typing import List, Optional
+import numpy as np
 from app.config.settings import SettingsDep
 from app.embedding.provider.base_embedding import BaseEmbedding
 import os
@@ -114,13 +115,19 @@ class EmbeddingModel(nn.Module):
                 all_embeddings.append(batch_embeddings)
 
         all_embeddings = torch.cat(all_embeddings, dim=0)
-        return all_embeddings.tolist()
+        # Shares memory with the tensor instead of boxing every value into a Python float
+        return all_embeddings.float().numpy()
 
 
 class SentenceTransformerEmbedding(BaseEmbedding):
-    def __init__(self, settings: SettingsDep, model_name: str):
-        super().__init__(settings, model_name)
+    def __init__(
+        self,
+        settings: SettingsDep,
+        model_name: str,
+        output_dimension: Optional[int] = None,
+    ):
+        super().__init__(settings, model_name, output_dimension)
         self.model = EmbeddingModel(model_name)
 
-    async def embed_query(self, query: str) -> List[float]:
-        return self.model.encode(query)
+    async def _embed_documents(self, texts: List[str]) -> np.ndarray:
+        return await self._run_model(self.model.encode, texts)
@@ -1,9 +1,14 @@
 import json
 import os
+import numpy as np
 from huggingface_hub import hf_hub_download, snapshot_download
 
 def download_embedding_model(repo_id: str):
 
+    # A local model directory is used as-is, so offline runs never touch the Hub
+    if os.path.isfile(os.path.join(repo_id, "modules.json")):
+        return os.path.abspath(repo_id)
+
     model_dir = os.path.abspath(os.path.join("models", repo_id.replace("/", "-")))
 
     # windows specific to fix too long path error
@@ -34,4 +39,18 @@ def download_embedding_model(repo_id: str):
 
 def load_file(path):
     with open(path) as fIn:
-        return json.load(fIn)
\ No newline at end of file
+        return json.load(fIn)
+
+
+def truncate_embeddings(embeddings: np.ndarray, dimension: int) -> np.ndarray:
+    """
+    Truncate Matryoshka embeddings to their first `dimension` values and L2-renormalize.
+
+    Embeddings that aren't longer than `dimension` are returned unchanged.
+    """
+    if dimension >= embeddings.shape[-1]:
+        return embeddings
+
+    truncated = embeddings[..., :dimension]
+    norms = np.linalg.norm(truncated, axis=-1, keepdims=True)
+    return np.ascontiguousarray(truncated / np.maximum(norms, 1e-12), dtype=np.float32)
@@ -15,7 +15,8 @@ from app.routes.agent_traces import router as agent_traces_router
 from app.config.settings import get_settings
 from app.config.logger import logger
 from app.database.mongo import get_mongo_client, close_mongo_client
-from app.database.qdrant import get_qdrant_client, close_qdrant_client
+from app.database.qdrant import get_qdrant_client, close_qdrant_client, close_async_qdrant_client
+from app.config.provider_registry import get_provider_registry
 
 
 @asynccontextmanager
@@ -27,6 +28,9 @@ async def lifespan(app: FastAPI):
     # Initialize database connections
     get_mongo_client()
     get_qdrant_client()
+
+    # Load embedding/LLM providers once so the first request doesn't pay for it
+    await get_provider_registry().warm_up()
     
     logger.info("Application started successfully")
     yield
@@ -35,6 +39,7 @@ async def lifespan(app: FastAPI):
     logger.info("Shutting down application...")
     close_mongo_client()
     close_qdrant_client()
+    await close_async_qdrant_client()
     logger.info("Application shut down successfully")
 
 
@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from typing import Any, Optional
 import uuid
 from pydantic import BaseModel
 
@@ -13,3 +14,5 @@ class Document(BaseModel):
 class ProcessedDocument:
     document: Document
     content: str
+    # DoclingDocument the content was exported from, None when loaded from storage
+    structure: Optional[Any] = None
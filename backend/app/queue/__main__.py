@@ -0,0 +1,12 @@
+"""
+Run the tender worker: python -m app.queue
+
+Spawned pool processes (document splitting and conversion) re-import the
+parent's main module, except a package's __main__ like this one. Started
+from here they import only their pool module, not the worker and the app's
+providers.
+"""
+
+from app.queue.tender_worker import main
+
+main()
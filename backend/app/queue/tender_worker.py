@@ -1,8 +1,7 @@
-from app.config.app_config import get_embedding_provider
 from app.repos.requirements_repo import RequirementsRepo
 from app.services.requirements_extraction_service import RequirementExtractionService
 from app.models.tender import TenderUpdate
-from app.config.app_config import get_llm_provider
+from app.config.provider_registry import get_provider_registry
 from app.services.data_extraction.data_extraction_service import DataExtractionService
 from app.services.data_extraction.agentic import AgenticDataExtractionService
 from app.services.data_extraction.queries import BASE_INFORMATION_QUERIES, EXCLUSION_CRITERIA_QUERIES
@@ -32,9 +31,13 @@ from app.queue.tender_queue import (
 from app.repos.tender_repo import TenderRepo
 from app.services.external.minio_service import MinioService
 from app.database.mongo import get_mongo_client
-from app.database.qdrant import get_qdrant_client
+from app.database.qdrant import get_async_qdrant_client
 from app.repos.document_repo import DocumentRepo
-from app.services.document_processing.document_processing_service import process_documents
+from app.repos.index_manifest_repo import IndexManifestRepo
+from app.services.document_processing.document_processing_service import (
+    get_document_conversion_pool,
+    process_documents,
+)
 from app.services.rag.rag_service import RagService
 
 
@@ -42,17 +45,26 @@ class WorkerContext:
     def __init__(self):
         self.settings = get_settings()
         self.mongo_client = get_mongo_client()
-        self.qdrant_client = get_qdrant_client()
+        self.qdrant_client = get_async_qdrant_client()
         self.minio_service = MinioService(self.settings)
         
         self.tender_repo = TenderRepo(self.mongo_client)
         self.document_repo = DocumentRepo(self.mongo_client)
         self.requirements_repo = RequirementsRepo(self.mongo_client)
 
-        self.llm_provider = get_llm_provider(self.settings)
-        self.embedding_provider = get_embedding_provider(self.settings)
-
-        self.rag_service = RagService(self.settings, self.embedding_provider)
+        registry = get_provider_registry()
+        self.llm_provider = registry.get_llm_provider()
+        self.embedding_provider = registry.get_embedding_provider()
+        self.reranker = registry.get_reranker()
+        self.provider_generation = registry.generation
+
+        self.rag_service = RagService(
+            self.settings,
+            self.embedding_provider,
+            self.qdrant_client,
+            IndexManifestRepo(self.mongo_client),
+            reranker=self.reranker,
+        )
         self.data_extraction_service = DataExtractionService(self.settings, self.llm_provider, self.rag_service)
         self.requirement_service = RequirementExtractionService(self.settings, self.llm_provider)
        
@@ -63,7 +75,13 @@ ctx: WorkerContext | None = None
 
 def get_ctx() -> WorkerContext:
     global ctx
-    if ctx is None:
+    registry = get_provider_registry()
+    if ctx is not None:
+        # Trigger a provider rebuild if config.yaml changed; services are then recreated
+        registry.get_llm_provider()
+        registry.get_embedding_provider()
+        registry.get_reranker()
+    if ctx is None or ctx.provider_generation != registry.generation:
         ctx = WorkerContext()
     return ctx
 
@@ -79,7 +97,7 @@ async def run_index_documents(job: dict) -> None:
     )
     if tender and documents:
         logger.info(f"Indexing documents for tender {tender.id}")
-        processed_documents = process_documents(tender.id, context.minio_service, documents)
+        processed_documents = await process_documents(tender.id, context.minio_service, documents)
         for document in processed_documents:
             context.minio_service.upload_processed_file(tender.id, str(document.document.id), document.content)
 
@@ -145,6 +163,7 @@ async def run_extract_base_information_agentic(job: dict) -> None:
     )
     
     # Extract all fields using the agentic service
+    await agentic_service.prefetch_initial_chunks(BASE_INFORMATION_QUERIES)
     results = {}
     for field_name, query in BASE_INFORMATION_QUERIES.items():
         logger.info(f"Extracting {field_name} using agentic service")
@@ -236,6 +255,9 @@ async def worker_loop(concurrency: int = DEFAULT_WORKER_CONCURRENCY, poll_interv
     logger.info(f"Starting worker {worker_id} with concurrency={concurrency}")
 
     ensure_indexes()
+    await get_provider_registry().warm_up()
+    # Converter processes load the Docling models while the worker polls for jobs
+    get_document_conversion_pool()
 
     sem = asyncio.Semaphore(concurrency)
 
@@ -257,6 +279,12 @@ async def worker_loop(concurrency: int = DEFAULT_WORKER_CONCURRENCY, poll_interv
         asyncio.create_task(handle_job(job))
 
 
-if __name__ == "__main__":
+def main() -> None:
     concurrency = int(os.getenv("TENDER_WORKER_CONCURRENCY", str(DEFAULT_WORKER_CONCURRENCY)))
     asyncio.run(worker_loop(concurrency=concurrency))
+
+
+if __name__ == "__main__":
+    # Spawned pool processes re-import the main module, here with the whole app
+    logger.warning("Run the worker with `python -m app.queue`, pool processes re-import this module")
+    main()
@@ -0,0 +1,69 @@
+from typing import List, Optional, Set
+from pymongo import MongoClient, ReturnDocument
+from datetime import datetime, timezone
+import uuid
+
+from app.config.logger import logger
+
+
+class IndexManifestRepo:
+    """Per-tender record of the chunk point IDs stored in the vector index."""
+
+    def __init__(self, client: MongoClient):
+        self.collection = client["skillMatch"]["index_manifests"]
+        self._ensure_indexes()
+
+    def _ensure_indexes(self) -> None:
+        """Create indexes for frequently queried fields."""
+        self.collection.create_index("tender_id", unique=True, name="manifest_tender_id_idx")
+
+    def get_point_ids(self, tender_id: uuid.UUID) -> Optional[Set[str]]:
+        """Get the indexed point IDs of a tender, or None if the tender has no manifest."""
+        doc = self.collection.find_one({"tender_id": str(tender_id)}, {"point_ids": 1})
+        if doc is None or "point_ids" not in doc:
+            return None
+        return set(doc["point_ids"])
+
+    def get_version(self, tender_id: uuid.UUID) -> int:
+        """Get the index version of a tender, 0 if it was never indexed."""
+        doc = self.collection.find_one({"tender_id": str(tender_id)}, {"version": 1})
+        if doc is None:
+            return 0
+        return doc.get("version", 0)
+
+    def save_point_ids(self, tender_id: uuid.UUID, point_ids: List[str]) -> int:
+        """Replace the indexed point IDs of a tender and return the new index version."""
+        doc = self.collection.find_one_and_update(
+            {"tender_id": str(tender_id)},
+            {
+                "$set": {
+                    "point_ids": sorted(point_ids),
+                    "updated_at": datetime.now(timezone.utc),
+                },
+                "$inc": {"version": 1},
+            },
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        return doc.get("version", 0)
+
+    def delete_manifest(self, tender_id: uuid.UUID) -> bool:
+        """
+        Forget the indexed point IDs of a tender, e.g. when its collection was re-created.
+
+        The index version is bumped instead of deleted, so cached retrievals of
+        the old index are never served again.
+        """
+        try:
+            result = self.collection.update_one(
+                {"tender_id": str(tender_id)},
+                {
+                    "$unset": {"point_ids": ""},
+                    "$set": {"updated_at": datetime.now(timezone.utc)},
+                    "$inc": {"version": 1},
+                },
+            )
+            return result.modified_count > 0
+        except Exception as e:
+            logger.error(f"Error deleting index manifest for tender {tender_id}: {e}")
+            return False
@@ -9,10 +9,12 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from pymongo import MongoClient
 
 from app.database.mongo import MongoClientDep
-from app.database.qdrant import QdrantClientDep
+from app.database.qdrant import AsyncQdrantClientDep
 from app.config.settings import SettingsDep, get_settings
 from app.config.logger import logger
 from app.exceptions import create_not_found_exception
+from app.services.data_extraction.agentic.chunks import parse_chunk_id
+from app.services.rag.tender_collections import TENDER_ID_FIELD, get_tender_collections
 
 router = APIRouter(
     prefix="/agent-traces",
@@ -132,36 +134,34 @@ async def get_agent_trace(
 async def get_chunk_by_id(
     tender_id: uuid.UUID,
     chunk_id: str,
-    qdrant_client: QdrantClientDep,
+    qdrant_client: AsyncQdrantClientDep,
 ) -> Dict[str, Any]:
     """
     Get a chunk by its ID.
     
     Args:
         tender_id: UUID of the tender
-        chunk_id: ID of the chunk (format: chunk_123)
+        chunk_id: ID of the chunk (format: chunk_<point id>)
         qdrant_client: Qdrant client
         
     Returns:
         Chunk data including content and metadata
     """
     try:
-        collection_name = str(tender_id)
+        collections = get_tender_collections()
+        collection_name = collections.collection_name(tender_id)
         
-        # Extract numeric ID from chunk_id
         try:
-            numeric_id = int(chunk_id.replace("chunk_", ""))
+            point_id = parse_chunk_id(chunk_id)
         except ValueError:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Invalid chunk_id format: {chunk_id}"
             )
         
-        # Retrieve point from Qdrant (sync call in async context)
-        points = await asyncio.to_thread(
-            qdrant_client.retrieve,
+        points = await qdrant_client.retrieve(
             collection_name=collection_name,
-            ids=[numeric_id],
+            ids=[point_id],
         )
         
         if not points or len(points) == 0:
@@ -171,6 +171,13 @@ async def get_chunk_by_id(
             )
         
         point = points[0]
+        # In the shared collection the ID alone could address another tender's chunk
+        if collections.shared and point.payload and point.payload.get(TENDER_ID_FIELD) != str(tender_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Chunk {chunk_id} not found"
+            )
+
         if not point.payload:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
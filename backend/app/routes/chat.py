@@ -25,10 +25,11 @@ from app.repos.shared import get_chat_repo, get_tender_repo
 from app.repos.chat_repo import ChatRepo
 from app.repos.tender_repo import TenderRepo
 from app.config.logger import logger
-from app.config.app_config import get_llm_provider, get_embedding_provider
+from app.config.provider_registry import LlmProviderDep
 from app.config.settings import SettingsDep, get_settings
 from app.services.rag.rag_service import RagService
 from app.services.chat_service import ChatService
+from app.services.shared import get_rag_service
 from app.exceptions import create_not_found_exception
 
 router = APIRouter(
@@ -40,12 +41,11 @@ router = APIRouter(
 
 def get_chat_service(
     settings: SettingsDep,
+    llm_provider: LlmProviderDep,
+    rag_service: RagService = Depends(get_rag_service),
     chat_repo: ChatRepo = Depends(get_chat_repo),
     tender_repo: TenderRepo = Depends(get_tender_repo),
 ) -> ChatService:
-    llm_provider = get_llm_provider(settings)
-    embedding_provider = get_embedding_provider(settings)
-    rag_service = RagService(settings, embedding_provider)
     return ChatService(settings, llm_provider, rag_service, chat_repo, tender_repo)
 
 
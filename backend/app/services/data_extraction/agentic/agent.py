@@ -12,19 +12,26 @@ from typing import List, Dict, Optional, Any, Callable
 import uuid
 
 import ollama
-from qdrant_client import QdrantClient
+from qdrant_client import AsyncQdrantClient
 from pymongo import MongoClient
 
+from app.config.app_config import _load_config
 from app.config.settings import SettingsDep
 from app.config.logger import logger
 from app.embedding.provider.base_embedding import BaseEmbedding
 from app.services.data_extraction.queries import Query
 from app.services.data_extraction.agentic.types import EmbeddedChunk
 from app.services.data_extraction.agentic.chunks import ChunkRetriever, ChunkFormatter
+from app.services.data_extraction.agentic.vector_snapshot import DEFAULT_SNAPSHOT_MAX_POINTS
 from app.services.data_extraction.agentic.tools import ToolRegistry
 from app.services.data_extraction.agentic.traces import TraceManager
 from app.services.data_extraction.agentic.prompts import build_system_prompt, build_user_prompt
+from app.services.rag.rag_service import hierarchical_indexing_enabled
+from app.services.rag.retrieval_cache import get_retrieval_cache
+from app.services.rag.tender_collections import get_tender_collections
+from app.repos.index_manifest_repo import IndexManifestRepo
 
+INITIAL_SEARCH_TOP_K = 10
 
 class AgenticDataExtractionService:
     """Agent for extracting information from chunks using tool calling."""
@@ -33,7 +40,7 @@ class AgenticDataExtractionService:
         self,
         settings: SettingsDep,
         embedding_provider: BaseEmbedding,
-        qdrant_client: QdrantClient,
+        qdrant_client: AsyncQdrantClient,
         mongo_client: MongoClient,
         tender_id: uuid.UUID,
         llm_model: str = "gpt-oss",
@@ -43,14 +50,28 @@ class AgenticDataExtractionService:
         self.settings = settings
         self.llm_model = llm_model
         self.tender_id = tender_id
-        self.collection_name = str(tender_id)
+        collections = get_tender_collections()
+        self.collection_name = collections.collection_name(tender_id)
         self.max_iterations = max_iterations
+        self._initial_chunks: Dict[str, List[EmbeddedChunk]] = {}
         
+        snapshot_config = _load_config().get("rag", {}).get("retrieval", {}).get("agent_snapshot", {})
+
         # Initialize components
         self.chunk_retriever = ChunkRetriever(
             qdrant_client=qdrant_client,
             embedding_provider=embedding_provider,
             collection_name=self.collection_name,
+            query_filter=collections.tender_filter(tender_id),
+            tender_id=tender_id,
+            index_version=IndexManifestRepo(mongo_client).get_version(tender_id),
+            retrieval_cache=get_retrieval_cache(),
+            small_to_big=hierarchical_indexing_enabled(),
+            snapshot_max_points=(
+                snapshot_config.get("max_points", DEFAULT_SNAPSHOT_MAX_POINTS)
+                if snapshot_config.get("enabled", True)
+                else 0
+            ),
         )
         self.chunk_formatter = ChunkFormatter()
         self.tool_registry = ToolRegistry(
@@ -63,6 +84,16 @@ class AgenticDataExtractionService:
             enable_tracing=enable_tracing,
         )
     
+    @staticmethod
+    def initial_search_query(query: Query) -> str:
+        return " ".join(query.terms)
+
+    async def prefetch_initial_chunks(self, queries: Dict[str, Query]) -> None:
+        """Run the initial searches of all fields as one batch before extracting them one by one."""
+        search_queries = [self.initial_search_query(query) for query in queries.values()]
+        results = await self.chunk_retriever.search_chunks_batch(search_queries, top_k=INITIAL_SEARCH_TOP_K)
+        self._initial_chunks.update(zip(queries.keys(), results))
+
     async def extract_information(
         self, field_name: str, query: Query
     ) -> Dict[str, Any]:
@@ -78,10 +109,12 @@ class AgenticDataExtractionService:
         })
         
         # Build search query from terms
-        search_query = " ".join(query.terms)
+        search_query = self.initial_search_query(query)
         
-        # Initial search for relevant chunks
-        initial_chunks = await self.chunk_retriever.search_chunks(search_query, top_k=10)
+        # Initial search for relevant chunks, batched up front by prefetch_initial_chunks
+        initial_chunks = self._initial_chunks.pop(field_name, None)
+        if initial_chunks is None:
+            initial_chunks = await self.chunk_retriever.search_chunks(search_query, top_k=INITIAL_SEARCH_TOP_K)
         
         self.trace_manager.add_trace_step(field_name, {
             "type": "initial_search",
@@ -3,125 +3,320 @@ Chunk retrieval and formatting utilities for agentic data extraction.
 """
 
 import asyncio
-from typing import List, Optional
-from qdrant_client import QdrantClient
+import dataclasses
+import uuid
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+from qdrant_client import AsyncQdrantClient, models
 
 from app.config.logger import logger
 from app.embedding.provider.base_embedding import BaseEmbedding
 from app.services.data_extraction.agentic.types import ChunkMetadata, EmbeddedChunk
+from app.services.data_extraction.agentic.vector_snapshot import VectorSnapshot
+from app.services.rag.rag_service import LEVEL_FIELD, SCROLL_PAGE_SIZE, children_filter
+from app.services.rag.splitter.hierarchical_splitter import PARENT_LEVEL
+from app.services.rag.retrieval_cache import RetrievalCache
+from app.services.rag.tender_collections import TENDER_ID_FIELD
+
+AGENT_SEARCH_SCOPE = "agent"
+# Several children usually share a parent, fetch more of them than parents are returned
+SMALL_TO_BIG_OVER_FETCH = 3
+
+
+def parse_chunk_id(chunk_id: str) -> Union[int, str]:
+    """
+    Get the Qdrant point ID from a chunk ID (format: chunk_<point id>).
+
+    Points are keyed by UUID; collections indexed before that use integer IDs.
+    """
+    point_id = chunk_id.replace("chunk_", "")
+    if point_id.isdigit():
+        return int(point_id)
+    return str(uuid.UUID(point_id))
+
+
+def point_embedding(point) -> np.ndarray:
+    """Return the point's dense vector as a float32 array (empty if it wasn't fetched)."""
+    vector = getattr(point, "vector", None)
+    if isinstance(vector, dict):
+        # Hybrid collections return the unnamed dense vector next to the sparse one
+        vector = vector.get("")
+    if isinstance(vector, list) and vector:
+        return np.asarray(vector, dtype=np.float32)
+    return np.empty(0, dtype=np.float32)
 
 
 class ChunkRetriever:
-    """Handles chunk retrieval from Qdrant."""
+    """
+    Handles chunk retrieval from Qdrant.
+
+    Every chunk a search or lookup returns is kept for the rest of the run, so
+    the agent's follow-up lookups and the traces don't fetch it again. Tenders
+    with at most snapshot_max_points points are loaded into memory on the first
+    search and searched there for the rest of the run.
+    """
     
     def __init__(
         self,
-        qdrant_client: QdrantClient,
+        qdrant_client: AsyncQdrantClient,
         embedding_provider: BaseEmbedding,
         collection_name: str,
+        query_filter: Optional[models.Filter] = None,
+        tender_id: Optional[uuid.UUID] = None,
+        index_version: int = 0,
+        retrieval_cache: Optional[RetrievalCache] = None,
+        small_to_big: bool = False,
+        snapshot_max_points: int = 0,
     ):
         self.qdrant_client = qdrant_client
         self.embedding_provider = embedding_provider
         self.collection_name = collection_name
-    
+        # Restricts searches to one tender when the collection is shared between tenders
+        self.query_filter = query_filter
+        # The agent often repeats a search with the same arguments
+        self.tender_id = tender_id
+        self.index_version = index_version
+        self.retrieval_cache = retrieval_cache if tender_id else None
+        # Hierarchical index: search the child chunks, return their parent sections
+        self.small_to_big = small_to_big
+        self.search_filter = children_filter(query_filter) if small_to_big else query_filter
+        self._chunks: Dict[str, EmbeddedChunk] = {}
+        self.snapshot_max_points = snapshot_max_points
+        self._snapshot: Optional[VectorSnapshot] = None
+        self._snapshot_loaded = not snapshot_max_points
+        self._snapshot_lock = asyncio.Lock()
+
+    @staticmethod
+    def _to_chunk(point, chunk_id: Optional[str] = None) -> Optional[EmbeddedChunk]:
+        if not point.payload:
+            return None
+        content = point.payload.get("content")
+        file_name = point.payload.get("file_name")
+        file_id = point.payload.get("file_id")
+        if not (content and file_name and file_id):
+            return None
+
+        chunk_id = chunk_id or f"chunk_{point.id}"
+        parent_id = point.payload.get("parent_id")
+        metadata = ChunkMetadata(
+            chunk_id=chunk_id,
+            content=content,
+            file_name=file_name,
+            file_id=file_id,
+            headings=point.payload.get("headings"),
+            parent_id=f"chunk_{parent_id}" if parent_id else None,
+            child_ids=[f"chunk_{child_id}" for child_id in point.payload.get("child_ids") or []],
+            pages=point.payload.get("pages"),
+        )
+        return EmbeddedChunk(
+            chunk_id=chunk_id,
+            content=content,
+            embedding=point_embedding(point),
+            metadata=metadata,
+        )
+
+    def _to_chunks(self, points) -> List[EmbeddedChunk]:
+        return self._remember([chunk for point in points if (chunk := self._to_chunk(point))])
+
+    def _remember(self, chunks: List[EmbeddedChunk]) -> List[EmbeddedChunk]:
+        """
+        Keep chunks not seen in this run yet.
+
+        Chunks already known (e.g. from the snapshot, with their embeddings) are
+        kept, cached or searched copies may lack the embedding.
+
+        Returns:
+            The remembered copy of every chunk
+        """
+        return [self._chunks.setdefault(chunk.chunk_id, chunk) for chunk in chunks]
+
+    def get_cached_chunk(self, chunk_id: str) -> Optional[EmbeddedChunk]:
+        """A chunk already fetched in this run, without a round trip."""
+        return self._chunks.get(chunk_id)
+
+    async def get_chunks_by_ids(self, chunk_ids: List[str]) -> Dict[str, EmbeddedChunk]:
+        """
+        Get chunks by ID, fetching the ones not seen in this run with one request.
+
+        Returns:
+            Found chunks by the chunk IDs they were asked for
+        """
+        found: Dict[str, EmbeddedChunk] = {}
+        missing: Dict[Union[int, str], str] = {}
+        for chunk_id in chunk_ids:
+            if (chunk := self._chunks.get(chunk_id)) is not None:
+                found[chunk_id] = chunk
+                continue
+            try:
+                missing[parse_chunk_id(chunk_id)] = chunk_id
+            except ValueError:
+                logger.warning(f"Invalid chunk ID {chunk_id}")
+
+        if missing:
+            points = await self.qdrant_client.retrieve(
+                collection_name=self.collection_name,
+                ids=list(missing),
+                with_payload=True,
+            )
+            for point in points:
+                # In the shared collection an ID alone could address another tender's chunk
+                tender_id = (point.payload or {}).get(TENDER_ID_FIELD)
+                if self.tender_id and tender_id and tender_id != str(self.tender_id):
+                    continue
+                chunk_id = missing.get(parse_chunk_id(f"chunk_{point.id}"))
+                if chunk_id and (chunk := self._to_chunk(point, chunk_id)) is not None:
+                    self._chunks[chunk_id] = chunk
+                    found[chunk_id] = chunk
+        return found
+
+    async def _lift_to_parents(
+        self, results: List[List[EmbeddedChunk]], top_k: int
+    ) -> List[List[EmbeddedChunk]]:
+        """Replace children by their parents, each parent once at the rank of its best child."""
+        parent_ids = list(
+            dict.fromkeys(
+                chunk.metadata.parent_id
+                for chunks in results
+                for chunk in chunks
+                if chunk.metadata.parent_id
+            )
+        )
+        parents = await self.get_chunks_by_ids(parent_ids)
+
+        lifted_results = []
+        for chunks in results:
+            lifted: Dict[str, EmbeddedChunk] = {}
+            for chunk in chunks:
+                # Children of a parent that's missing (e.g. mid re-index) are returned as they are
+                chunk = parents.get(chunk.metadata.parent_id, chunk)
+                lifted.setdefault(chunk.chunk_id, chunk)
+            lifted_results.append(list(lifted.values())[:top_k])
+        return lifted_results
+
+    async def _get_snapshot(self) -> Optional[VectorSnapshot]:
+        """The in-memory index of the tender, loaded once; None if the tender is too large."""
+        async with self._snapshot_lock:
+            if self._snapshot_loaded:
+                return self._snapshot
+            self._snapshot_loaded = True
+
+            count = await self.qdrant_client.count(
+                collection_name=self.collection_name, count_filter=self.query_filter, exact=True
+            )
+            if count.count > self.snapshot_max_points:
+                logger.info(f"{count.count} points in {self.collection_name}, searching in Qdrant")
+                return None
+
+            searchable: List[EmbeddedChunk] = []
+            offset = None
+            while True:
+                points, offset = await self.qdrant_client.scroll(
+                    collection_name=self.collection_name,
+                    scroll_filter=self.query_filter,
+                    limit=SCROLL_PAGE_SIZE,
+                    offset=offset,
+                    with_payload=True,
+                    with_vectors=True,
+                )
+                for point in points:
+                    chunk = self._to_chunk(point)
+                    if chunk is None:
+                        continue
+                    # Parents are remembered for lifting, but only searched in a flat index
+                    self._chunks[chunk.chunk_id] = chunk
+                    if not (self.small_to_big and point.payload.get(LEVEL_FIELD) == PARENT_LEVEL):
+                        searchable.append(chunk)
+                if offset is None:
+                    break
+
+            self._snapshot = VectorSnapshot(searchable)
+            logger.info(f"Loaded {len(self._snapshot)} vectors of {self.collection_name} into memory")
+            return self._snapshot
+
+    def _limit(self, top_k: int) -> int:
+        return top_k * SMALL_TO_BIG_OVER_FETCH if self.small_to_big else top_k
+
     async def search_chunks(self, query: str, top_k: int = 5) -> List[EmbeddedChunk]:
         """Search for chunks using semantic similarity in Qdrant."""
+        cache_key = None
+        if self.retrieval_cache is not None:
+            cache_key = self.retrieval_cache.key(
+                self.tender_id, self.index_version, query, top_k, (AGENT_SEARCH_SCOPE, self.small_to_big)
+            )
+            if (cached := self.retrieval_cache.get(cache_key)) is not None:
+                return self._remember(list(cached))
+
         try:
             # Create query embedding
             query_vector = await self.embedding_provider.embed_query(query)
             
-            # Search in Qdrant (sync call in async context)
-            results = await asyncio.to_thread(
-                self.qdrant_client.search,
-                collection_name=self.collection_name,
-                query_vector=query_vector,
-                limit=top_k,
-            )
-            
-            chunks = []
-            for point in results:
-                if point.payload:
-                    content = point.payload.get("content")
-                    file_name = point.payload.get("file_name")
-                    file_id = point.payload.get("file_id")
-                    
-                    if content and file_name and file_id:
-                        chunk_id = f"chunk_{point.id}"
-                        metadata = ChunkMetadata(
-                            chunk_id=chunk_id,
-                            content=content,
-                            file_name=file_name,
-                            file_id=file_id,
-                        )
-                        # Get embedding vector if available
-                        embedding: List[float] = []
-                        if hasattr(point, 'vector') and point.vector:
-                            vec = point.vector
-                            if isinstance(vec, list) and len(vec) > 0:
-                                # Ensure all elements are numbers and convert to float
-                                try:
-                                    embedding = [float(x) for x in vec if isinstance(x, (int, float))]  # type: ignore
-                                except (ValueError, TypeError):
-                                    embedding = []
-                        
-                        chunk = EmbeddedChunk(
-                            chunk_id=chunk_id,
-                            content=content,
-                            embedding=embedding,
-                            metadata=metadata,
-                        )
-                        chunks.append(chunk)
-            
+            snapshot = await self._get_snapshot()
+            if snapshot is not None:
+                chunks = snapshot.search(query_vector, self._limit(top_k))
+            else:
+                response = await self.qdrant_client.query_points(
+                    collection_name=self.collection_name,
+                    query=query_vector.tolist(),
+                    query_filter=self.search_filter,
+                    limit=self._limit(top_k),
+                    with_payload=True,
+                )
+                chunks = self._to_chunks(response.points)
+            if self.small_to_big:
+                chunks = (await self._lift_to_parents([chunks], top_k))[0]
+            if cache_key is not None:
+                # Embeddings of snapshot chunks are views that would keep the whole matrix alive
+                self.retrieval_cache.put(
+                    cache_key,
+                    tuple(dataclasses.replace(chunk, embedding=np.empty(0, dtype=np.float32)) for chunk in chunks),
+                )
             return chunks
         except Exception as e:
             logger.error(f"Error searching chunks: {e}")
             return []
+
+    async def search_chunks_batch(self, queries: List[str], top_k: int = 5) -> List[List[EmbeddedChunk]]:
+        """Search for many queries with one embedding batch and one Qdrant batch query."""
+        if not queries:
+            return []
+        try:
+            query_vectors = await self.embedding_provider.embed_documents(queries)
+            snapshot = await self._get_snapshot()
+            if snapshot is not None:
+                results = snapshot.search_batch(query_vectors, self._limit(top_k))
+                if self.small_to_big:
+                    results = await self._lift_to_parents(results, top_k)
+                return results
+
+            requests = [
+                models.QueryRequest(
+                    query=query_vector.tolist(),
+                    filter=self.search_filter,
+                    limit=self._limit(top_k),
+                    with_payload=True,
+                )
+                for query_vector in query_vectors
+            ]
+
+            responses = await self.qdrant_client.query_batch_points(
+                collection_name=self.collection_name,
+                requests=requests,
+            )
+
+            results = [self._to_chunks(response.points) for response in responses]
+            if self.small_to_big:
+                results = await self._lift_to_parents(results, top_k)
+            return results
+        except Exception as e:
+            logger.error(f"Error batch searching chunks: {e}")
+            return [[] for _ in queries]
     
     async def get_chunk_by_id(self, chunk_id: str) -> Optional[EmbeddedChunk]:
         """Get a chunk by its ID from Qdrant."""
         try:
-            # Extract numeric ID from chunk_id (format: chunk_123)
-            numeric_id = int(chunk_id.replace("chunk_", ""))
-            
-            # Retrieve point from Qdrant (sync call in async context)
-            points = await asyncio.to_thread(
-                self.qdrant_client.retrieve,
-                collection_name=self.collection_name,
-                ids=[numeric_id],
-            )
-            
-            if points and len(points) > 0:
-                point = points[0]
-                if point.payload:
-                    content = point.payload.get("content")
-                    file_name = point.payload.get("file_name")
-                    file_id = point.payload.get("file_id")
-                    
-                    if content and file_name and file_id:
-                        metadata = ChunkMetadata(
-                            chunk_id=chunk_id,
-                            content=content,
-                            file_name=file_name,
-                            file_id=file_id,
-                        )
-                        # Get embedding vector if available
-                        embedding: List[float] = []
-                        if hasattr(point, 'vector') and point.vector:
-                            vec = point.vector
-                            if isinstance(vec, list) and len(vec) > 0:
-                                try:
-                                    embedding = [float(x) for x in vec if isinstance(x, (int, float))]  # type: ignore
-                                except (ValueError, TypeError):
-                                    embedding = []
-                        
-                        return EmbeddedChunk(
-                            chunk_id=chunk_id,
-                            content=content,
-                            embedding=embedding,
-                            metadata=metadata,
-                        )
-            
-            return None
+            chunks = await self.get_chunks_by_ids([chunk_id])
+            return chunks.get(chunk_id)
         except Exception as e:
             logger.error(f"Error getting chunk by ID {chunk_id}: {e}")
             return None
@@ -149,6 +344,8 @@ class ChunkFormatter:
         
         if chunk.metadata.headings:
             parts.append(f"Headings: {' > '.join(chunk.metadata.headings)}")
+        if chunk.metadata.pages:
+            parts.append(f"Pages: {', '.join(str(page) for page in chunk.metadata.pages)}")
         
         parts.append(f"File: {chunk.metadata.file_name}")
         parts.append(f"Content: {chunk.content}")
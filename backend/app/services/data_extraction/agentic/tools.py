@@ -106,18 +106,20 @@ class ToolRegistry:
     @staticmethod
     def extract_chunk_ids_from_output(output: str) -> list[str]:
         """Extract chunk IDs from formatted tool output."""
-        chunk_id_matches = re.findall(r'Chunk ID: (chunk_\d+)', output)
+        chunk_id_matches = re.findall(r'Chunk ID: (chunk_[\w-]+)', output)
         return chunk_id_matches
     
     async def get_chunk_details(self, chunk_ids: list[str]) -> list[dict]:
-        """Get detailed information for a list of chunk IDs."""
+        """Get detailed information for a list of chunk IDs, from the chunks the tool call just fetched."""
+        chunks = await self.chunk_retriever.get_chunks_by_ids(chunk_ids)
         chunk_details = []
         for chunk_id in chunk_ids:
-            chunk = await self.chunk_retriever.get_chunk_by_id(chunk_id)
+            chunk = chunks.get(chunk_id)
             if chunk:
                 chunk_details.append({
                     "chunk_id": chunk_id,
                     "headings": chunk.metadata.headings,
+                    "pages": chunk.metadata.pages,
                     "content_preview": chunk.content[:200],
                     "content_length": len(chunk.content),
                 })
@@ -5,6 +5,8 @@ Type definitions for agentic data extraction.
 from typing import List, Dict, Optional, Any
 from dataclasses import dataclass
 
+import numpy as np
+
 
 @dataclass
 class ChunkMetadata:
@@ -16,20 +18,23 @@ class ChunkMetadata:
     headings: Optional[List[str]] = None
     parent_id: Optional[str] = None
     child_ids: Optional[List[str]] = None
+    pages: Optional[List[int]] = None
     
     def __post_init__(self):
         if self.headings is None:
             self.headings = []
         if self.child_ids is None:
             self.child_ids = []
+        if self.pages is None:
+            self.pages = []
 
 
 @dataclass
 class EmbeddedChunk:
-    """Chunk with its embedding and metadata."""
+    """Chunk with its embedding (float32 array view, empty if not fetched) and metadata."""
     chunk_id: str
     content: str
-    embedding: List[float]
+    embedding: np.ndarray
     metadata: ChunkMetadata
 
 
@@ -0,0 +1,52 @@
+"""
+In-memory vector index of one tender for an agent run.
+"""
+
+from typing import List
+
+import numpy as np
+
+from app.services.data_extraction.agentic.types import EmbeddedChunk
+
+# Above this many points a tender is searched in Qdrant, 20000 x 768-d float32 is ~60 MB
+DEFAULT_SNAPSHOT_MAX_POINTS = 20000
+
+
+class VectorSnapshot:
+    """
+    The searchable chunks of a tender as one contiguous float32 matrix.
+
+    A tender has a few thousand chunks, so an exact search is a single matrix
+    product plus a partial sort, much cheaper than a network round trip per
+    search. Chunk embeddings are views into the matrix.
+    """
+
+    def __init__(self, chunks: List[EmbeddedChunk]):
+        self.chunks = [chunk for chunk in chunks if chunk.embedding.size]
+        dimension = self.chunks[0].embedding.size if self.chunks else 0
+        self.matrix = np.empty((len(self.chunks), dimension), dtype=np.float32)
+        for i, chunk in enumerate(self.chunks):
+            self.matrix[i] = chunk.embedding
+            chunk.embedding = self.matrix[i]
+        # Normalized rows turn the dot product into the cosine similarity Qdrant uses
+        self.matrix /= np.maximum(np.linalg.norm(self.matrix, axis=1, keepdims=True), 1e-12)
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+    def search_batch(self, query_vectors: np.ndarray, top_k: int) -> List[List[EmbeddedChunk]]:
+        """Top_k chunks by cosine similarity for every row of query_vectors, best first."""
+        top_k = min(top_k, len(self.chunks))
+        if top_k <= 0:
+            return [[] for _ in range(len(query_vectors))]
+
+        queries = np.asarray(query_vectors, dtype=np.float32).reshape(-1, self.matrix.shape[1])
+        scores = queries @ self.matrix.T
+        # argpartition finds the top_k in linear time, only those are sorted
+        top = np.argpartition(-scores, top_k - 1, axis=1)[:, :top_k]
+        order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1, kind="stable")
+        ranked = np.take_along_axis(top, order, axis=1)
+        return [[self.chunks[i] for i in row] for row in ranked]
+
+    def search(self, query_vector: np.ndarray, top_k: int) -> List[EmbeddedChunk]:
+        return self.search_batch(query_vector, top_k)[0]
@@ -2,17 +2,17 @@ from typing import Tuple
 from dataclasses import dataclass
 import re
 import json
-from typing import Dict, List
+from typing import Dict, List, Optional
 import uuid
-import asyncio
 
 from langchain_core.output_parsers import PydanticOutputParser
 from langchain_core.prompts import PromptTemplate
 
+from app.config.app_config import _load_config
 from app.config.settings import SettingsDep
 from app.config.logger import logger
 from app.models.extracted_data import ExtractedData
-from app.services.rag.rag_service import RagService
+from app.services.rag.rag_service import Chunk, RagService
 from app.llm.provider.base_llm import BaseLLM, LlmRequest
 from app.services.data_extraction.queries import Query
 
@@ -63,6 +63,10 @@ Kontext:
 """.strip()
 
 INITIAL_CONTEXT_SIZE = 15
+# Hybrid retrieval ranks the keyword hits higher, fewer chunks reach the same recall
+HYBRID_CONTEXT_SIZE = 8
+# A reranker puts the relevant chunks first, fewer still are needed
+RERANKED_CONTEXT_SIZE = 6
 
 
 def find_source_in_context(query: str, document: str) -> bool:
@@ -81,6 +85,9 @@ class DataExtractionService:
         self.llm_provider = llm_provider
         self.rag_service = rag_service
 
+        retrieval_config = _load_config().get("rag", {}).get("retrieval", {})
+        self.context_size = retrieval_config.get("extraction_top_k") or self._default_context_size()
+
         self.prompt_template = PromptTemplate(
             template=EXTRACT_PROMPT_TEMPLATE,
             input_variables=[
@@ -95,39 +102,59 @@ class DataExtractionService:
             },
         )
 
-    async def get_context(
-        self,
-        tender_id: uuid.UUID,
-        query: str,
-        search_terms: List[str] | None = None,
-        top_k: int = 15,
-    ) -> str:
+    def _default_context_size(self) -> int:
+        """Chunks per field matched to the retrieval features that are enabled."""
+        if self.rag_service.reranker is not None:
+            return RERANKED_CONTEXT_SIZE
+        if self.rag_service.sparse_encoder is not None:
+            return HYBRID_CONTEXT_SIZE
+        return INITIAL_CONTEXT_SIZE
+
+    @staticmethod
+    def build_search_query(query: str, search_terms: List[str] | None = None) -> str:
         if search_terms:
             combined_keywords = " ".join(search_terms)
             query = f"{query} Relevante Keywords: {combined_keywords}"
+        return query
 
-        chunks = await self.rag_service.retrieve_chunks(tender_id, query, top_k=top_k)
-
+    @staticmethod
+    def format_context(chunks: List[Chunk]) -> str:
         context_parts = []
         for chunk in chunks:
+            section = f", Abschnitt: {' > '.join(chunk.headings)}" if chunk.headings else ""
+            if chunk.pages:
+                section += f", Seite: {', '.join(str(page) for page in chunk.pages)}"
             context_parts.append(
-                f"Dateiname {chunk.file_name}, Datei-ID: {chunk.file_id}: \n{chunk.content}"
+                f"Dateiname {chunk.file_name}, Datei-ID: {chunk.file_id}{section}: \n{chunk.content}"
             )
-        context = "\n\n".join(context_parts)
+        return "\n\n".join(context_parts)
 
-        return context
+    async def get_context(
+        self,
+        tender_id: uuid.UUID,
+        query: str,
+        search_terms: List[str] | None = None,
+        top_k: int = 15,
+    ) -> str:
+        query = self.build_search_query(query, search_terms)
+        chunks = await self.rag_service.retrieve_chunks(tender_id, query, top_k=top_k)
+        return self.format_context(chunks)
 
     async def create_requests(
         self,
         tender_id: uuid.UUID,
         queries: Dict[str, Query],
-        top_k: int = INITIAL_CONTEXT_SIZE,
+        top_k: Optional[int] = None,
     ) -> List[DataExtractionRequest]:
-        context_tasks = [
-            self.get_context(tender_id, query.question, query.terms, top_k)
-            for query in queries.values()
+        top_k = top_k or self.context_size
+        # One embedding batch and one Qdrant round trip for all fields
+        search_queries = [
+            self.build_search_query(query.question, query.terms) for query in queries.values()
         ]
-        contexts = await asyncio.gather(*context_tasks)
+        chunk_lists = await self.rag_service.retrieve_chunks_batch(
+            tender_id, search_queries, top_k=top_k
+        )
+        contexts = [self.format_context(chunks) for chunks in chunk_lists]
 
         data_extraction_requests = []
         for (field_name, query), context in zip(queries.items(), contexts):
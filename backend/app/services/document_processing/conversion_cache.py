@@ -0,0 +1,185 @@
+"""
+Cache of converted documents keyed by file content.
+
+Restarted jobs, re-uploaded files and annexes shared between tenders run
+Docling again on unchanged bytes. Entries are keyed by the file's SHA-256
+and a fingerprint of the converter options and Docling version, and hold
+the cleaned Markdown of the whole conversion (both passes) and optionally
+the Docling document for structure-aware chunking. Documents that stayed
+too short even with OCR are cached too, so they aren't OCR'd again.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from functools import lru_cache
+from importlib.metadata import version
+from typing import Dict, List, Optional, Tuple
+
+from docling_core.types.doc import DoclingDocument
+
+from app.config.app_config import _load_config
+from app.config.logger import logger
+from app.services.document_processing.conversion_pool import ALLOWED_FORMATS, TABLE_MODE
+from app.services.external.minio_service import MinioService
+
+# Bump when the cleaning or the OCR pass change what gets cached
+CACHE_FORMAT_VERSION = 1
+DEFAULT_CACHE_DIRECTORY = "data/conversion_cache"
+
+
+@dataclass
+class CachedConversion:
+    content: str
+    structure: Optional[DoclingDocument] = None
+
+
+@lru_cache(maxsize=1)
+def converter_fingerprint() -> str:
+    """Hash of everything besides the file that changes a conversion's output."""
+    options = {
+        "format": CACHE_FORMAT_VERSION,
+        "docling": version("docling"),
+        "docling_core": version("docling-core"),
+        "table_mode": TABLE_MODE.value,
+        "do_cell_matching": True,
+        "formats": sorted(input_format.value for input_format in ALLOWED_FORMATS),
+    }
+    return hashlib.sha256(json.dumps(options, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+class ConversionCache(ABC):
+    """
+    Converted documents by (file SHA-256, converter fingerprint).
+
+    Subclasses store the gzipped JSON entries. Lookups and writes never fail
+    a job, errors are logged and treated as misses.
+
+    Args:
+        store_structure: Also cache the Docling document, not only the Markdown
+    """
+
+    def __init__(self, store_structure: bool = True):
+        self.store_structure = store_structure
+
+    @staticmethod
+    def key(data: bytes) -> str:
+        return f"{hashlib.sha256(data).hexdigest()}-{converter_fingerprint()}"
+
+    @abstractmethod
+    def _read(self, key: str) -> Optional[bytes]:
+        """
+        Read a stored entry.
+
+        Args:
+            key: The entry's key, see key()
+
+        Returns:
+            The gzipped JSON entry, None if there is none
+        """
+        pass
+
+    @abstractmethod
+    def _write(self, key: str, entry: bytes) -> None:
+        """
+        Store an entry, replacing an existing one.
+
+        Args:
+            key: The entry's key, see key()
+            entry: The gzipped JSON entry
+        """
+        pass
+
+    def get(self, data: bytes) -> Optional[CachedConversion]:
+        try:
+            entry = self._read(self.key(data))
+            if entry is None:
+                return None
+            payload = json.loads(gzip.decompress(entry))
+            structure = payload.get("structure")
+            return CachedConversion(
+                content=payload["content"],
+                structure=DoclingDocument.model_validate(structure) if structure else None,
+            )
+        except Exception as e:
+            logger.warning(f"Could not read cached conversion: {e}")
+            return None
+
+    def put(self, data: bytes, content: str, structure: Optional[DoclingDocument] = None) -> None:
+        payload = {
+            "content": content,
+            "structure": structure.export_to_dict() if structure is not None and self.store_structure else None,
+        }
+        try:
+            self._write(self.key(data), gzip.compress(json.dumps(payload).encode("utf-8")))
+        except Exception as e:
+            logger.warning(f"Could not cache conversion: {e}")
+
+    def put_many(self, entries: List[Tuple[bytes, str, Optional[DoclingDocument]]]) -> None:
+        """Cache (file, content, structure) entries."""
+        for data, content, structure in entries:
+            self.put(data, content, structure)
+
+    def get_many(self, files: List[Tuple[str, bytes]]) -> Dict[str, CachedConversion]:
+        """Cached conversions of the files that have one, by file name."""
+        cached = {}
+        for name, data in files:
+            entry = self.get(data)
+            if entry is not None:
+                cached[name] = entry
+        return cached
+
+
+class LocalConversionCache(ConversionCache):
+    """Entries as files in a local directory, for a single worker host."""
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIRECTORY, store_structure: bool = True):
+        super().__init__(store_structure)
+        self.directory = directory
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json.gz")
+
+    def _read(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _write(self, key: str, entry: bytes) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        # Written under a temporary name so a concurrent reader never sees half an entry
+        tmp_path = f"{self._path(key)}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(entry)
+        os.replace(tmp_path, self._path(key))
+
+
+class MinioConversionCache(ConversionCache):
+    """Entries as MinIO objects, shared by all workers."""
+
+    def __init__(self, minio_service: MinioService, store_structure: bool = True):
+        super().__init__(store_structure)
+        self.minio_service = minio_service
+
+    def _read(self, key: str) -> Optional[bytes]:
+        return self.minio_service.get_cached_conversion(key)
+
+    def _write(self, key: str, entry: bytes) -> None:
+        self.minio_service.upload_cached_conversion(key, entry)
+
+
+def get_conversion_cache(minio_service: MinioService) -> Optional[ConversionCache]:
+    """Get the conversion cache configured in config.yaml, None if caching is disabled."""
+    cache_config = _load_config().get("document_processing", {}).get("cache", {})
+    if not cache_config.get("enabled", False):
+        return None
+
+    store_structure = cache_config.get("store_structure", True)
+    if cache_config.get("backend", "minio") == "local":
+        return LocalConversionCache(cache_config.get("directory", DEFAULT_CACHE_DIRECTORY), store_structure)
+    return MinioConversionCache(minio_service, store_structure)
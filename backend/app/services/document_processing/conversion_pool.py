@@ -0,0 +1,231 @@
+"""
+Warm process pool for Docling conversions.
+
+Docling's layout and table models are CPU bound and take seconds to load.
+Each pool process builds one DocumentConverter per OCR mode when it starts
+and keeps it, so models are loaded once per process instead of per call, and
+conversions run in parallel without blocking the worker's event loop.
+
+Pool processes are spawned: they import this module and Docling, and
+re-import the parent's main module unless it is a package's __main__. The
+worker is started with `python -m app.queue` so they don't also import the
+whole worker, including the app config with its embedding and LLM providers.
+"""
+
+import asyncio
+import io
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from docling.datamodel.accelerator_options import AcceleratorOptions
+from docling.datamodel.base_models import ConversionStatus, InputFormat
+from docling.datamodel.pipeline_options import (
+    PdfPipelineOptions,
+    TableFormerMode,
+    TableStructureOptions,
+)
+from docling.document_converter import (
+    DocumentConverter,
+    ExcelFormatOption,
+    PdfFormatOption,
+    WordFormatOption,
+)
+from docling.pipeline.simple_pipeline import SimplePipeline
+from docling.pipeline.standard_pdf_pipeline import StandardPdfPipeline
+from docling_core.types.doc import DoclingDocument
+from docling_core.types.io import DocumentStream
+from PIL import Image
+
+from app.config.logger import logger
+
+# Scanned tender documents are often large images
+Image.MAX_IMAGE_PIXELS = None
+
+DEFAULT_CONVERSION_WORKERS = 2
+DEFAULT_CONVERSION_THREADS = 4
+OCR_MODES = (False, True)
+ALLOWED_FORMATS = [
+    InputFormat.PDF,
+    InputFormat.DOCX,
+    InputFormat.XLSX,
+    InputFormat.ASCIIDOC,
+    InputFormat.CSV,
+    InputFormat.PPTX,
+    InputFormat.MD,
+]
+TABLE_MODE = TableFormerMode.ACCURATE
+
+
+@dataclass
+class ConvertedDocument:
+    """The picklable part of a ConversionResult."""
+
+    name: str
+    status: ConversionStatus
+    document: Optional[DoclingDocument] = None
+    errors: List[str] = field(default_factory=list)
+    # Markdown by page number, set when only some pages were converted
+    page_markdown: Dict[int, str] = field(default_factory=dict)
+
+
+def get_converter(use_ocr: bool, num_threads: int = DEFAULT_CONVERSION_THREADS) -> DocumentConverter:
+    return DocumentConverter(
+        allowed_formats=ALLOWED_FORMATS,
+        format_options={
+            InputFormat.PDF: PdfFormatOption(
+                pipeline_cls=StandardPdfPipeline,
+                pipeline_options=PdfPipelineOptions(
+                    do_ocr=use_ocr,
+                    do_table_structure=True,
+                    table_structure_options=TableStructureOptions(
+                        mode=TABLE_MODE, do_cell_matching=True
+                    ),
+                    accelerator_options=AcceleratorOptions(num_threads=num_threads),
+                ),
+            ),
+            InputFormat.DOCX: WordFormatOption(
+                pipeline_cls=SimplePipeline,
+            ),
+            InputFormat.XLSX: ExcelFormatOption(
+                pipeline_cls=SimplePipeline,
+            ),
+        },
+    )
+
+
+# Converters of this pool process by OCR mode
+_converters: Dict[bool, DocumentConverter] = {}
+_num_threads = DEFAULT_CONVERSION_THREADS
+
+
+def _warm_converter(use_ocr: bool) -> DocumentConverter:
+    if use_ocr not in _converters:
+        converter = get_converter(use_ocr, _num_threads)
+        # Loads the layout and table models now instead of on the first PDF
+        converter.initialize_pipeline(InputFormat.PDF)
+        _converters[use_ocr] = converter
+    return _converters[use_ocr]
+
+
+def _init_worker(num_threads: int) -> None:
+    global _num_threads
+    _num_threads = num_threads
+    for use_ocr in OCR_MODES:
+        _warm_converter(use_ocr)
+
+
+def _ready() -> None:
+    """No-op task; submitting one per worker starts (and warms) the processes."""
+
+
+def convert_document(name: str, data: bytes, use_ocr: bool) -> ConvertedDocument:
+    """Convert one file, runs in a pool process."""
+    try:
+        result = _warm_converter(use_ocr).convert(
+            DocumentStream(name=name, stream=io.BytesIO(data)), raises_on_error=False
+        )
+    except Exception as e:
+        return ConvertedDocument(name=name, status=ConversionStatus.FAILURE, errors=[str(e)])
+
+    return ConvertedDocument(
+        name=name,
+        status=result.status,
+        document=result.document if result.status == ConversionStatus.SUCCESS else None,
+        errors=[error.error_message for error in result.errors],
+    )
+
+
+def page_ranges(pages: List[int]) -> List[Tuple[int, int]]:
+    """Contiguous (first, last) page ranges covering the sorted page numbers."""
+    ranges: List[Tuple[int, int]] = []
+    for page in pages:
+        if ranges and ranges[-1][1] == page - 1:
+            ranges[-1] = (ranges[-1][0], page)
+        else:
+            ranges.append((page, page))
+    return ranges
+
+
+def convert_pages(name: str, data: bytes, pages: List[int]) -> ConvertedDocument:
+    """
+    Convert only the given pages of a PDF with OCR, runs in a pool process.
+
+    Returns:
+        The Markdown of every converted page in page_markdown, no document
+    """
+    converter = _warm_converter(True)
+    page_markdown: Dict[int, str] = {}
+    errors: List[str] = []
+    for first, last in page_ranges(pages):
+        try:
+            result = converter.convert(
+                DocumentStream(name=name, stream=io.BytesIO(data)),
+                raises_on_error=False,
+                page_range=(first, last),
+            )
+        except Exception as e:
+            errors.append(str(e))
+            continue
+
+        errors.extend(error.error_message for error in result.errors)
+        if result.status == ConversionStatus.SUCCESS:
+            for page in range(first, last + 1):
+                page_markdown[page] = result.document.export_to_markdown(page_no=page)
+
+    status = ConversionStatus.SUCCESS if len(page_markdown) == len(pages) else ConversionStatus.PARTIAL_SUCCESS
+    if not page_markdown:
+        status = ConversionStatus.FAILURE
+    return ConvertedDocument(name=name, status=status, errors=errors, page_markdown=page_markdown)
+
+
+_conversion_pool: ProcessPoolExecutor | None = None
+_conversion_pool_lock = threading.Lock()
+
+
+def get_conversion_pool(
+    workers: int = DEFAULT_CONVERSION_WORKERS, num_threads: int = DEFAULT_CONVERSION_THREADS
+) -> ProcessPoolExecutor:
+    """
+    Get the conversion pool (singleton pattern), its processes start warming up right away.
+
+    Args:
+        workers: Number of converter processes, used when the pool is created
+        num_threads: Docling accelerator threads per process
+    """
+    global _conversion_pool
+    if _conversion_pool is None:
+        with _conversion_pool_lock:
+            if _conversion_pool is None:
+                logger.info(f"Starting {workers} Docling converter processes")
+                # Forking a process with a running event loop and client threads isn't safe
+                _conversion_pool = ProcessPoolExecutor(
+                    max_workers=max(workers, 1),
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(num_threads,),
+                )
+                for _ in range(max(workers, 1)):
+                    _conversion_pool.submit(_ready)
+    return _conversion_pool
+
+
+def reset_conversion_pool() -> None:
+    """Drop a broken pool (a worker died), the next get_conversion_pool starts a new one."""
+    global _conversion_pool
+    with _conversion_pool_lock:
+        if _conversion_pool is not None:
+            _conversion_pool.shutdown(wait=False, cancel_futures=True)
+            _conversion_pool = None
+
+
+async def convert_documents(
+    pool: ProcessPoolExecutor, files: List[Tuple[str, bytes]], use_ocr: bool
+) -> List[ConvertedDocument]:
+    """Convert files in parallel across the pool, results are in the order of files."""
+    loop = asyncio.get_running_loop()
+    return await asyncio.gather(
+        *(loop.run_in_executor(pool, convert_document, name, data, use_ocr) for name, data in files)
+    )
@@ -1,28 +1,49 @@
+import asyncio
 import uuid
+from concurrent.futures import ProcessPoolExecutor
 
 
+from app.services.document_processing.conversion_cache import get_conversion_cache
+from app.services.document_processing.conversion_pool import (
+    DEFAULT_CONVERSION_THREADS,
+    DEFAULT_CONVERSION_WORKERS,
+    get_conversion_pool,
+)
 from app.services.document_processing.markdown_converter import (
     convert_to_markdown,
+    ocr_incomplete_documents,
 )
 
 from app.models.document import ProcessedDocument, Document
 from app.services.external.minio_service import MinioService
+from app.config.app_config import _load_config
 from app.config.logger import logger
 
 
-def process_documents(
+def get_document_conversion_pool() -> ProcessPoolExecutor:
+    """Get the Docling conversion pool configured in config.yaml, started on first use."""
+    config = _load_config().get("document_processing", {})
+    return get_conversion_pool(
+        config.get("conversion_workers", DEFAULT_CONVERSION_WORKERS),
+        config.get("threads_per_worker", DEFAULT_CONVERSION_THREADS),
+    )
+
+
+async def process_documents(
     tender_id: uuid.UUID,
     minio_service: MinioService,
     documents: list[Document],
 ) -> list[ProcessedDocument]:
-    tender_files = list(minio_service.get_tender_files(tender_id))
-    logger.info(f"Starting document processing for {len(tender_files)} files")
+    logger.info(f"Starting document processing for {len(documents)} files")
 
+    pool = get_document_conversion_pool()
+    cache = get_conversion_cache(minio_service)
     document_map = {doc.id: doc.name for doc in documents}
-    processed_documents: list[ProcessedDocument] = []
+    files = await asyncio.to_thread(lambda: list(minio_service.get_tender_files(tender_id)))
 
-    processed_documents, incomplete_documents = convert_to_markdown(
-        tender_id, minio_service, document_map, True
+    # First pass without OCR, most tender documents have a text layer
+    processed_documents, incomplete_documents = await convert_to_markdown(
+        tender_id, files, document_map, pool, cache
     )
 
     # Second pass with OCR for incomplete files
@@ -30,10 +51,11 @@ def process_documents(
         logger.info(
             f"Starting second pass (with OCR) for {len(incomplete_documents)} incomplete documents"
         )
-        ocr_processed_documents, _ = convert_to_markdown(
-            tender_id, minio_service, document_map, False
+        processed_documents.extend(
+            await ocr_incomplete_documents(
+                tender_id, dict(files), incomplete_documents, document_map, pool, cache
+            )
         )
-        processed_documents.extend(ocr_processed_documents)
 
     logger.info(f"Successfully processed {len(processed_documents)} documents total")
     return processed_documents
@@ -1,36 +1,26 @@
-import io
+import asyncio
 import re
-from collections.abc import Iterable
 import uuid
-
-from PIL import Image
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
 from app.services.document_processing.utils import (
     clean_content,
     is_content_sufficient,
 )
 
-Image.MAX_IMAGE_PIXELS = None
-from docling.datamodel.base_models import ConversionStatus, InputFormat
-from docling.datamodel.document import ConversionResult
-from docling.datamodel.pipeline_options import (
-    PdfPipelineOptions,
-    TableFormerMode,
-    TableStructureOptions,
-)
-from docling.datamodel.accelerator_options import AcceleratorOptions
-from docling.document_converter import (
-    DocumentConverter,
-    PdfFormatOption,
-    WordFormatOption,
-    ExcelFormatOption,
-)
-from docling.pipeline.simple_pipeline import SimplePipeline
-from docling.pipeline.standard_pdf_pipeline import StandardPdfPipeline
-from docling_core.types.io import DocumentStream
+from docling.datamodel.base_models import ConversionStatus
+from docling_core.types.doc import DoclingDocument, TableItem, TextItem
 
 from app.models.document import ProcessedDocument, Document
-from app.services.external.minio_service import MinioService
+from app.services.document_processing.conversion_cache import ConversionCache
+from app.services.document_processing.conversion_pool import (
+    ConvertedDocument,
+    convert_document,
+    convert_documents,
+    convert_pages,
+    reset_conversion_pool,
+)
 from app.config.logger import logger
 
 MIN_CONTENT_CHARS = 300
@@ -38,21 +28,37 @@ _RE_MULTI_NEWLINE = re.compile(r"\n\s*\n\s*\n+")
 _RE_SENTENCE_SPACING = re.compile(r"([.!?])\s*([A-ZÄÖÜ])")
 
 
+def _document_id(name: str) -> uuid.UUID:
+    return uuid.UUID(name.split("/")[-1])
+
+
+def _processed_document(
+    name: str,
+    content: str,
+    structure: DoclingDocument | None,
+    tender_id: uuid.UUID,
+    document_map: dict[uuid.UUID, str],
+) -> ProcessedDocument:
+    document_id = _document_id(name)
+    document_name = document_map.get(document_id, "")
+    document = Document(id=document_id, tender_id=tender_id, name=document_name)
+    return ProcessedDocument(document=document, content=content, structure=structure)
+
+
 def export_documents(
-    document_streams: list[DocumentStream],
-    conv_results: Iterable[ConversionResult],
+    converted_documents: list[ConvertedDocument],
     tender_id: uuid.UUID,
     document_map: dict[uuid.UUID, str],
-) -> tuple[list[ProcessedDocument], list[str]]:
+) -> tuple[list[ProcessedDocument], list[ConvertedDocument]]:
     processed_files: list[ProcessedDocument] = []
-    incomplete_files: list[str] = []
+    incomplete_files: list[ConvertedDocument] = []
 
     success_count = 0
     failure_count = 0
     partial_success_count = 0
 
-    for document_stream, conv_res in zip(document_streams, conv_results):
-        name = document_stream.name
+    for conv_res in converted_documents:
+        name = conv_res.name
         logger.info(f"Converting {name}")
         if conv_res.status == ConversionStatus.SUCCESS:
             success_count += 1
@@ -61,23 +67,22 @@ def export_documents(
             content = clean_content(content)
 
             if not is_content_sufficient(content):
-                incomplete_files.append(name)
+                incomplete_files.append(conv_res)
                 continue
 
-            document_id = uuid.UUID(name.split("/")[-1])
-            document_name = document_map.get(document_id, "")
-            document = Document(id=document_id, tender_id=tender_id, name=document_name)
-            processed_files.append(ProcessedDocument(document=document, content=content))
+            processed_files.append(
+                _processed_document(name, content, conv_res.document, tender_id, document_map)
+            )
 
         elif conv_res.status == ConversionStatus.PARTIAL_SUCCESS:
             logger.info(
-                f"Document {conv_res.input.file} was partially converted with the following errors:"
+                f"Document {name} was partially converted with the following errors:"
             )
-            for item in conv_res.errors:
-                logger.error(f"\t{item.error_message}")
+            for error in conv_res.errors:
+                logger.error(f"\t{error}")
             partial_success_count += 1
         else:
-            logger.info(f"Document {conv_res.input.file} failed to convert.")
+            logger.info(f"Document {name} failed to convert.")
             failure_count += 1
 
     logger.info(
@@ -88,66 +93,147 @@ def export_documents(
     return processed_files, incomplete_files
 
 
-def create_document_streams(
-    tender_id: uuid.UUID, minio_service: MinioService
-) -> list[DocumentStream]:
-    document_streams: list[DocumentStream] = []
+def pages_without_text(document: DoclingDocument) -> list[int]:
+    """Pages without any text or table, i.e. scanned pages without a text layer."""
+    text_pages: set[int] = set()
+    for item, _ in document.iterate_items():
+        if (isinstance(item, TextItem) and item.text.strip()) or (
+            isinstance(item, TableItem) and item.data.grid
+        ):
+            text_pages.update(prov.page_no for prov in item.prov)
+    return [page for page in sorted(document.pages) if page not in text_pages]
 
-    for object_name, data in minio_service.get_tender_files(tender_id):
-        file_data = io.BytesIO(data)
-        document_streams.append(DocumentStream(name=object_name, stream=file_data))
 
-    return document_streams
+def merge_pages(document: DoclingDocument, page_markdown: dict[int, str]) -> str:
+    """Markdown of the document with the OCR'd pages in place of the first-pass ones."""
+    return "\n\n".join(
+        page_markdown[page] if page in page_markdown else document.export_to_markdown(page_no=page)
+        for page in sorted(document.pages)
+    )
 
 
-def convert_to_markdown(
+async def convert_to_markdown(
     tender_id: uuid.UUID,
-    minio_service: MinioService,
+    files: list[tuple[str, bytes]],
     document_map: dict[uuid.UUID, str],
-    use_ocr: bool = False,
-) -> tuple[list[ProcessedDocument], list[str]]:
-
-    converter = get_converter(use_ocr)
-    document_streams = create_document_streams(tender_id, minio_service)
-    if not document_streams:
+    pool: ProcessPoolExecutor,
+    cache: ConversionCache | None = None,
+) -> tuple[list[ProcessedDocument], list[ConvertedDocument]]:
+    """
+    Convert the tender's files without OCR across the conversion pool.
+
+    Files found in the cache aren't converted. Conversions with enough
+    content are cached, the others are left to the OCR pass.
+
+    Returns:
+        The processed documents, and the conversions with too little content
+    """
+    if not files:
         logger.info("No valid documents to convert with Docling")
         return [], []
 
+    processed_files: list[ProcessedDocument] = []
+    if cache is not None:
+        cached = await asyncio.to_thread(cache.get_many, files)
+        for name, entry in cached.items():
+            if is_content_sufficient(entry.content):
+                processed_files.append(
+                    _processed_document(name, entry.content, entry.structure, tender_id, document_map)
+                )
+            else:
+                logger.info(f"Document {name} has too little content even with OCR (cached)")
+        logger.info(f"Found {len(cached)} of {len(files)} documents in the conversion cache")
+        files = [(name, data) for name, data in files if name not in cached]
+        if not files:
+            return processed_files, []
+
     try:
-        conv_results = converter.convert_all(document_streams, raises_on_error=False)
-        return export_documents(document_streams, conv_results, tender_id, document_map)
+        converted_documents = await convert_documents(pool, files, False)
+        converted_files, incomplete_files = export_documents(converted_documents, tender_id, document_map)
+    except BrokenProcessPool as e:
+        # A converter process died (e.g. out of memory), the next job gets a fresh pool
+        logger.error(f"Docling conversion pool broke: {e}")
+        reset_conversion_pool()
+        return processed_files, []
     except Exception as e:
         logger.error(f"Error converting documents with Docling: {e}")
-        return [], []
+        return processed_files, []
 
-def get_converter(use_ocr: bool) -> DocumentConverter:
-    return DocumentConverter(
-        allowed_formats=[
-            InputFormat.PDF,
-            InputFormat.DOCX,
-            InputFormat.XLSX,
-            InputFormat.ASCIIDOC,
-            InputFormat.CSV,
-            InputFormat.PPTX,
-            InputFormat.MD,
-        ],
-        format_options={
-            InputFormat.PDF: PdfFormatOption(
-                pipeline_cls=StandardPdfPipeline,
-                pipeline_options=PdfPipelineOptions(
-                    do_ocr=use_ocr,
-                    do_table_structure=True,
-                    table_structure_options=TableStructureOptions(
-                        mode=TableFormerMode.ACCURATE, do_cell_matching=True
-                    ),
-                    accelerator_options=AcceleratorOptions(num_threads=8),
-                ),
-            ),
-            InputFormat.DOCX: WordFormatOption(
-                pipeline_cls=SimplePipeline,
-            ),
-            InputFormat.XLSX: ExcelFormatOption(
-                pipeline_cls=SimplePipeline,
-            ),
-        },
-    )
+    if cache is not None:
+        data_by_id = {_document_id(name): data for name, data in files}
+        await asyncio.to_thread(
+            cache.put_many,
+            [
+                (data_by_id[processed.document.id], processed.content, processed.structure)
+                for processed in converted_files
+            ],
+        )
+    return processed_files + converted_files, incomplete_files
+
+
+async def ocr_incomplete_documents(
+    tender_id: uuid.UUID,
+    files: dict[str, bytes],
+    incomplete_documents: list[ConvertedDocument],
+    document_map: dict[uuid.UUID, str],
+    pool: ProcessPoolExecutor,
+    cache: ConversionCache | None = None,
+) -> list[ProcessedDocument]:
+    """
+    Second pass: OCR the pages without a text layer of documents with too little content.
+
+    Fully scanned documents are converted again with OCR. Otherwise only the
+    pages without text are, and their Markdown replaces those pages of the
+    first pass; the merged Markdown has no Docling document, so it is chunked
+    by the Markdown splitters. Outcomes are cached, including documents
+    that stay too short.
+    """
+    loop = asyncio.get_running_loop()
+    jobs: list[tuple[ConvertedDocument, asyncio.Future]] = []
+    # Final (file, content, structure) of every document, for the cache
+    outcomes: list[tuple[bytes, str, DoclingDocument | None]] = []
+    for first_pass in incomplete_documents:
+        data = files[first_pass.name]
+        pages = pages_without_text(first_pass.document)
+        if not pages:
+            logger.info(f"Document {first_pass.name} has no pages without text to OCR")
+            outcomes.append((data, clean_content(first_pass.document.export_to_markdown()), None))
+        elif len(pages) == len(first_pass.document.pages):
+            jobs.append((first_pass, loop.run_in_executor(pool, convert_document, first_pass.name, data, True)))
+        else:
+            logger.info(f"Running OCR on {len(pages)} pages of {first_pass.name}")
+            jobs.append((first_pass, loop.run_in_executor(pool, convert_pages, first_pass.name, data, pages)))
+
+    try:
+        ocr_results = await asyncio.gather(*(future for _, future in jobs))
+    except BrokenProcessPool as e:
+        logger.error(f"Docling conversion pool broke: {e}")
+        reset_conversion_pool()
+        return []
+
+    processed_files: list[ProcessedDocument] = []
+    for (first_pass, _), ocr_res in zip(jobs, ocr_results):
+        if ocr_res.document is not None:
+            content, structure = ocr_res.document.export_to_markdown(), ocr_res.document
+        elif ocr_res.page_markdown:
+            content, structure = merge_pages(first_pass.document, ocr_res.page_markdown), None
+        else:
+            logger.info(f"OCR of document {first_pass.name} failed: {ocr_res.errors}")
+            continue
+
+        content = clean_content(content)
+        # Pages that failed may convert next time
+        if ocr_res.status == ConversionStatus.SUCCESS:
+            outcomes.append((files[first_pass.name], content, structure))
+        if not is_content_sufficient(content):
+            logger.info(f"Document {first_pass.name} has too little content even with OCR")
+            continue
+        processed_files.append(
+            _processed_document(first_pass.name, content, structure, tender_id, document_map)
+        )
+
+    if cache is not None:
+        await asyncio.to_thread(cache.put_many, outcomes)
+
+    logger.info(f"OCR recovered {len(processed_files)} of {len(incomplete_documents)} incomplete documents")
+    return processed_files
@@ -9,6 +9,9 @@ from app.models.document import Document, ProcessedDocument
 from minio import Minio
 
 
+_CONVERSION_CACHE_PREFIX = "conversion-cache/"
+
+
 def _get_tender_prefix(tender_id: uuid.UUID) -> str:
     return f"{tender_id}/"
 
@@ -116,3 +119,22 @@ class MinioService:
                     raise e
 
         return docs
+
+    def get_cached_conversion(self, key: str) -> bytes | None:
+        try:
+            resp = self.__client.get_object(self._bucket, f"{_CONVERSION_CACHE_PREFIX}{key}")
+            with resp:
+                return resp.read()
+        except S3Error as e:
+            if e.code != "NoSuchKey":
+                raise e
+            return None
+
+    def upload_cached_conversion(self, key: str, data: bytes) -> None:
+        self.__client.put_object(
+            self._bucket,
+            f"{_CONVERSION_CACHE_PREFIX}{key}",
+            BytesIO(data),
+            len(data),
+            "application/gzip",
+        )
@@ -0,0 +1,74 @@
+"""Qdrant collection and search settings built from the rag.collection section of config.yaml."""
+
+from typing import Optional
+
+from qdrant_client import models
+
+SCALAR_QUANTIZATION = "scalar"
+BINARY_QUANTIZATION = "binary"
+DEFAULT_SCALAR_QUANTILE = 0.99
+DEFAULT_OVERSAMPLING = 2.0
+
+
+def hnsw_config(collection_config: dict, payload_m: Optional[int] = None) -> Optional[models.HnswConfigDiff]:
+    hnsw = collection_config.get("hnsw", {})
+    if not hnsw and payload_m is None:
+        return None
+    return models.HnswConfigDiff(
+        m=hnsw.get("m"),
+        ef_construct=hnsw.get("ef_construct"),
+        full_scan_threshold=hnsw.get("full_scan_threshold"),
+        on_disk=hnsw.get("on_disk"),
+        payload_m=payload_m,
+    )
+
+
+def quantization_config(collection_config: dict) -> Optional[models.QuantizationConfig]:
+    quantization = collection_config.get("quantization") or {}
+    kind = quantization.get("type")
+    # Quantized vectors are what the search walks, keep them in RAM by default
+    always_ram = quantization.get("always_ram", True)
+
+    match kind:
+        case None:
+            return None
+        case "scalar":
+            return models.ScalarQuantization(
+                scalar=models.ScalarQuantizationConfig(
+                    type=models.ScalarType.INT8,
+                    quantile=quantization.get("quantile", DEFAULT_SCALAR_QUANTILE),
+                    always_ram=always_ram,
+                )
+            )
+        case "binary":
+            return models.BinaryQuantization(
+                binary=models.BinaryQuantizationConfig(always_ram=always_ram)
+            )
+        case _:
+            raise ValueError(f"Unknown quantization type '{kind}'")
+
+
+def optimizers_config(collection_config: dict) -> Optional[models.OptimizersConfigDiff]:
+    optimizers = collection_config.get("optimizers", {})
+    if not optimizers:
+        return None
+    return models.OptimizersConfigDiff(
+        indexing_threshold=optimizers.get("indexing_threshold"),
+        default_segment_number=optimizers.get("default_segment_number"),
+    )
+
+
+def search_params(collection_config: dict) -> Optional[models.SearchParams]:
+    """Search-time HNSW ef and, for quantized collections, rescoring with the original vectors."""
+    ef = collection_config.get("search_ef")
+    quantization = collection_config.get("quantization") or {}
+    quantization_params = None
+    if quantization.get("type"):
+        quantization_params = models.QuantizationSearchParams(
+            rescore=quantization.get("rescore", True),
+            oversampling=quantization.get("oversampling", DEFAULT_OVERSAMPLING),
+        )
+
+    if ef is None and quantization_params is None:
+        return None
+    return models.SearchParams(hnsw_ef=ef, quantization=quantization_params)
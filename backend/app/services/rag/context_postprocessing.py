@@ -0,0 +1,181 @@
+"""
+Post-retrieval stage that shrinks the context sent to the LLM.
+
+Retrieved chunks overlap (the splitter repeats DEFAULT_CHUNK_OVERLAP tokens
+between neighbours) and often cover the same passage. This stage picks a
+diverse top_k with maximal marginal relevance (MMR), merges chunks that are
+adjacent in the same file and strips the duplicated overlap between them.
+"""
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+import attr
+import numpy as np
+
+from app.services.rag.splitter.recursiv_splitter import toke_length_function
+
+if TYPE_CHECKING:
+    from app.services.rag.rag_service import Chunk
+
+DEFAULT_MMR_LAMBDA = 0.7
+# Characters between two chunks that can only be stripped whitespace
+MAX_MERGE_GAP = 4
+
+
+@dataclass
+class ContextStats:
+    chunks_in: int = 0
+    chunks_out: int = 0
+    merged_chunks: int = 0
+    tokens_before: int = 0
+    tokens_after: int = 0
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+    def __add__(self, other: "ContextStats") -> "ContextStats":
+        return ContextStats(
+            chunks_in=self.chunks_in + other.chunks_in,
+            chunks_out=self.chunks_out + other.chunks_out,
+            merged_chunks=self.merged_chunks + other.merged_chunks,
+            tokens_before=self.tokens_before + other.tokens_before,
+            tokens_after=self.tokens_after + other.tokens_after,
+        )
+
+
+def mmr_select(
+    relevance: np.ndarray, vectors: np.ndarray, top_k: int, mmr_lambda: float = DEFAULT_MMR_LAMBDA
+) -> List[int]:
+    """
+    Indices of top_k candidates chosen by maximal marginal relevance.
+
+    Args:
+        relevance: Relevance of each candidate to the query, higher is better
+        vectors: L2-normalized candidate embeddings, zero rows for unknown vectors
+        top_k: Number of candidates to select
+        mmr_lambda: Trade-off between relevance (1.0) and diversity (0.0)
+
+    Returns:
+        Selected candidate indices in selection order
+    """
+    count = len(relevance)
+    if count <= 1:
+        return list(range(count))
+
+    # Scores of different retrievers aren't comparable to cosine similarities
+    spread = relevance.max() - relevance.min()
+    relevance = (relevance - relevance.min()) / spread if spread > 0 else np.ones(count)
+    similarity = vectors @ vectors.T
+
+    selected = [int(np.argmax(relevance))]
+    max_similarity = similarity[selected[0]].copy()
+    remaining = np.ones(count, dtype=bool)
+    remaining[selected[0]] = False
+
+    while len(selected) < min(top_k, count):
+        scores = mmr_lambda * relevance - (1 - mmr_lambda) * max_similarity
+        scores[~remaining] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        remaining[best] = False
+        np.maximum(max_similarity, similarity[best], out=max_similarity)
+
+    return selected
+
+
+def merge_adjacent(chunks: List["Chunk"]) -> Tuple[List["Chunk"], int]:
+    """
+    Merge chunks of the same file whose text ranges overlap or touch.
+
+    The overlap is only stripped when the texts really agree on it. A merged
+    chunk takes the position and the best score of its highest ranked part.
+
+    Returns:
+        The merged chunks in rank order and the number of chunks merged away
+    """
+    groups: Dict[str, List[Tuple[int, "Chunk"]]] = {}
+    result: List[Optional["Chunk"]] = list(chunks)
+    for rank, chunk in enumerate(chunks):
+        if chunk.start_index is not None:
+            groups.setdefault(chunk.file_id, []).append((rank, chunk))
+
+    merged_away = 0
+    for group in groups.values():
+        group.sort(key=lambda item: item[1].start_index)
+        rank, current = group[0]
+        for next_rank, following in group[1:]:
+            current_end = current.start_index + len(current.content)
+            gap = following.start_index - current_end
+            overlap = -gap
+
+            if gap > MAX_MERGE_GAP or (overlap > 0 and not current.content.endswith(following.content[:overlap])):
+                rank, current = next_rank, following
+                continue
+
+            if following.start_index + len(following.content) <= current_end:
+                content = current.content  # contained entirely
+            elif overlap > 0:
+                content = current.content + following.content[overlap:]
+            else:
+                content = current.content + "\n" + following.content
+
+            scores = [s for s in (current.score, following.score) if s is not None]
+            current = attr.evolve(current, content=content, score=max(scores) if scores else None)
+            result[rank] = None
+            result[next_rank] = None
+            rank = min(rank, next_rank)
+            result[rank] = current
+            merged_away += 1
+
+    return [chunk for chunk in result if chunk is not None], merged_away
+
+
+class ContextPostprocessor:
+    def __init__(self, mmr_lambda: float = DEFAULT_MMR_LAMBDA, merge_adjacent_chunks: bool = True):
+        self.mmr_lambda = mmr_lambda
+        self.merge_adjacent_chunks = merge_adjacent_chunks
+
+    def process(
+        self, chunks: List["Chunk"], vectors: Dict[str, np.ndarray], top_k: int
+    ) -> Tuple[List["Chunk"], ContextStats]:
+        """
+        Select a diverse top_k from ranked candidates and merge overlapping neighbours.
+
+        Args:
+            chunks: Candidates ranked by relevance, best first
+            vectors: Dense vectors of the candidates by point ID
+            top_k: Number of chunks the caller asked for
+
+        Returns:
+            The final chunks and the token statistics against the plain top_k
+        """
+        if not chunks:
+            return [], ContextStats()
+
+        dimension = next((len(v) for v in vectors.values()), 0)
+        matrix = np.zeros((len(chunks), dimension), dtype=np.float32)
+        for i, chunk in enumerate(chunks):
+            vector = vectors.get(chunk.point_id)
+            if vector is not None and dimension:
+                matrix[i] = vector / max(float(np.linalg.norm(vector)), 1e-12)
+
+        relevance = np.array(
+            [chunk.score if chunk.score is not None else -i for i, chunk in enumerate(chunks)],
+            dtype=np.float32,
+        )
+        selected = [chunks[i] for i in mmr_select(relevance, matrix, top_k, self.mmr_lambda)]
+
+        merged_away = 0
+        if self.merge_adjacent_chunks:
+            selected, merged_away = merge_adjacent(selected)
+
+        stats = ContextStats(
+            chunks_in=min(top_k, len(chunks)),
+            chunks_out=len(selected),
+            merged_chunks=merged_away,
+            tokens_before=sum(toke_length_function(chunk.content) for chunk in chunks[:top_k]),
+            tokens_after=sum(toke_length_function(chunk.content) for chunk in selected),
+        )
+        return selected, stats
@@ -1,21 +1,73 @@
 from app.embedding.provider.base_embedding import BaseEmbedding
-from typing import List, Optional
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import aclosing
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
 import uuid
 import asyncio
+import hashlib
+import heapq
+import itertools
+import math
+import numpy as np
+import attr
 from attr import dataclass, asdict
 from qdrant_client import AsyncQdrantClient, models
+from app.config.app_config import _load_config
 from app.config.settings import SettingsDep
-from app.services.rag.reranker.rank_llm import RankLlm
+from app.services.rag import collection_settings
+from app.services.rag.context_postprocessing import (
+    DEFAULT_MMR_LAMBDA,
+    ContextPostprocessor,
+    ContextStats,
+)
+from app.services.rag.reranker.base_reranker import BaseReranker
+from app.services.rag.retrieval_cache import RetrievalCache, get_retrieval_cache
+from app.services.rag.sparse.bm25_encoder import Bm25Encoder, chunk_terms
+from app.services.rag.splitter.docling_splitter import DoclingSplitter
+from app.services.rag.splitter.hierarchical_splitter import PARENT_LEVEL, HierarchicalSplitter
 from app.services.rag.splitter.recursiv_splitter import RecursiveSplitter
+from app.services.rag.splitter.split_pool import (
+    DEFAULT_SPLIT_WORKERS,
+    get_split_pool,
+    reset_split_pool,
+    split_document,
+)
+from app.services.rag.tender_collections import (
+    TENDER_ID_FIELD,
+    TenderCollections,
+    get_tender_collections,
+)
 from app.models.document import ProcessedDocument
+from app.repos.index_manifest_repo import IndexManifestRepo
+from langchain_core.documents import Document
 
 from app.config.logger import logger
 
 # Constants
 DEFAULT_CHUNK_SIZE = 1500
 DEFAULT_CHUNK_OVERLAP = 300
-DEFAULT_EMBEDDING_VECTOR_SIZE = 768
 DEFAULT_TOP_K = 10
+DEFAULT_INDEX_BATCH_SIZE = 128
+DEFAULT_UPSERT_PARALLELISM = 4
+DEFAULT_UPSERT_MAX_RETRIES = 3
+UPSERT_RETRY_BASE_DELAY = 0.5
+SCROLL_PAGE_SIZE = 1000
+CHUNK_ID_NAMESPACE = uuid.UUID("6f1c3e52-8d4a-4b7e-9c1f-2a5d7e9b0c34")
+SHARED_HNSW_PAYLOAD_M = 16
+MIN_GLOBAL_CANDIDATES = 3
+GLOBAL_CANDIDATE_HEADROOM = 2
+SPARSE_VECTOR_NAME = "bm25"
+DEFAULT_PREFETCH_LIMIT = 50
+DEFAULT_RERANK_OVER_FETCH = 3
+LEVEL_FIELD = "level"
+PARENT_ID_SUFFIX = "#parent"
+
+# Keeps background tasks referenced until they finish
+_background_tasks: Set[asyncio.Task] = set()
+
+# Whether a collection has the sparse vector; fixed at creation, so it is cached
+# across RagService instances (they are created per request)
+_sparse_collections: Dict[str, bool] = {}
 
 
 @dataclass(frozen=True)
@@ -24,99 +76,1052 @@ class Chunk:
     file_name: str
     file_id: str
     tender_id: Optional[str] = None  # For global retrieval
+    score: Optional[float] = None  # Relevance to the query (similarity or RRF score), set on retrieval
+    point_id: Optional[str] = None  # Set on retrieval
+    chunk_index: Optional[int] = None  # Position of the chunk within its file
+    start_index: Optional[int] = None  # Character offset of the chunk within its file
+    # Hierarchical index: children are searched, their parent section is returned
+    level: Optional[str] = None
+    headings: Optional[List[str]] = None
+    parent_id: Optional[str] = None
+    child_ids: Optional[List[str]] = None
+    pages: Optional[List[int]] = None  # Pages of the source file, for chunks split from the Docling document
+
+
+def chunk_payload(chunk: Chunk) -> dict:
+    """Point payload of a chunk; score and point ID belong to a search hit, not to the point."""
+    return asdict(chunk, filter=lambda attribute, _: attribute.name not in ("score", "point_id"))
+
+
+def point_vector(point: models.ScoredPoint) -> Optional[np.ndarray]:
+    """Dense vector of a search hit requested with with_vector, None if it has none."""
+    vector = point.vector
+    if isinstance(vector, dict):
+        vector = vector.get("")
+    if not vector:
+        return None
+    return np.asarray(vector, dtype=np.float32)
+
+
+def cosine_similarity(vector: Optional[np.ndarray], query_vector: np.ndarray) -> float:
+    """Cosine similarity as Qdrant computes it for COSINE collections, -1 without a vector."""
+    if vector is None:
+        return -1.0
+    norms = np.linalg.norm(vector) * np.linalg.norm(query_vector)
+    return float(vector @ query_vector / max(norms, 1e-12))
+
+
+def run_in_background(coroutine) -> None:
+    task = asyncio.create_task(coroutine)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+def hierarchical_indexing_enabled() -> bool:
+    return _load_config().get("rag", {}).get("indexing", {}).get("hierarchical", {}).get("enabled", False)
+
+
+def children_filter(query_filter: Optional[models.Filter]) -> models.Filter:
+    """Restrict a search to the searchable chunks, parents are only fetched by ID."""
+    exclude_parents = models.FieldCondition(key=LEVEL_FIELD, match=models.MatchValue(value=PARENT_LEVEL))
+    if query_filter is None:
+        return models.Filter(must_not=[exclude_parents])
+    return models.Filter(must=[query_filter], must_not=[exclude_parents])
+
+
+def lift_to_parents(chunks: List[Chunk], parents: Dict[str, Chunk]) -> List[Chunk]:
+    """
+    Replace ranked children by their parents ("small-to-big").
+
+    Each parent appears once, at the rank and with the score of its best child.
+    Chunks without a known parent (e.g. from a flat index) are kept as they are.
+    """
+    lifted: List[Chunk] = []
+    seen: Set[str] = set()
+    for chunk in chunks:
+        parent = parents.get(chunk.parent_id) if chunk.parent_id else None
+        if parent is not None:
+            chunk = attr.evolve(parent, score=chunk.score)
+        if chunk.point_id in seen:
+            continue
+        seen.add(chunk.point_id)
+        lifted.append(chunk)
+    return lifted
+
+
+def point_to_chunk(point: models.ScoredPoint, tender_id: Optional[str] = None) -> Optional[Chunk]:
+    """Build a chunk from a search hit or retrieved point, None if its payload is incomplete."""
+    payload = point.payload or {}
+    content = payload.get("content")
+    file_name = payload.get("file_name")
+    file_id = payload.get("file_id")
+    tender_id = payload.get(TENDER_ID_FIELD) or tender_id
+    if not (content and file_name and file_id):
+        return None
+    return Chunk(
+        content=content,
+        file_name=file_name,
+        file_id=file_id,
+        tender_id=tender_id,
+        score=getattr(point, "score", None),
+        point_id=str(point.id),
+        chunk_index=payload.get("chunk_index"),
+        start_index=payload.get("start_index"),
+        level=payload.get(LEVEL_FIELD),
+        headings=payload.get("headings"),
+        parent_id=payload.get("parent_id"),
+        child_ids=payload.get("child_ids"),
+        pages=payload.get("pages"),
+    )
+
+
+def candidate_limit(top_k: int, num_tenders: int) -> int:
+    """
+    Candidates to fetch per tender for a global search.
+
+    A single tender needs the full top_k; with many tenders each only has to
+    supply its fair share plus some headroom, down to a small floor.
+    """
+    share = math.ceil(top_k * GLOBAL_CANDIDATE_HEADROOM / max(num_tenders, 1))
+    return min(top_k, max(MIN_GLOBAL_CANDIDATES, share))
+
+
+def merge_by_score(ranked_lists: List[List[Chunk]], top_k: int) -> List[Chunk]:
+    """K-way merge of lists sorted by descending score, stopping after top_k chunks."""
+    merged = heapq.merge(*ranked_lists, key=lambda chunk: -chunk.score)
+    return list(itertools.islice(merged, top_k))
+
+
+def chunk_point_id(file_id: str, content: str) -> str:
+    """
+    Deterministic point ID of a chunk, stable across re-indexing runs.
+
+    Children pass their parent's ID as file_id, so a changed parent re-keys its
+    children and their parent_id payload never goes stale.
+    """
+    content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+    return str(uuid.uuid5(CHUNK_ID_NAMESPACE, f"{file_id}:{content_hash}"))
+
+
+def parent_vectors(
+    child_ids: List[List[str]], child_vectors: Dict[str, np.ndarray]
+) -> Optional[np.ndarray]:
+    """
+    Vectors of parents as the normalized mean of their children's vectors.
+
+    Parents are never searched by similarity, only MMR compares them, so this
+    saves embedding every section twice. None if a child's vector isn't at hand
+    (e.g. it was indexed by an earlier, interrupted run).
+    """
+    if any(child_id not in child_vectors for ids in child_ids for child_id in ids):
+        return None
+    means = np.stack([np.mean([child_vectors[child_id] for child_id in ids], axis=0) for ids in child_ids])
+    return means / np.maximum(np.linalg.norm(means, axis=1, keepdims=True), 1e-12)
+
+
+def document_to_chunk(document: Document, tender_id: uuid.UUID) -> Chunk:
+    metadata = document.metadata
+    return Chunk(
+        content=document.page_content,
+        file_name=metadata.get("file_name") or "",
+        file_id=metadata.get("file_id") or "",
+        tender_id=str(tender_id),
+        chunk_index=metadata.get("chunk_index"),
+        start_index=metadata.get("start_index"),
+        level=metadata.get("level"),
+        headings=metadata.get("headings"),
+        parent_id=metadata.get("parent_id"),
+        child_ids=metadata.get("child_ids"),
+        pages=metadata.get("pages"),
+    )
+
+
+def points_batch(
+    ids: List[str],
+    vectors: np.ndarray,
+    payloads: List[dict],
+    sparse_vectors: Optional[List[models.SparseVector]] = None,
+) -> models.Batch:
+    """
+    Build an upsert batch from an embedding matrix.
+
+    The matrix stays a contiguous float32 array until here; the HTTP client needs
+    plain lists, so it is converted once per batch in C instead of per element.
+    """
+    if sparse_vectors is None:
+        return models.Batch(ids=ids, vectors=vectors.tolist(), payloads=payloads)
+    # "" is the unnamed dense vector
+    return models.Batch(
+        ids=ids,
+        vectors={"": vectors.tolist(), SPARSE_VECTOR_NAME: sparse_vectors},
+        payloads=payloads,
+    )
 
 
 class RagService:
-    def __init__(self, settings: SettingsDep, embedding_provider: BaseEmbedding):
+    def __init__(
+        self,
+        settings: SettingsDep,
+        embedding_provider: BaseEmbedding,
+        client: Optional[AsyncQdrantClient] = None,
+        manifest_repo: Optional[IndexManifestRepo] = None,
+        collections: Optional[TenderCollections] = None,
+        reranker: Optional[BaseReranker] = None,
+        retrieval_cache: Optional[RetrievalCache] = None,
+    ):
         self.settings = settings
         self.splitter = RecursiveSplitter(chunk_size=DEFAULT_CHUNK_SIZE, chunk_overlap=DEFAULT_CHUNK_OVERLAP)
-        self.client = AsyncQdrantClient(
+        self.client = client or AsyncQdrantClient(
             url=self.settings.QDRANT_URI, api_key=self.settings.QDRANT_API_KEY
         )
 
-        self.reranker: Optional[RankLlm] = None
+        self.reranker: Optional[BaseReranker] = reranker
         self.embedding_provider = embedding_provider
+        self.manifest_repo = manifest_repo
+        self.collections = collections or get_tender_collections()
+        self.retrieval_cache = retrieval_cache or get_retrieval_cache()
+
+        rag_config = _load_config().get("rag", {})
+        self.indexing_config: dict = rag_config.get("indexing", {})
+        self.retrieval_config: dict = rag_config.get("retrieval", {})
+        self.collection_config: dict = rag_config.get("collection", {})
+        self.search_params = collection_settings.search_params(self.collection_config)
+        self.rerank_over_fetch: int = _load_config().get("reranker", {}).get(
+            "over_fetch", DEFAULT_RERANK_OVER_FETCH
+        )
+
+        hierarchical = self.indexing_config.get("hierarchical", {})
+        self.hierarchical_splitter: Optional[HierarchicalSplitter] = None
+        if hierarchical.get("enabled", False):
+            self.hierarchical_splitter = HierarchicalSplitter(
+                parent_chunk_size=hierarchical.get("parent_chunk_size", DEFAULT_CHUNK_SIZE),
+                child_chunk_size=hierarchical.get("child_chunk_size", 300),
+                child_chunk_overlap=hierarchical.get("child_chunk_overlap", 50),
+            )
+
+        # Documents that still carry their Docling document are chunked along its structure
+        self.docling_splitter: Optional[DoclingSplitter] = None
+        if self.indexing_config.get("structure_aware", False):
+            self.docling_splitter = DoclingSplitter(
+                chunk_size=DEFAULT_CHUNK_SIZE,
+                chunk_overlap=DEFAULT_CHUNK_OVERLAP,
+                parent_chunk_size=hierarchical.get("parent_chunk_size", DEFAULT_CHUNK_SIZE),
+                child_chunk_size=hierarchical.get("child_chunk_size", 300),
+                child_chunk_overlap=hierarchical.get("child_chunk_overlap", 50),
+            )
+
+        self.sparse_encoder: Optional[Bm25Encoder] = None
+        if self.retrieval_config.get("hybrid", False):
+            bm25 = dict(self.retrieval_config.get("bm25", {}))
+            if not bm25.get("avg_doc_length"):
+                # Only the searched chunks get sparse vectors: the children of a hierarchical index
+                searched_chunk_size = (
+                    hierarchical.get("child_chunk_size", 300) if self.hierarchical_splitter else DEFAULT_CHUNK_SIZE
+                )
+                bm25["avg_doc_length"] = chunk_terms(searched_chunk_size)
+            self.sparse_encoder = Bm25Encoder(**bm25)
+
+        postprocessing = self.retrieval_config.get("postprocessing", {})
+        self.postprocessor: Optional[ContextPostprocessor] = None
+        if postprocessing.get("enabled", False):
+            self.postprocessor = ContextPostprocessor(
+                mmr_lambda=postprocessing.get("mmr_lambda", DEFAULT_MMR_LAMBDA),
+                merge_adjacent_chunks=postprocessing.get("merge_adjacent", True),
+            )
+        # Token statistics of the last retrieve_chunks_batch call
+        self.last_context_stats = ContextStats()
+
+    async def create_collection(self, collection_name: str) -> bool:
+        """
+        Create the collection if it doesn't exist yet.
+
+        Returns:
+            Whether the collection was created, i.e. holds no points yet
+        """
+        vector_size = await self.embedding_provider.get_dimension()
 
-    async def create_collection(self, collection_name: str):
         if not await self.client.collection_exists(collection_name):
             await self.client.create_collection(
                 collection_name=collection_name,
                 vectors_config=models.VectorParams(
-                    size=DEFAULT_EMBEDDING_VECTOR_SIZE, distance=models.Distance.COSINE
+                    size=vector_size,
+                    distance=models.Distance.COSINE,
+                    on_disk=self.collection_config.get("on_disk_vectors"),
+                ),
+                # Extra HNSW links between points of the same tender keep filtered search fast
+                hnsw_config=collection_settings.hnsw_config(
+                    self.collection_config,
+                    payload_m=SHARED_HNSW_PAYLOAD_M if self.collections.shared else None,
+                ),
+                quantization_config=collection_settings.quantization_config(self.collection_config),
+                optimizers_config=collection_settings.optimizers_config(self.collection_config),
+                on_disk_payload=self.collection_config.get("on_disk_payload"),
+                # Qdrant computes the IDF part of BM25 from the collection statistics
+                sparse_vectors_config=(
+                    {SPARSE_VECTOR_NAME: models.SparseVectorParams(modifier=models.Modifier.IDF)}
+                    if self.sparse_encoder
+                    else None
                 ),
             )
-            logger.info(f"Successfully created collection {collection_name}")
+            _sparse_collections[collection_name] = self.sparse_encoder is not None
+            if self.collections.shared:
+                await self.client.create_payload_index(
+                    collection_name=collection_name,
+                    field_name=TENDER_ID_FIELD,
+                    field_schema=models.KeywordIndexParams(
+                        type=models.KeywordIndexType.KEYWORD, is_tenant=True
+                    ),
+                )
+            if self.hierarchical_splitter:
+                # Every search filters parents out
+                await self.client.create_payload_index(
+                    collection_name=collection_name,
+                    field_name=LEVEL_FIELD,
+                    field_schema=models.PayloadSchemaType.KEYWORD,
+                )
+            logger.info(f"Successfully created collection {collection_name} ({vector_size}-d)")
+            return True
         else:
+            collection_size = await self.get_collection_dimension(collection_name)
+            if collection_size != vector_size:
+                raise ValueError(
+                    f"Collection {collection_name} stores {collection_size}-d vectors but the "
+                    f"embedding provider returns {vector_size}-d vectors, re-create the collection"
+                )
+            if self.sparse_encoder and not await self._has_sparse_vectors(collection_name):
+                logger.warning(
+                    f"Collection {collection_name} was created without sparse vectors, "
+                    f"it is indexed and searched dense-only until it is re-created"
+                )
             logger.info(f"Collection {collection_name} already exists")
+            return False
+
+    async def get_collection_dimension(self, collection_name: str) -> Optional[int]:
+        """Read the vector size the collection was created with."""
+        info = await self.client.get_collection(collection_name)
+        vectors = info.config.params.vectors
+        if isinstance(vectors, models.VectorParams):
+            return vectors.size
+        return None
+
+    async def _has_sparse_vectors(self, collection_name: str) -> bool:
+        if collection_name not in _sparse_collections:
+            info = await self.client.get_collection(collection_name)
+            sparse_vectors = info.config.params.sparse_vectors or {}
+            _sparse_collections[collection_name] = SPARSE_VECTOR_NAME in sparse_vectors
+        return _sparse_collections[collection_name]
+
+    async def _is_hybrid(self, collection_name: str) -> bool:
+        """Whether searches of the collection fuse dense and BM25 hits (with RRF scores)."""
+        return self.sparse_encoder is not None and await self._has_sparse_vectors(collection_name)
+
+    async def _query_request(
+        self,
+        collection_name: str,
+        query: str,
+        query_vector: np.ndarray,
+        query_filter: Optional[models.Filter],
+        limit: int,
+        with_vector: bool = False,
+    ) -> models.QueryRequest:
+        """
+        Build the search request for a collection, hybrid if it has sparse vectors: the
+        dense and the BM25 candidates are fetched and fused with reciprocal rank fusion.
+        """
+        if self.hierarchical_splitter:
+            query_filter = children_filter(query_filter)
+        # MMR needs the dense vectors of the hits
+        with_vector = with_vector or self.postprocessor is not None
+        if not await self._is_hybrid(collection_name):
+            return models.QueryRequest(
+                query=query_vector.tolist(),
+                filter=query_filter,
+                params=self.search_params,
+                limit=limit,
+                with_payload=True,
+                with_vector=with_vector,
+            )
+
+        prefetch_limit = max(limit, self.retrieval_config.get("prefetch_limit", DEFAULT_PREFETCH_LIMIT))
+        return models.QueryRequest(
+            prefetch=[
+                models.Prefetch(
+                    query=query_vector.tolist(),
+                    filter=query_filter,
+                    params=self.search_params,
+                    limit=prefetch_limit,
+                ),
+                models.Prefetch(
+                    query=self.sparse_encoder.encode_query(query),
+                    using=SPARSE_VECTOR_NAME,
+                    filter=query_filter,
+                    limit=prefetch_limit,
+                ),
+            ],
+            query=models.FusionQuery(fusion=models.Fusion.RRF),
+            limit=limit,
+            with_payload=True,
+            with_vector=with_vector,
+        )
+
+    async def _query(
+        self,
+        collection_name: str,
+        query: str,
+        query_vector: np.ndarray,
+        query_filter: Optional[models.Filter],
+        limit: int,
+        with_vector: bool = False,
+    ) -> List[models.ScoredPoint]:
+        request = await self._query_request(
+            collection_name, query, query_vector, query_filter, limit, with_vector
+        )
+        responses = await self.client.query_batch_points(
+            collection_name=collection_name, requests=[request]
+        )
+        return responses[0].points
 
     async def index_tender_documents(
         self, tender_id: uuid.UUID, processed_documents: List[ProcessedDocument]
     ):
-        collection_name = str(tender_id)
+        """
+        Bring the tender's points in line with the given documents.
+
+        Point IDs are derived from (file_id, content hash), so only chunks that
+        aren't indexed yet are embedded. Documents are split in a process pool
+        and each document's chunks are embedded as soon as it is split. With
+        blue/green indexing the tender's index is rebuilt in a new collection and
+        the tender's alias is switched to it once complete; otherwise the live
+        collection is updated in place and only chunks that no longer exist are
+        deleted.
+        """
+        if self.collections.blue_green:
+            point_ids = await self._rebuild_tender_collection(tender_id, processed_documents)
+        else:
+            point_ids = await self._update_tender_collection(tender_id, processed_documents)
+
+        if self.manifest_repo:
+            self.manifest_repo.save_point_ids(tender_id, list(point_ids))
+        elif self.retrieval_cache:
+            self.retrieval_cache.bump_local_version(tender_id)
+
+    def _splitter_for(self, processed_document: ProcessedDocument):
+        if self.docling_splitter and processed_document.structure is not None:
+            return self.docling_splitter
+        return self.hierarchical_splitter or self.splitter
+
+    async def _split_chunks(
+        self, processed_documents: List[ProcessedDocument]
+    ) -> AsyncIterator[Tuple[Dict[str, Document], Dict[str, Document]]]:
+        """
+        Split documents into the searchable chunks and, for a hierarchical index, their parents.
 
-        await self.create_collection(collection_name)
+        All documents are submitted to the split pool at once; the chunks of each
+        document are yielded in document order as soon as it is split. Chunks
+        already yielded for an earlier document are left out.
+        """
+        loop = asyncio.get_running_loop()
+        pool = get_split_pool(self.indexing_config.get("split_workers", DEFAULT_SPLIT_WORKERS))
+        hierarchical = self.hierarchical_splitter is not None
+        futures = [
+            loop.run_in_executor(pool, split_document, self._splitter_for(document), hierarchical, document)
+            for document in processed_documents
+        ]
 
-        chunks = self.splitter.split_documents(processed_documents)
+        seen_ids: Set[str] = set()
         try:
-            # Parallelize embedding operations for better performance
-            async def create_point_struct(i: int, chunk) -> models.PointStruct:
-                vector = await self.embedding_provider.embed_query(chunk.page_content)
-                return models.PointStruct(
-                    id=i,
-                    vector=vector,
-                    payload=asdict(
-                        Chunk(
-                            content=chunk.page_content,
-                            file_name=chunk.metadata.get("file_name") or "",
-                            file_id=chunk.metadata.get("file_id") or "",
-                        )
-                    ),
-                )
-            
-            # Create all point structs in parallel
-            points = await asyncio.gather(*[
-                create_point_struct(i, chunk) for i, chunk in enumerate(chunks)
-            ])
-            
-            await self.client.upsert(
+            for future in futures:
+                chunks_by_id: Dict[str, Document] = {}
+                parents_by_id: Dict[str, Document] = {}
+                if hierarchical:
+                    for parent, children in await future:
+                        file_id = parent.metadata.get("file_id") or ""
+                        parent_id = chunk_point_id(file_id + PARENT_ID_SUFFIX, parent.page_content)
+                        if parent_id in seen_ids:
+                            continue
+                        seen_ids.add(parent_id)
+                        child_ids = []
+                        for child in children:
+                            child.metadata["parent_id"] = parent_id
+                            child_id = chunk_point_id(parent_id, child.page_content)
+                            if child_id not in seen_ids:
+                                seen_ids.add(child_id)
+                                chunks_by_id[child_id] = child
+                                child_ids.append(child_id)
+                        parent.metadata["child_ids"] = child_ids
+                        parents_by_id[parent_id] = parent
+                else:
+                    for chunk in await future:
+                        point_id = chunk_point_id(chunk.metadata.get("file_id") or "", chunk.page_content)
+                        if point_id not in seen_ids:
+                            seen_ids.add(point_id)
+                            chunks_by_id[point_id] = chunk
+                yield chunks_by_id, parents_by_id
+        except BrokenProcessPool:
+            reset_split_pool()
+            raise
+        finally:
+            for future in futures:
+                future.cancel()
+
+    async def _update_tender_collection(
+        self, tender_id: uuid.UUID, processed_documents: List[ProcessedDocument]
+    ) -> Set[str]:
+        """Update the live collection in place, returns the IDs of the tender's points."""
+        collection_name = self.collections.collection_name(tender_id)
+        if await self.create_collection(collection_name) and self.manifest_repo:
+            # A new (or re-created) collection holds none of the points the manifest lists
+            self.manifest_repo.delete_manifest(tender_id)
+
+        indexed_ids = await self._get_indexed_point_ids(tender_id, collection_name)
+        point_ids: Set[str] = set()
+        new_count = 0
+        async with aclosing(self._split_chunks(processed_documents)) as split_chunks:
+            async for children_by_id, parents_by_id in split_chunks:
+                chunk_ids = [*children_by_id, *parents_by_id]
+                point_ids.update(chunk_ids)
+                new_ids = [point_id for point_id in chunk_ids if point_id not in indexed_ids]
+                if not new_ids:
+                    continue
+
+                new_count += len(new_ids)
+                await self._write_new_chunks(collection_name, tender_id, new_ids, children_by_id, parents_by_id)
+
+        stale_ids = list(indexed_ids - point_ids)
+        logger.info(
+            f"Tender {tender_id}: {len(point_ids)} chunks, {new_count} new, "
+            f"{len(stale_ids)} stale, {len(point_ids) - new_count} unchanged"
+        )
+        if stale_ids:
+            await self.client.delete(
                 collection_name=collection_name,
-                points=points,
+                points_selector=models.PointIdsList(points=stale_ids),
+            )
+            logger.info(f"Deleted {len(stale_ids)} stale chunks")
+        return point_ids
+
+    async def _rebuild_tender_collection(
+        self, tender_id: uuid.UUID, processed_documents: List[ProcessedDocument]
+    ) -> Set[str]:
+        """
+        Build the tender's index in a new generation collection and switch its alias.
+
+        Readers keep using the live collection until the alias switch, which is
+        atomic. Unchanged points are copied over with their vectors instead of
+        being embedded again. If anything fails, the new collection is dropped and
+        the live one is left untouched.
+
+        Returns:
+            The IDs of the tender's points
+        """
+        alias = self.collections.collection_name(tender_id)
+        live = await self._live_collection(alias)
+        target = self.collections.new_generation(tender_id)
+        await self.create_collection(target)
+
+        point_ids: Set[str] = set()
+        try:
+            indexed_ids: Set[str] = set()
+            if live is not None:
+                if await self.get_collection_dimension(live) != await self.get_collection_dimension(target):
+                    logger.info(f"{live} has vectors of another dimension, all chunks are embedded again")
+                else:
+                    indexed_ids = await self._get_indexed_point_ids(tender_id, live)
+
+            copied_count = 0
+            async with aclosing(self._split_chunks(processed_documents)) as split_chunks:
+                async for children_by_id, parents_by_id in split_chunks:
+                    chunk_ids = [*children_by_id, *parents_by_id]
+                    point_ids.update(chunk_ids)
+                    unchanged_ids = [point_id for point_id in chunk_ids if point_id in indexed_ids]
+                    copied_ids = await self._copy_points(live, target, unchanged_ids)
+                    copied_count += len(copied_ids)
+
+                    # Points the live collection didn't actually have are embedded like new ones
+                    new_ids = [point_id for point_id in chunk_ids if point_id not in copied_ids]
+                    await self._write_new_chunks(target, tender_id, new_ids, children_by_id, parents_by_id)
+
+            logger.info(
+                f"Tender {tender_id}: {len(point_ids)} chunks into {target}, "
+                f"{len(point_ids) - copied_count} new, {copied_count} copied from {live}"
+            )
+        except Exception:
+            logger.error(f"Indexing tender {tender_id} into {target} failed, {live} stays live")
+            await self.client.delete_collection(target)
+            raise
+
+        await self._switch_alias(alias, target, live)
+        logger.info(f"Tender {tender_id}: alias {alias} now points to {target}")
+        run_in_background(self._drop_old_generations(tender_id, keep=live))
+        return point_ids
+
+    async def _write_new_chunks(
+        self,
+        collection_name: str,
+        tender_id: uuid.UUID,
+        new_ids: List[str],
+        children_by_id: Dict[str, Document],
+        parents_by_id: Dict[str, Document],
+    ) -> None:
+        new_child_ids = [i for i in new_ids if i in children_by_id]
+        child_vectors = await self._upsert_chunks(
+            collection_name, tender_id, new_child_ids, [children_by_id[i] for i in new_child_ids]
+        )
+        new_parent_ids = [i for i in new_ids if i in parents_by_id]
+        if new_parent_ids:
+            await self._upsert_chunks(
+                collection_name,
+                tender_id,
+                new_parent_ids,
+                [parents_by_id[i] for i in new_parent_ids],
+                vectors=parent_vectors(
+                    [parents_by_id[i].metadata["child_ids"] for i in new_parent_ids],
+                    dict(zip(new_child_ids, child_vectors)),
+                ),
+                with_sparse=False,
+            )
+
+    async def _live_collection(self, alias: str) -> Optional[str]:
+        """Collection the tender's alias points to, the alias itself for a collection indexed before aliases."""
+        response = await self.client.get_aliases()
+        for description in response.aliases:
+            if description.alias_name == alias:
+                return description.collection_name
+        if await self.client.collection_exists(alias):
+            return alias
+        return None
+
+    async def _copy_points(self, source: str, target: str, point_ids: List[str]) -> Set[str]:
+        """Copy points with their vectors and payload, returns the IDs that were found in source."""
+        if not point_ids:
+            return set()
+
+        sparse = self.sparse_encoder is not None and await self._has_sparse_vectors(target)
+        copied: Set[str] = set()
+        for start in range(0, len(point_ids), SCROLL_PAGE_SIZE):
+            records = await self.client.retrieve(
+                collection_name=source,
+                ids=point_ids[start : start + SCROLL_PAGE_SIZE],
+                with_payload=True,
+                with_vectors=True,
+            )
+            points = []
+            for record in records:
+                payload = record.payload or {}
+                named = record.vector if isinstance(record.vector, dict) else {"": record.vector}
+                vector = named[""]
+                if sparse and payload.get(LEVEL_FIELD) != PARENT_LEVEL:
+                    # Points from a dense-only collection get their BM25 vector now
+                    sparse_vector = named.get(SPARSE_VECTOR_NAME) or self.sparse_encoder.encode_document(
+                        payload.get("content") or ""
+                    )
+                    vector = {"": vector, SPARSE_VECTOR_NAME: sparse_vector}
+                points.append(models.PointStruct(id=record.id, vector=vector, payload=payload))
+            if points:
+                await self.client.upsert(collection_name=target, points=points, wait=True)
+            copied.update(str(record.id) for record in records)
+        return copied
+
+    async def _switch_alias(self, alias: str, target: str, live: Optional[str]) -> None:
+        if live == alias:
+            # A collection from before blue/green indexing holds the alias name; it has to go
+            # before the alias can be created, so this one switch isn't gap-free
+            await self.client.delete_collection(alias)
+            live = None
+
+        operations = []
+        if live is not None:
+            operations.append(models.DeleteAliasOperation(delete_alias=models.DeleteAlias(alias_name=alias)))
+        operations.append(
+            models.CreateAliasOperation(
+                create_alias=models.CreateAlias(collection_name=target, alias_name=alias)
             )
-            logger.info(f"Successfully upserted {len(chunks)} chunks")
+        )
+        # Both operations are applied atomically
+        await self.client.update_collection_aliases(change_aliases_operations=operations)
+        _sparse_collections.pop(alias, None)
+
+    async def _generations(self, tender_id: uuid.UUID) -> List[str]:
+        response = await self.client.get_collections()
+        return self.collections.generations(
+            tender_id, [collection.name for collection in response.collections]
+        )
+
+    async def _drop_old_generations(self, tender_id: uuid.UUID, keep: Optional[str]) -> None:
+        """Delete the generations before the live one, except keep, the previously live one for rollback."""
+        try:
+            live = await self._live_collection(self.collections.collection_name(tender_id))
+            generations = await self._generations(tender_id)
+            if live not in generations:
+                return
+            # Newer generations may be an indexing run in progress
+            for collection_name in generations[: generations.index(live)]:
+                if collection_name != keep:
+                    await self.client.delete_collection(collection_name)
+                    logger.info(f"Deleted old index generation {collection_name}")
         except Exception as e:
-            await self.client.delete_collection(collection_name)
+            logger.warning(f"Cleaning up old index generations of tender {tender_id} failed: {e}")
 
-            logger.error(f"Error upserting chunks: {e}")
-            raise e
+    async def rollback_tender_index(self, tender_id: uuid.UUID) -> str:
+        """
+        Point the tender's alias back to the previous index generation.
 
-    async def retrieve_chunks(self, tender_id: uuid.UUID, query: str, top_k: int = DEFAULT_TOP_K):
-        query_vector = await self.embedding_provider.embed_query(query)
-        res = await self.client.search(
-            collection_name=str(tender_id),
-            query_vector=query_vector,
-            limit=top_k,
+        Returns:
+            Name of the collection that is live now
+        """
+        alias = self.collections.collection_name(tender_id)
+        live = await self._live_collection(alias)
+        generations = await self._generations(tender_id)
+        if live not in generations or generations.index(live) == 0:
+            raise ValueError(f"Tender {tender_id} has no previous index generation to roll back to")
+
+        previous = generations[generations.index(live) - 1]
+        await self._switch_alias(alias, previous, live)
+        if self.manifest_repo:
+            point_ids = await self._scroll_point_ids(tender_id, previous)
+            self.manifest_repo.save_point_ids(tender_id, list(point_ids))
+        elif self.retrieval_cache:
+            self.retrieval_cache.bump_local_version(tender_id)
+        logger.info(f"Tender {tender_id}: rolled back from {live} to {previous}")
+        return previous
+
+    async def _get_indexed_point_ids(self, tender_id: uuid.UUID, collection_name: str) -> Set[str]:
+        """
+        IDs of the tender's points in the collection.
+
+        The manifest is trusted only while the collection holds as many of the
+        tender's points as it lists; a collection that was dropped, re-created or
+        changed out of band (or a run that failed midway) is scrolled instead.
+        """
+        if self.manifest_repo:
+            point_ids = self.manifest_repo.get_point_ids(tender_id)
+            if point_ids is not None:
+                result = await self.client.count(
+                    collection_name=collection_name,
+                    count_filter=self.collections.tender_filter(tender_id),
+                    exact=True,
+                )
+                if result.count == len(point_ids):
+                    return point_ids
+                logger.warning(
+                    f"Index manifest of tender {tender_id} lists {len(point_ids)} points but "
+                    f"{collection_name} holds {result.count}, reading the collection instead"
+                )
+                self.manifest_repo.delete_manifest(tender_id)
+
+        # No (valid) manifest or none configured: the collection itself is the source of truth
+        return await self._scroll_point_ids(tender_id, collection_name)
+
+    async def _scroll_point_ids(self, tender_id: uuid.UUID, collection_name: str) -> Set[str]:
+        point_ids: Set[str] = set()
+        offset = None
+        while True:
+            points, offset = await self.client.scroll(
+                collection_name=collection_name,
+                scroll_filter=self.collections.tender_filter(tender_id),
+                limit=SCROLL_PAGE_SIZE,
+                offset=offset,
+                with_payload=False,
+                with_vectors=False,
+            )
+            point_ids.update(str(point.id) for point in points)
+            if offset is None:
+                return point_ids
+
+    async def _upsert_chunks(
+        self,
+        collection_name: str,
+        tender_id: uuid.UUID,
+        point_ids: List[str],
+        chunks: List[Document],
+        vectors: Optional[np.ndarray] = None,
+        with_sparse: bool = True,
+    ) -> np.ndarray:
+        """
+        Embed and upsert chunks in batches.
+
+        Args:
+            vectors: Precomputed vectors of the chunks, embedded here if None
+            with_sparse: Whether the chunks get BM25 vectors (if the collection has them)
+
+        Returns:
+            The dense vectors of the chunks
+        """
+        if not chunks:
+            return np.empty((0, 0), dtype=np.float32)
+
+        batch_size = self.indexing_config.get("batch_size", DEFAULT_INDEX_BATCH_SIZE)
+        parallelism = self.indexing_config.get("parallelism", DEFAULT_UPSERT_PARALLELISM)
+        semaphore = asyncio.Semaphore(parallelism)
+        pending: List[asyncio.Task] = []
+        sparse = (
+            with_sparse
+            and self.sparse_encoder is not None
+            and await self._has_sparse_vectors(collection_name)
         )
+        all_vectors: List[np.ndarray] = []
+
+        async def upsert_in_background(batch: models.Batch) -> None:
+            try:
+                await self._upsert_with_retry(collection_name, batch, wait=False)
+            finally:
+                semaphore.release()
+
+        batch_starts = range(0, len(chunks), batch_size)
+        try:
+            for start in batch_starts:
+                batch_chunks = chunks[start : start + batch_size]
+                texts = [chunk.page_content for chunk in batch_chunks]
+                if vectors is None:
+                    # Embedding the next batch runs on the provider's thread, the event
+                    # loop sends the upserts still in flight meanwhile
+                    batch_vectors = await self.embedding_provider.embed_documents(texts)
+                else:
+                    batch_vectors = vectors[start : start + batch_size]
+                all_vectors.append(batch_vectors)
+                sparse_vectors = (
+                    await asyncio.to_thread(self.sparse_encoder.encode_documents, texts) if sparse else None
+                )
+                payloads = [chunk_payload(document_to_chunk(chunk, tender_id)) for chunk in batch_chunks]
+                batch = points_batch(
+                    point_ids[start : start + batch_size], batch_vectors, payloads, sparse_vectors
+                )
+
+                if start == batch_starts[-1]:
+                    # Consistency barrier: Qdrant applies updates in order, so once every
+                    # earlier batch is acknowledged, waiting on the last one covers them all
+                    results = await asyncio.gather(*pending, return_exceptions=True)
+                    failures = [r for r in results if isinstance(r, Exception)]
+                    if failures:
+                        raise RuntimeError(
+                            f"{len(failures)} of {len(batch_starts)} batches could not be upserted "
+                            f"into {collection_name}: {failures[0]}"
+                        )
+                    await self._upsert_with_retry(collection_name, batch, wait=True)
+                else:
+                    await semaphore.acquire()
+                    pending.append(asyncio.create_task(upsert_in_background(batch)))
+                    # Start sending the batch now, even if nothing below yields
+                    await asyncio.sleep(0)
+        finally:
+            # A failed embedding, BM25 encoding or upsert must not leave upserts running
+            # unobserved; nothing is recorded in the manifest before this returns
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        logger.info(f"Successfully upserted {len(chunks)} chunks in {len(batch_starts)} batches")
+        return np.concatenate(all_vectors, axis=0)
+
+    async def _upsert_with_retry(
+        self, collection_name: str, batch: models.Batch, wait: bool
+    ) -> None:
+        max_retries = self.indexing_config.get("max_retries", DEFAULT_UPSERT_MAX_RETRIES)
+        for attempt in range(max_retries + 1):
+            try:
+                await self.client.upsert(
+                    collection_name=collection_name, points=batch, wait=wait
+                )
+                return
+            except Exception as e:
+                if attempt == max_retries:
+                    logger.error(f"Giving up on batch of {len(batch.ids)} points: {e}")
+                    raise
+                delay = UPSERT_RETRY_BASE_DELAY * 2**attempt
+                logger.warning(
+                    f"Upsert of {len(batch.ids)} points failed ({e}), retrying in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+
+    async def retrieve_chunks(self, tender_id: uuid.UUID, query: str, top_k: int = DEFAULT_TOP_K):
+        results = await self.retrieve_chunks_batch(tender_id, [query], top_k=top_k)
+        return results[0]
 
-        chunks = [
-            Chunk(content=content, file_name=file_name, file_id=file_id, tender_id=str(tender_id))
-            for point in res
-            if point.payload
-            and (content := point.payload.get("content"))
-            and (file_name := point.payload.get("file_name"))
-            and (file_id := point.payload.get("file_id"))
+    async def retrieve_chunks_batch(
+        self, tender_id: uuid.UUID, queries: List[str], top_k: int = DEFAULT_TOP_K
+    ) -> List[List[Chunk]]:
+        """
+        Retrieve chunks for many queries of one tender in a single round trip.
+
+        Queries answered from the retrieval cache are skipped; the rest are embedded
+        as one batch and searched with one Qdrant batch query. The result lists are
+        in the order of the queries.
+        """
+        self.last_context_stats = ContextStats()
+        if not queries:
+            return []
+
+        results: List[Optional[List[Chunk]]] = [None] * len(queries)
+        cache_keys: List[Optional[tuple]] = [None] * len(queries)
+        if self.retrieval_cache is not None:
+            version = self.index_version(tender_id)
+            for i, query in enumerate(queries):
+                cache_keys[i] = self.retrieval_cache.key(
+                    tender_id, version, query, top_k, self._retrieval_mode()
+                )
+                if (cached := self.retrieval_cache.get(cache_keys[i])) is not None:
+                    results[i] = list(cached)
+
+        missing = [i for i, result in enumerate(results) if result is None]
+        if not missing:
+            return results
+
+        collection_name = self.collections.collection_name(tender_id)
+        query_filter = self.collections.tender_filter(tender_id)
+        query_vectors = await self.embedding_provider.embed_documents([queries[i] for i in missing])
+        # MMR needs alternatives to choose from even without a reranker
+        limit = top_k * self.rerank_over_fetch if self.postprocessor else self._candidate_count(top_k)
+        requests = [
+            await self._query_request(collection_name, queries[i], query_vector, query_filter, limit)
+            for i, query_vector in zip(missing, query_vectors)
         ]
+        responses = await self.client.query_batch_points(
+            collection_name=collection_name, requests=requests
+        )
+
+        ranked_lists: List[List[Chunk]] = []
+        vectors: Dict[str, np.ndarray] = {}
+        for i, response in zip(missing, responses):
+            chunks = [
+                chunk for point in response.points if (chunk := point_to_chunk(point, str(tender_id)))
+            ]
+            # Parents and MMR need every candidate, they narrow the list down to top_k themselves
+            keep = top_k if self.postprocessor is None and self.hierarchical_splitter is None else len(chunks)
+            ranked_lists.append(await self._rerank(queries[i], chunks, keep))
+            if self.postprocessor:
+                vectors.update(
+                    (str(point.id), vector)
+                    for point in response.points
+                    if (vector := point_vector(point)) is not None
+                )
+
+        if self.hierarchical_splitter:
+            # One lookup for the parents of all queries
+            parents, parent_vectors = await self._fetch_parents(itertools.chain(*ranked_lists))
+            ranked_lists = [lift_to_parents(ranked, parents) for ranked in ranked_lists]
+            vectors.update(parent_vectors)
+
+        for i, ranked in zip(missing, ranked_lists):
+            if self.postprocessor is None:
+                results[i] = ranked[:top_k]
+            else:
+                results[i], stats = self.postprocessor.process(ranked, vectors, top_k)
+                self.last_context_stats += stats
+            if cache_keys[i] is not None:
+                self.retrieval_cache.put(cache_keys[i], tuple(results[i]))
+
+        stats = self.last_context_stats
+        if stats.chunks_in:
+            logger.info(
+                f"Context post-processing: {stats.chunks_in} -> {stats.chunks_out} chunks "
+                f"({stats.merged_chunks} merged), {stats.tokens_before} -> {stats.tokens_after} "
+                f"tokens, {stats.tokens_saved} saved"
+            )
+        return results
+
+    async def _fetch_parents(
+        self, chunks: Iterable[Chunk]
+    ) -> Tuple[Dict[str, Chunk], Dict[str, np.ndarray]]:
+        """
+        Retrieve the parents of child chunks, one request per collection.
+
+        Returns:
+            Parents by point ID and, when MMR runs afterwards, their dense vectors
+        """
+        parent_ids: Dict[str, Set[str]] = {}
+        for chunk in chunks:
+            if chunk.parent_id:
+                collection_name = self.collections.collection_name(chunk.tender_id)
+                parent_ids.setdefault(collection_name, set()).add(chunk.parent_id)
+
+        async def retrieve(collection_name: str, ids: Set[str]):
+            return await self.client.retrieve(
+                collection_name=collection_name,
+                ids=list(ids),
+                with_payload=True,
+                with_vectors=self.postprocessor is not None,
+            )
+
+        responses = await asyncio.gather(
+            *[retrieve(collection_name, ids) for collection_name, ids in parent_ids.items()]
+        )
+
+        parents: Dict[str, Chunk] = {}
+        vectors: Dict[str, np.ndarray] = {}
+        for point in itertools.chain(*responses):
+            if (chunk := point_to_chunk(point)) is not None:
+                parents[chunk.point_id] = chunk
+                if (vector := point_vector(point)) is not None:
+                    vectors[chunk.point_id] = vector
+        return parents, vectors
+
+    async def _rerank_and_lift(self, query: str, chunks: List[Chunk], top_k: int) -> List[Chunk]:
+        if self.hierarchical_splitter is None:
+            return await self._rerank(query, chunks, top_k)
 
-        return chunks
+        ranked = await self._rerank(query, chunks, len(chunks))
+        parents, _ = await self._fetch_parents(ranked)
+        return lift_to_parents(ranked, parents)[:top_k]
+
+    def index_version(self, tender_id: uuid.UUID) -> int:
+        """Version of the tender's index, changes whenever index_tender_documents runs."""
+        if self.manifest_repo:
+            # Shared with the other processes, the worker re-indexes while the API serves chat
+            return self.manifest_repo.get_version(tender_id)
+        return self.retrieval_cache.local_version(tender_id) if self.retrieval_cache else 0
+
+    def _retrieval_mode(self) -> tuple:
+        """Settings that change retrieval results, part of the cache key."""
+        return (
+            self.sparse_encoder is not None,
+            type(self.reranker).__name__ if self.reranker else None,
+            self.rerank_over_fetch,
+            (self.postprocessor.mmr_lambda, self.postprocessor.merge_adjacent_chunks)
+            if self.postprocessor
+            else None,
+            self.hierarchical_splitter is not None,
+        )
+
+    def _candidate_count(self, top_k: int) -> int:
+        """Over-fetch candidates when a reranker or the parent lookup narrows them down to top_k."""
+        return top_k * self.rerank_over_fetch if self.reranker or self.hierarchical_splitter else top_k
+
+    async def _rerank(self, query: str, chunks: List[Chunk], top_k: int) -> List[Chunk]:
+        if self.reranker is None or not chunks:
+            return chunks[:top_k]
+
+        docs = [Document(page_content=chunk.content, metadata={"index": i}) for i, chunk in enumerate(chunks)]
+        # Scoring is CPU-bound model inference, keep it off the event loop
+        reranked = await asyncio.to_thread(self.reranker.rerank_documents, query, docs)
+
+        return [
+            attr.evolve(
+                chunks[doc.metadata["index"]],
+                score=doc.metadata.get("relevance_score", chunks[doc.metadata["index"]].score),
+            )
+            for doc in reranked[:top_k]
+        ]
 
     async def retrieve_chunks_global(self, tender_ids: List[uuid.UUID], query: str, top_k: int = DEFAULT_TOP_K):
         """
         Retrieve chunks from multiple tender collections in parallel and merge results.
-        
+
+        Each tender is first asked for an adaptive share of top_k; the sorted result
+        lists are k-way merged by score. Only tenders whose last candidate still beats
+        the merged top_k-th score can hide better chunks, and only those are searched
+        again with the full top_k, so the result equals a search over all tenders.
+
+        Scores are compared across tenders as dense cosine similarities. RRF scores
+        of hybrid collections only rank the hits within one collection, so their
+        fused hits are re-scored by the similarity of their dense vectors; the
+        candidates of each tender are still chosen by the fusion, and the refetch
+        is then a heuristic rather than exact.
+
         Args:
             tender_ids: List of tender IDs to search across
             query: Search query
             top_k: Total number of chunks to return after merging
-            
+
         Returns:
             List of Chunk objects from across all tenders, sorted by relevance
         """
@@ -124,51 +1129,63 @@ class RagService:
             return []
 
         query_vector = await self.embedding_provider.embed_query(query)
-        
-        # Search all collections in parallel
-        async def search_collection(tender_id: uuid.UUID):
+
+        candidates = self._candidate_count(top_k)
+        if self.collections.shared:
+            chunks = await self._search_shared_collection(tender_ids, query, query_vector, candidates)
+            return await self._rerank_and_lift(query, chunks, top_k)
+
+        async def search_collection(tender_id: uuid.UUID, limit: int) -> List[Chunk]:
             try:
                 collection_name = str(tender_id)
-                # Check if collection exists
                 if not await self.client.collection_exists(collection_name):
                     return []
-                
-                res = await self.client.search(
-                    collection_name=collection_name,
-                    query_vector=query_vector,
-                    limit=top_k,  # Get top_k from each collection
-                )
-                
-                # Convert to chunks with tender_id
-                chunks = []
-                for point in res:
-                    if point.payload:
-                        content = point.payload.get("content")
-                        file_name = point.payload.get("file_name")
-                        file_id = point.payload.get("file_id")
-                        if content and file_name and file_id:
-                            chunks.append(
-                                Chunk(
-                                    content=content,
-                                    file_name=file_name,
-                                    file_id=file_id,
-                                    tender_id=str(tender_id),
-                                )
-                            )
-                return chunks
+
+                hybrid = await self._is_hybrid(collection_name)
+                res = await self._query(collection_name, query, query_vector, None, limit, with_vector=hybrid)
+                chunks = [
+                    attr.evolve(chunk, score=cosine_similarity(point_vector(point), query_vector))
+                    if hybrid
+                    else chunk
+                    for point in res
+                    if (chunk := point_to_chunk(point, str(tender_id)))
+                ]
+                return sorted(chunks, key=lambda chunk: -chunk.score) if hybrid else chunks
             except Exception as e:
                 logger.warning(f"Error searching collection {tender_id}: {e}")
                 return []
 
-        # Search all collections in parallel
-        results = await asyncio.gather(*[search_collection(tid) for tid in tender_ids])
-        
-        # Flatten and merge results
-        all_chunks = []
-        for chunks in results:
-            all_chunks.extend(chunks)
-        
-        # Sort by score if available (Qdrant returns results sorted by relevance)
-        # Since we're merging from multiple collections, we'll keep the order
-        # and return top_k
-        return all_chunks[:top_k]
+        limit = candidate_limit(candidates, len(tender_ids))
+        results = await asyncio.gather(*[search_collection(tid, limit) for tid in tender_ids])
+        merged = merge_by_score(results, candidates)
+
+        if limit < candidates:
+            threshold = merged[-1].score if len(merged) == candidates else float("-inf")
+            truncated = [
+                i
+                for i, chunks in enumerate(results)
+                if len(chunks) == limit and chunks[-1].score > threshold
+            ]
+            if truncated:
+                refetched = await asyncio.gather(
+                    *[search_collection(tender_ids[i], candidates) for i in truncated]
+                )
+                for i, chunks in zip(truncated, refetched):
+                    results[i] = chunks
+                merged = merge_by_score(results, candidates)
+
+        return await self._rerank_and_lift(query, merged, top_k)
+
+    async def _search_shared_collection(
+        self, tender_ids: List[uuid.UUID], query: str, query_vector: np.ndarray, top_k: int
+    ) -> List[Chunk]:
+        """A single filtered search replaces the per-tender fan-out in the shared layout."""
+        collection_name = self.collections.shared_collection
+        if not await self.client.collection_exists(collection_name):
+            return []
+
+        res = await self._query(
+            collection_name, query, query_vector, self.collections.tenders_filter(tender_ids), top_k
+        )
+
+        return [chunk for point in res if (chunk := point_to_chunk(point))]
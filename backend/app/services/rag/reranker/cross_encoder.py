@@ -0,0 +1,132 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+import numpy as np
+import torch
+from huggingface_hub import snapshot_download
+from langchain_core.documents import Document
+from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+from app.config.logger import logger
+from app.services.rag.reranker.base_reranker import BaseReranker
+
+DEFAULT_CROSS_ENCODER_MODEL = "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1"
+RELEVANCE_SCORE_KEY = "relevance_score"
+
+
+def download_reranker_model(repo_id: str) -> str:
+    """Download a sequence classification model once into ./models, local directories are used as-is."""
+    if os.path.isfile(os.path.join(repo_id, "config.json")):
+        return os.path.abspath(repo_id)
+
+    model_dir = os.path.abspath(os.path.join("models", repo_id.replace("/", "-")))
+    if os.path.isfile(os.path.join(model_dir, "config.json")):
+        return model_dir
+
+    logger.info(f"Downloading {repo_id}...")
+    snapshot_download(
+        repo_id=repo_id,
+        allow_patterns=["*.json", "*.txt", "*.model", "*.safetensors"],
+        local_dir=model_dir,
+    )
+    return model_dir
+
+
+class CrossEncoderReranker(BaseReranker):
+    """
+    Reranks documents with a multilingual cross-encoder on the local CPU.
+
+    Query/document pairs are scored in batches; scores are cached per
+    (query, document) so repeated extraction queries over the same tender
+    don't run the model again.
+    """
+
+    def __init__(
+        self,
+        model_name: str = DEFAULT_CROSS_ENCODER_MODEL,
+        batch_size: int = 16,
+        max_length: int = 512,
+        cache_size: int = 10000,
+    ):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.cache_size = cache_size
+
+        model_path = download_reranker_model(model_name)
+        self.tokenizer = AutoTokenizer.from_pretrained(model_path, use_fast=True)
+        self.model = AutoModelForSequenceClassification.from_pretrained(model_path)
+        self.model.eval()
+
+        self._cache: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _cache_key(query: str, text: str) -> Tuple[str, str]:
+        return query, hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def _predict(self, query: str, texts: List[str]) -> np.ndarray:
+        scores = []
+        for start in range(0, len(texts), self.batch_size):
+            batch = texts[start : start + self.batch_size]
+            features = self.tokenizer(
+                [query] * len(batch),
+                batch,
+                padding=True,
+                truncation="only_second",
+                max_length=self.max_length,
+                return_tensors="pt",
+            )
+            with torch.inference_mode():
+                logits = self.model(**features).logits
+            # Single-logit models output the relevance directly, two-label models
+            # the probability of the "relevant" label
+            if logits.shape[-1] == 1:
+                batch_scores = logits[:, 0]
+            else:
+                batch_scores = torch.softmax(logits, dim=-1)[:, -1]
+            scores.append(batch_scores.float().numpy())
+        return np.concatenate(scores) if scores else np.empty(0, dtype=np.float32)
+
+    def score(self, query: str, texts: List[str]) -> np.ndarray:
+        """Relevance score of every text for the query, only uncached pairs hit the model."""
+        keys = [self._cache_key(query, text) for text in texts]
+        scores = np.empty(len(texts), dtype=np.float32)
+
+        missing: List[int] = []
+        with self._lock:
+            for i, key in enumerate(keys):
+                cached: Optional[float] = self._cache.get(key)
+                if cached is None:
+                    missing.append(i)
+                else:
+                    self._cache.move_to_end(key)
+                    scores[i] = cached
+
+        if missing:
+            predicted = self._predict(query, [texts[i] for i in missing])
+            scores[missing] = predicted
+            with self._lock:
+                for i, value in zip(missing, predicted):
+                    self._cache[keys[i]] = float(value)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        return scores
+
+    def rerank_documents(self, query: str, docs: List[Document]) -> List[Document]:
+        if not docs:
+            return []
+
+        scores = self.score(query, [doc.page_content for doc in docs])
+        order = np.argsort(-scores, kind="stable")
+        return [
+            Document(
+                page_content=docs[i].page_content,
+                metadata={**docs[i].metadata, RELEVANCE_SCORE_KEY: float(scores[i])},
+            )
+            for i in order
+        ]
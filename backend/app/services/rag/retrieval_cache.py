@@ -0,0 +1,80 @@
+import hashlib
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from app.config.app_config import _load_config
+
+DEFAULT_MAX_ENTRIES = 2048
+
+CacheKey = Tuple[str, int, str, int, Hashable]
+
+
+class RetrievalCache:
+    """
+    Process-wide LRU cache of retrieval results.
+
+    Entries are keyed by (tender_id, index version, query hash, top_k, filters).
+    Re-indexing a tender bumps its index version, so results computed against an
+    older index are never served again and simply age out of the LRU.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[CacheKey, Any]" = OrderedDict()
+        # Versions of tenders indexed in this process when no manifest store is configured
+        self._local_versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(tender_id: uuid.UUID, version: int, query: str, top_k: int, filters: Hashable = None) -> CacheKey:
+        query_hash = hashlib.sha256(query.encode("utf-8")).hexdigest()
+        return str(tender_id), version, query_hash, top_k, filters
+
+    def get(self, key: CacheKey) -> Optional[Any]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: CacheKey, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def local_version(self, tender_id: uuid.UUID) -> int:
+        with self._lock:
+            return self._local_versions.get(str(tender_id), 0)
+
+    def bump_local_version(self, tender_id: uuid.UUID) -> int:
+        with self._lock:
+            version = self._local_versions.get(str(tender_id), 0) + 1
+            self._local_versions[str(tender_id)] = version
+            return version
+
+
+_retrieval_cache: RetrievalCache | None = None
+_retrieval_cache_lock = threading.Lock()
+
+
+def get_retrieval_cache() -> Optional[RetrievalCache]:
+    """Get the retrieval cache instance (singleton pattern), None if caching is disabled."""
+    global _retrieval_cache
+    cache_config = _load_config().get("rag", {}).get("retrieval", {}).get("cache", {})
+    if not cache_config.get("enabled", False):
+        return None
+
+    if _retrieval_cache is None:
+        with _retrieval_cache_lock:
+            if _retrieval_cache is None:
+                _retrieval_cache = RetrievalCache(cache_config.get("max_entries", DEFAULT_MAX_ENTRIES))
+    return _retrieval_cache
@@ -0,0 +1,87 @@
+import hashlib
+import re
+from collections import Counter
+from typing import Dict, Iterable, List
+
+from qdrant_client import models
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+# German tender text: roughly 1.6 cl100k tokens per word, and about a third of
+# the words are stopwords or single characters that BM25 drops
+TERMS_PER_TOKEN = 0.4
+
+GERMAN_STOPWORDS = frozenset(
+    """
+    aber alle allem allen aller alles als also am an ander andere anderem anderen
+    anderer anderes auch auf aus bei bin bis bist da damit dann das dass dem den
+    denn der des die dies diese diesem diesen dieser dieses doch dort du durch ein
+    eine einem einen einer eines er es etwa für hat hatte hier ich ihr im in ist
+    ja jede jedem jeden jeder jedes kann kein keine man mit muss nach nicht noch
+    nur ob oder ohne sein seine sich sie sind so soll sowie über um und uns unter
+    vom von vor war wird wie wir zu zum zur zwischen relevante keywords
+    """.split()
+)
+
+
+def chunk_terms(chunk_size: int) -> float:
+    """
+    Estimate the BM25 terms of a chunk, the avg_doc_length matching a splitter.
+
+    Args:
+        chunk_size: The splitter's chunk size in tokens
+
+    Returns:
+        The expected number of terms tokenize() keeps
+    """
+    return chunk_size * TERMS_PER_TOKEN
+
+
+class Bm25Encoder:
+    """
+    Local BM25 sparse vectors for Qdrant.
+
+    Documents are encoded with the BM25 term-frequency part (saturation and
+    length normalisation); Qdrant applies the IDF part itself when the sparse
+    vector is configured with Modifier.IDF, so no corpus statistics have to be
+    kept here. Tokens are mapped to indices with a stable hash.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, avg_doc_length: float = 256.0):
+        self.k1 = k1
+        self.b = b
+        self.avg_doc_length = avg_doc_length
+
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        return [
+            token
+            for token in TOKEN_PATTERN.findall(text.lower())
+            if len(token) > 1 and token not in GERMAN_STOPWORDS
+        ]
+
+    @staticmethod
+    def token_index(token: str) -> int:
+        # Python's hash() is salted per process, the index has to be stable
+        return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=4).digest(), "little")
+
+    def _sparse_vector(self, weights: Dict[str, float]) -> models.SparseVector:
+        by_index: Dict[int, float] = {}
+        for token, weight in weights.items():
+            index = self.token_index(token)
+            by_index[index] = by_index.get(index, 0.0) + weight
+        return models.SparseVector(indices=list(by_index), values=list(by_index.values()))
+
+    def encode_document(self, text: str) -> models.SparseVector:
+        tokens = self.tokenize(text)
+        length_norm = 1 - self.b + self.b * len(tokens) / self.avg_doc_length
+        weights = {
+            token: tf * (self.k1 + 1) / (tf + self.k1 * length_norm)
+            for token, tf in Counter(tokens).items()
+        }
+        return self._sparse_vector(weights)
+
+    def encode_documents(self, texts: Iterable[str]) -> List[models.SparseVector]:
+        return [self.encode_document(text) for text in texts]
+
+    def encode_query(self, text: str) -> models.SparseVector:
+        return self._sparse_vector({token: 1.0 for token in self.tokenize(text)})
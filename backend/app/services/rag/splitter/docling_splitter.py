@@ -0,0 +1,263 @@
+"""
+Structure-aware splitter that chunks the Docling document tree.
+
+The Markdown export loses what Docling already knows: where sections start,
+which rows belong to a table and on which page an element is. This splitter
+walks the document items instead. Chunks never cross a section, a table is
+only split between rows and every part repeats the table's caption and
+header rows, and each chunk records its heading path and page numbers.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from docling_core.types.doc import (
+    DocItemLabel,
+    DoclingDocument,
+    ListItem,
+    PictureItem,
+    SectionHeaderItem,
+    TableItem,
+    TextItem,
+    TitleItem,
+)
+from langchain_core.documents import Document
+
+from app.config.logger import logger
+from app.models.document import ProcessedDocument
+from app.services.rag.splitter.base_splitter import BaseSplitter
+from app.services.rag.splitter.hierarchical_splitter import CHILD_LEVEL, PARENT_LEVEL
+from app.services.rag.splitter.recursiv_splitter import MARKDOWN_SEPARATORS, toke_length_function
+from app.services.rag.splitter.token_splitter import TokenTextSplitter
+
+# Page furniture and captions, captions are emitted with their table or picture
+SKIPPED_LABELS = {DocItemLabel.PAGE_HEADER, DocItemLabel.PAGE_FOOTER, DocItemLabel.CAPTION}
+BLOCK_SEPARATOR = "\n\n"
+
+
+@dataclass
+class Block:
+    """A document item rendered as Markdown, the unit chunks are packed from."""
+
+    text: str
+    headings: Tuple[str, ...]
+    pages: Tuple[int, ...]
+    tokens: int
+    # Caption and header rows of a table, repeated in every part of a split table
+    table_header: Optional[str] = None
+    table_rows: Optional[List[str]] = None
+    is_heading: bool = False
+
+
+def item_pages(item) -> Tuple[int, ...]:
+    return tuple(sorted({prov.page_no for prov in getattr(item, "prov", None) or []}))
+
+
+def _markdown_row(cells) -> str:
+    texts = (cell.text.replace("|", "\\|").replace("\n", " ").strip() for cell in cells)
+    return "| " + " | ".join(texts) + " |"
+
+
+def table_markdown(table: TableItem, doc: DoclingDocument) -> Tuple[str, List[str]]:
+    """
+    Render a table as Markdown.
+
+    Returns:
+        The caption and header rows, and the body rows; the leading rows with
+        column headers form the header, or the first row if none is marked
+    """
+    grid = table.data.grid
+    caption = table.caption_text(doc)
+    if not grid:
+        return caption, []
+
+    header_rows = 0
+    while header_rows < len(grid) and any(cell.column_header for cell in grid[header_rows]):
+        header_rows += 1
+    header_rows = max(header_rows, 1)
+
+    lines = [_markdown_row(grid[0]), "| " + " | ".join("---" for _ in grid[0]) + " |"]
+    lines.extend(_markdown_row(row) for row in grid[1:header_rows])
+    header = "\n".join(lines)
+    if caption:
+        header = caption + BLOCK_SEPARATOR + header
+    return header, [_markdown_row(row) for row in grid[header_rows:]]
+
+
+def document_blocks(doc: DoclingDocument) -> Iterator[Block]:
+    """Blocks of the document body in reading order, each with its heading path."""
+    path: List[Tuple[int, str]] = []
+    for item, _ in doc.iterate_items():
+        pages = item_pages(item)
+        if isinstance(item, (TitleItem, SectionHeaderItem)):
+            level = item.level if isinstance(item, SectionHeaderItem) else 0
+            path = [(parent_level, title) for parent_level, title in path if parent_level < level]
+            path.append((level, item.text.strip()))
+            text = f"{'#' * min(level + 1, 6)} {item.text.strip()}"
+            yield Block(text, tuple(t for _, t in path), pages, toke_length_function(text), is_heading=True)
+            continue
+
+        headings = tuple(title for _, title in path)
+        if isinstance(item, TableItem):
+            header, rows = table_markdown(item, doc)
+            text = "\n".join([header, *rows])
+            if text.strip():
+                yield Block(text, headings, pages, toke_length_function(text), header, rows)
+        elif isinstance(item, PictureItem):
+            caption = item.caption_text(doc)
+            if caption:
+                yield Block(caption, headings, pages, toke_length_function(caption))
+        elif isinstance(item, TextItem) and item.label not in SKIPPED_LABELS and item.text.strip():
+            text = item.text.strip()
+            if isinstance(item, ListItem):
+                text = f"{item.marker or '-'} {text}"
+            yield Block(text, headings, pages, toke_length_function(text))
+
+
+def document_sections(doc: DoclingDocument) -> List[List[Block]]:
+    """Consecutive blocks under the same heading path, sections with only a heading are dropped."""
+    sections: List[List[Block]] = []
+    for block in document_blocks(doc):
+        if sections and sections[-1][0].headings == block.headings and not block.is_heading:
+            sections[-1].append(block)
+        else:
+            sections.append([block])
+    return [section for section in sections if not all(block.is_heading for block in section)]
+
+
+class DoclingSplitter(BaseSplitter):
+    """
+    Chunks Docling documents along their sections.
+
+    Used for processed documents that carry their Docling document; others
+    go through the Markdown splitters. Text blocks longer than a chunk are
+    split with the token splitter, tables between rows.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = 1500,
+        chunk_overlap: int = 300,
+        parent_chunk_size: int = 1500,
+        child_chunk_size: int = 300,
+        child_chunk_overlap: int = 50,
+    ):
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.parent_chunk_size = parent_chunk_size
+        self.child_chunk_size = child_chunk_size
+        self.child_chunk_overlap = child_chunk_overlap
+        self._text_splitters: Dict[Tuple[int, int], TokenTextSplitter] = {}
+
+    def _fit(self, block: Block, max_tokens: int, overlap: int) -> List[Block]:
+        """Split a block longer than max_tokens, tables keep their header in every part."""
+        if block.tokens <= max_tokens:
+            return [block]
+
+        if block.table_rows:
+            parts: List[Block] = []
+            header_tokens = toke_length_function(block.table_header)
+            rows: List[str] = []
+            tokens = header_tokens
+            for row in block.table_rows:
+                row_tokens = toke_length_function(row) + 1
+                if rows and tokens + row_tokens > max_tokens:
+                    parts.append(self._table_part(block, rows, tokens))
+                    rows, tokens = [], header_tokens
+                rows.append(row)
+                tokens += row_tokens
+            parts.append(self._table_part(block, rows, tokens))
+            return parts
+
+        key = (max_tokens, overlap)
+        if key not in self._text_splitters:
+            self._text_splitters[key] = TokenTextSplitter(max_tokens, min(overlap, max_tokens // 2), MARKDOWN_SEPARATORS)
+        return [
+            Block(text, block.headings, block.pages, toke_length_function(text))
+            for text in self._text_splitters[key].split_text(block.text)
+        ]
+
+    @staticmethod
+    def _table_part(block: Block, rows: List[str], tokens: int) -> Block:
+        text = "\n".join([block.table_header, *rows])
+        return Block(text, block.headings, block.pages, tokens, block.table_header, rows)
+
+    def _pack(self, blocks: List[Block], max_tokens: int, overlap: int) -> List[List[Block]]:
+        """Group consecutive blocks into chunks of at most max_tokens."""
+        chunks: List[List[Block]] = []
+        current: List[Block] = []
+        tokens = 0
+        for block in blocks:
+            # A heading stays with the start of the content that follows it
+            reserved = tokens + 1 if current and all(part.is_heading for part in current) else 0
+            reserved = min(reserved, max_tokens // 2)
+            for part in self._fit(block, max_tokens - reserved, overlap):
+                # The block separator is a single token
+                if current and tokens + 1 + part.tokens > max_tokens:
+                    chunks.append(current)
+                    current, tokens = [], 0
+                tokens += part.tokens + (1 if current else 0)
+                current.append(part)
+        if current:
+            chunks.append(current)
+        return chunks
+
+    @staticmethod
+    def _to_document(blocks: List[Block], metadata: dict) -> Document:
+        pages = sorted({page for block in blocks for page in block.pages})
+        return Document(
+            page_content=BLOCK_SEPARATOR.join(block.text for block in blocks),
+            metadata={**metadata, "headings": list(blocks[0].headings), "pages": pages},
+        )
+
+    @staticmethod
+    def _file_metadata(processed_file: ProcessedDocument) -> dict:
+        return {
+            "file_id": str(processed_file.document.id),
+            "file_name": processed_file.document.name,
+        }
+
+    def split_hierarchy(
+        self, processed_files: List[ProcessedDocument]
+    ) -> List[Tuple[Document, List[Document]]]:
+        """Split files into section parents and their children, like HierarchicalSplitter."""
+        hierarchy: List[Tuple[Document, List[Document]]] = []
+        for processed_file in processed_files:
+            metadata = self._file_metadata(processed_file)
+            parent_index = 0
+            child_index = 0
+            for section in document_sections(processed_file.structure):
+                for parent_blocks in self._pack(section, self.parent_chunk_size, 0):
+                    parent = self._to_document(parent_blocks, {**metadata, "chunk_index": parent_index})
+                    parent.metadata["level"] = PARENT_LEVEL
+                    parent_index += 1
+
+                    children = []
+                    for child_blocks in self._pack(parent_blocks, self.child_chunk_size, self.child_chunk_overlap):
+                        child = self._to_document(child_blocks, {**metadata, "chunk_index": child_index})
+                        child.metadata["level"] = CHILD_LEVEL
+                        child_index += 1
+                        children.append(child)
+                    hierarchy.append((parent, children))
+
+        logger.info(
+            f"Created {len(hierarchy)} parent chunks with "
+            f"{sum(len(children) for _, children in hierarchy)} child chunks from Docling documents"
+        )
+        return hierarchy
+
+    def split_documents(self, processed_files: List[ProcessedDocument]) -> List[Document]:
+        chunks: List[Document] = []
+        for processed_file in processed_files:
+            metadata = self._file_metadata(processed_file)
+            sections = document_sections(processed_file.structure)
+            blocks = [
+                blocks
+                for section in sections
+                for blocks in self._pack(section, self.chunk_size, self.chunk_overlap)
+            ]
+            for chunk_index, chunk_blocks in enumerate(blocks):
+                chunks.append(self._to_document(chunk_blocks, {**metadata, "chunk_index": chunk_index}))
+
+        logger.info(f"Created {len(chunks)} chunks from Docling documents")
+        return chunks
@@ -0,0 +1,117 @@
+import re
+from typing import List, Tuple
+
+from langchain_core.documents import Document
+
+from app.config.logger import logger
+from app.models.document import ProcessedDocument
+from app.services.rag.splitter.base_splitter import BaseSplitter
+from app.services.rag.splitter.recursiv_splitter import MARKDOWN_SEPARATORS
+from app.services.rag.splitter.token_splitter import TokenTextSplitter
+
+PARENT_LEVEL = "parent"
+CHILD_LEVEL = "child"
+
+HEADING_PATTERN = re.compile(r"^(#{1,6})[ \t]+(.+?)[ \t#]*$", re.MULTILINE)
+
+
+def markdown_sections(text: str) -> List[Tuple[List[str], int, str]]:
+    """
+    Split markdown at its headings.
+
+    Returns:
+        (heading path, character offset, text) of every section; the text
+        starts with the section's own heading line
+    """
+    matches = list(HEADING_PATTERN.finditer(text))
+    first_heading = matches[0].start() if matches else len(text)
+    sections = [([], 0, text[:first_heading])] if first_heading > 0 else []
+
+    path: List[Tuple[int, str]] = []
+    for i, match in enumerate(matches):
+        level = len(match.group(1))
+        path = [(parent_level, title) for parent_level, title in path if parent_level < level]
+        path.append((level, match.group(2).strip()))
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        sections.append(([title for _, title in path], match.start(), text[match.start() : end]))
+    return sections
+
+
+class HierarchicalSplitter(BaseSplitter):
+    """
+    Two-level splitter for small-to-big retrieval.
+
+    Parents are the sections between markdown headings (split further when
+    longer than parent_chunk_size) and carry their heading path. Each parent
+    is split into small overlapping children, which are what gets searched.
+    """
+
+    def __init__(
+        self,
+        parent_chunk_size: int = 1500,
+        child_chunk_size: int = 300,
+        child_chunk_overlap: int = 50,
+        separators=None,
+    ):
+        if separators is None:
+            separators = MARKDOWN_SEPARATORS
+
+        self.parent_splitter = TokenTextSplitter(
+            chunk_size=parent_chunk_size,
+            chunk_overlap=0,
+            separators=separators,
+            strip_whitespace=True,
+            add_start_index=True,
+        )
+        self.child_splitter = TokenTextSplitter(
+            chunk_size=child_chunk_size,
+            chunk_overlap=child_chunk_overlap,
+            separators=separators,
+            strip_whitespace=True,
+            add_start_index=True,
+        )
+
+    def split_hierarchy(
+        self, processed_files: List[ProcessedDocument]
+    ) -> List[Tuple[Document, List[Document]]]:
+        """Split files into parents and their children, start_index is relative to the file."""
+        hierarchy: List[Tuple[Document, List[Document]]] = []
+        for processed_file in processed_files:
+            file_metadata = {
+                "file_id": str(processed_file.document.id),
+                "file_name": processed_file.document.name,
+            }
+            parent_index = 0
+            child_index = 0
+            for headings, offset, section in markdown_sections(processed_file.content):
+                # Sections that are only a heading show up in their subsections' heading path
+                if not HEADING_PATTERN.sub("", section).strip():
+                    continue
+
+                metadata = {**file_metadata, "headings": headings}
+                for parent in self.parent_splitter.create_documents([section], [metadata]):
+                    parent.metadata["start_index"] += offset
+                    parent.metadata["chunk_index"] = parent_index
+                    parent.metadata["level"] = PARENT_LEVEL
+                    parent_index += 1
+
+                    children = self.child_splitter.create_documents([parent.page_content], [metadata])
+                    for child in children:
+                        child.metadata["start_index"] += parent.metadata["start_index"]
+                        child.metadata["chunk_index"] = child_index
+                        child.metadata["level"] = CHILD_LEVEL
+                        child_index += 1
+                    hierarchy.append((parent, children))
+
+        logger.info(
+            f"Created {len(hierarchy)} parent chunks with "
+            f"{sum(len(children) for _, children in hierarchy)} child chunks"
+        )
+        return hierarchy
+
+    def split_documents(self, processed_files: List[ProcessedDocument]) -> List[Document]:
+        return [
+            chunk
+            for parent, children in self.split_hierarchy(processed_files)
+            for chunk in (parent, *children)
+        ]
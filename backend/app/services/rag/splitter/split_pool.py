@@ -0,0 +1,73 @@
+"""
+Process pool that splits documents off the event loop.
+
+Splitting and token counting are pure CPU work; run inline they block the
+worker's event loop for every document of a tender. Each document is split
+in a pool process, the caller awaits the results in submission order.
+
+Pool processes are spawned: they import this module and the splitters, and
+re-import the parent's main module unless it is a package's __main__. The
+worker is started with `python -m app.queue` for that reason; started as
+`python -m app.queue.tender_worker`, every pool process would import the
+whole worker, including the app config with its embedding and LLM providers.
+"""
+
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple, Union
+
+from langchain_core.documents import Document
+
+from app.models.document import ProcessedDocument
+from app.services.rag.splitter.base_splitter import BaseSplitter
+
+DEFAULT_SPLIT_WORKERS = 2
+
+SplitResult = Union[List[Document], List[Tuple[Document, List[Document]]]]
+
+
+def split_document(splitter: BaseSplitter, hierarchical: bool, processed_document: ProcessedDocument) -> SplitResult:
+    """
+    Split one document, runs in a pool process.
+
+    Returns:
+        (parent, children) pairs if hierarchical, the chunks otherwise
+    """
+    if hierarchical:
+        return splitter.split_hierarchy([processed_document])
+    return splitter.split_documents([processed_document])
+
+
+_split_pool: ProcessPoolExecutor | None = None
+_split_pool_lock = threading.Lock()
+
+
+def get_split_pool(workers: int = DEFAULT_SPLIT_WORKERS) -> Optional[ProcessPoolExecutor]:
+    """
+    Get the split process pool (singleton pattern), None to split on the default thread pool.
+
+    Args:
+        workers: Number of processes, used when the pool is created
+    """
+    global _split_pool
+    if workers <= 0:
+        return None
+
+    if _split_pool is None:
+        with _split_pool_lock:
+            if _split_pool is None:
+                # Forking a process with a running event loop and client threads isn't safe
+                _split_pool = ProcessPoolExecutor(
+                    max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+                )
+    return _split_pool
+
+
+def reset_split_pool() -> None:
+    """Drop a broken pool (a worker died), the next get_split_pool starts a new one."""
+    global _split_pool
+    with _split_pool_lock:
+        if _split_pool is not None:
+            _split_pool.shutdown(wait=False, cancel_futures=True)
+            _split_pool = None
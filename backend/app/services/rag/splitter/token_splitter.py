@@ -0,0 +1,246 @@
+"""
+Recursive, token-aware text splitter that tokenizes every text only once.
+
+LangChain's RecursiveCharacterTextSplitter measures every candidate piece with
+the length function, so a document is re-encoded once per recursion level and
+every merge re-encodes the pieces it combines. This splitter encodes the text once,
+keeps the character offset of every token and splits on character spans:
+the token length of a span is looked up in the token offsets and only its
+ends are re-encoded, and the separator positions are found with one pass
+over the text per separator.
+
+The algorithm is the one of RecursiveCharacterTextSplitter with
+keep_separator="start": pick the first separator that occurs in the span,
+split before every occurrence, merge the pieces into chunks of at most
+chunk_size tokens with chunk_overlap tokens of overlap, and recurse with the
+remaining separators into pieces that are still too long. Separators are
+matched literally, like LangChain does without is_separator_regex.
+"""
+
+import re
+from bisect import bisect_left, bisect_right
+from collections import deque
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import tiktoken
+from langchain_core.documents import Document
+
+from app.config.logger import logger
+
+Span = Tuple[int, int]
+
+# Characters at each end of a span that are re-encoded when counting its tokens
+BOUNDARY_CHARS = 16
+
+
+@lru_cache(maxsize=4)
+def _token_byte_lengths(encoding) -> np.ndarray:
+    """Length in bytes of every token ID of an encoding, 0 for unused IDs."""
+    lengths = np.zeros(encoding.n_vocab, dtype=np.int64)
+    for token in range(encoding.n_vocab):
+        try:
+            lengths[token] = len(encoding.decode_single_token_bytes(token))
+        except KeyError:
+            pass
+    return lengths
+
+
+def token_offsets(encoding, text: str) -> List[int]:
+    """Character offset at which each token of text starts."""
+    tokens = encoding.encode(text)
+    if not tokens:
+        return []
+
+    data = np.frombuffer(text.encode("utf-8"), dtype=np.uint8)
+    # Every byte that isn't a UTF-8 continuation byte starts a character
+    char_of_byte = np.cumsum((data & 0xC0) != 0x80) - 1
+    byte_lengths = _token_byte_lengths(encoding)[np.asarray(tokens)]
+    byte_starts = np.cumsum(byte_lengths) - byte_lengths
+    # A token starting inside a multi-byte character belongs to that character
+    return np.maximum(char_of_byte[byte_starts], 0).tolist()
+
+
+class _TokenizedText:
+    """A text with its token offsets and lazily computed separator positions."""
+
+    def __init__(self, text: str, encoding, separators: Sequence[str]):
+        self.text = text
+        self.encoding = encoding
+        self.separators = separators
+        self.token_starts = token_offsets(encoding, text)
+        self._positions: Dict[int, List[int]] = {}
+        # Short pieces (words, list items) repeat a lot within a document
+        self._short_counts: Dict[str, int] = {}
+
+    def _encoded_length(self, piece: str) -> int:
+        count = self._short_counts.get(piece)
+        if count is None:
+            count = self._short_counts[piece] = len(self.encoding.encode(piece))
+        return count
+
+    def token_count(self, start: int, end: int) -> int:
+        """
+        Number of tokens of text[start:end] encoded on its own.
+
+        Only the first and last few characters tokenize differently than in the
+        whole text, so just those are re-encoded and the tokens in between are
+        counted from the offsets of the whole text.
+        """
+        if end - start <= 2 * BOUNDARY_CHARS:
+            return self._encoded_length(self.text[start:end])
+
+        # Token boundaries of the whole text at least BOUNDARY_CHARS inside the span
+        first = bisect_left(self.token_starts, start + BOUNDARY_CHARS)
+        last = bisect_right(self.token_starts, end - BOUNDARY_CHARS) - 1
+        if first >= last:
+            return len(self.encoding.encode(self.text[start:end]))
+
+        head = self.text[start : self.token_starts[first]]
+        tail = self.text[self.token_starts[last] : end]
+        return self._encoded_length(head) + (last - first) + self._encoded_length(tail)
+
+    def separator_positions(self, separator_index: int, start: int, end: int) -> List[int]:
+        """Start offsets of the non-overlapping separator matches inside text[start:end]."""
+        positions = self._positions.get(separator_index)
+        if positions is None:
+            pattern = re.compile(re.escape(self.separators[separator_index]))
+            positions = [match.start() for match in pattern.finditer(self.text)]
+            self._positions[separator_index] = positions
+
+        last_start = end - len(self.separators[separator_index])
+        return positions[bisect_left(positions, start) : bisect_right(positions, last_start)]
+
+
+class TokenTextSplitter:
+    """
+    Drop-in replacement for RecursiveCharacterTextSplitter with a token length function.
+
+    Args:
+        encoding_name: tiktoken encoding used to count tokens
+        chunk_size: Maximum chunk length in tokens
+        chunk_overlap: Tokens repeated between neighbouring chunks
+        separators: Separators in order of priority, matched literally
+        strip_whitespace: Strip whitespace from the start and end of every chunk
+        add_start_index: Store the character offset of each chunk as start_index
+    """
+
+    def __init__(
+        self,
+        chunk_size: int,
+        chunk_overlap: int,
+        separators: Sequence[str],
+        encoding_name: str = "cl100k_base",
+        strip_whitespace: bool = True,
+        add_start_index: bool = True,
+    ):
+        if chunk_overlap > chunk_size:
+            raise ValueError(
+                f"Got a larger chunk overlap ({chunk_overlap}) than chunk size ({chunk_size})"
+            )
+        self.encoding_name = encoding_name
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.separators = list(separators)
+        self.strip_whitespace = strip_whitespace
+        self.add_start_index = add_start_index
+
+    def split_spans(self, text: str) -> List[Span]:
+        """Character spans of the chunks of text, in order."""
+        encoding = tiktoken.get_encoding(self.encoding_name)
+        tokenized = _TokenizedText(text, encoding, self.separators)
+        return self._split(tokenized, 0, len(text), 0)
+
+    def split_text(self, text: str) -> List[str]:
+        return [text[start:end] for start, end in self.split_spans(text)]
+
+    def create_documents(
+        self, texts: List[str], metadatas: Optional[List[dict]] = None
+    ) -> List[Document]:
+        metadatas = metadatas or [{}] * len(texts)
+        documents = []
+        for text, metadata in zip(texts, metadatas):
+            for start, end in self.split_spans(text):
+                chunk_metadata = dict(metadata)
+                if self.add_start_index:
+                    chunk_metadata["start_index"] = start
+                documents.append(Document(page_content=text[start:end], metadata=chunk_metadata))
+        return documents
+
+    def split_documents(self, documents: List[Document]) -> List[Document]:
+        return self.create_documents(
+            [doc.page_content for doc in documents], [doc.metadata for doc in documents]
+        )
+
+    def _split(self, tokenized: _TokenizedText, start: int, end: int, first_separator: int) -> List[Span]:
+        # The first separator occurring in the span, the empty separator splits into characters
+        separator_index = len(self.separators) - 1
+        next_separator: Optional[int] = None
+        for i in range(first_separator, len(self.separators)):
+            if not self.separators[i]:
+                separator_index = i
+                break
+            if tokenized.separator_positions(i, start, end):
+                separator_index = i
+                next_separator = i + 1 if i + 1 < len(self.separators) else None
+                break
+
+        if self.separators[separator_index]:
+            # The separator stays at the start of the piece that follows it
+            boundaries = [start, *tokenized.separator_positions(separator_index, start, end), end]
+            pieces = [(a, b) for a, b in zip(boundaries, boundaries[1:]) if a < b]
+        else:
+            pieces = [(i, i + 1) for i in range(start, end)]
+
+        chunks: List[Span] = []
+        small_pieces: List[Tuple[int, int, int]] = []
+        for piece_start, piece_end in pieces:
+            length = tokenized.token_count(piece_start, piece_end)
+            if length < self.chunk_size:
+                small_pieces.append((piece_start, piece_end, length))
+                continue
+
+            if small_pieces:
+                chunks.extend(self._merge(tokenized.text, small_pieces))
+                small_pieces = []
+            if next_separator is None:
+                chunks.append((piece_start, piece_end))
+            else:
+                chunks.extend(self._split(tokenized, piece_start, piece_end, next_separator))
+
+        if small_pieces:
+            chunks.extend(self._merge(tokenized.text, small_pieces))
+        return chunks
+
+    def _merge(self, text: str, pieces: List[Tuple[int, int, int]]) -> List[Span]:
+        """Merge consecutive pieces into chunks of at most chunk_size tokens with overlap."""
+        chunks: List[Span] = []
+        current: "deque[Tuple[int, int, int]]" = deque()
+        total = 0
+        for piece in pieces:
+            length = piece[2]
+            if total + length > self.chunk_size:
+                if total > self.chunk_size:
+                    logger.warning(
+                        f"Created a chunk of size {total}, which is longer than the specified {self.chunk_size}"
+                    )
+                if current:
+                    self._append_chunk(text, chunks, current[0][0], current[-1][1])
+                    while total > self.chunk_overlap or (total + length > self.chunk_size and total > 0):
+                        total -= current.popleft()[2]
+            current.append(piece)
+            total += length
+
+        if current:
+            self._append_chunk(text, chunks, current[0][0], current[-1][1])
+        return chunks
+
+    def _append_chunk(self, text: str, chunks: List[Span], start: int, end: int) -> None:
+        if self.strip_whitespace:
+            while start < end and text[start].isspace():
+                start += 1
+            while end > start and text[end - 1].isspace():
+                end -= 1
+        if start < end:
+            chunks.append((start, end))
@@ -0,0 +1,91 @@
+import time
+import uuid
+from functools import lru_cache
+from typing import List, Optional
+
+from qdrant_client import models
+
+from app.config.app_config import _load_config
+
+PER_TENDER_LAYOUT = "per_tender"
+SHARED_LAYOUT = "shared"
+DEFAULT_SHARED_COLLECTION = "tenders"
+TENDER_ID_FIELD = "tender_id"
+GENERATION_MARKER = "-g"
+
+
+class TenderCollections:
+    """
+    Maps tenders to Qdrant collections for the configured storage layout.
+
+    per_tender: one collection per tender, named after the tender ID.
+    shared: one collection for all tenders, every point carries an indexed
+    tender_id payload and searches are filtered by it.
+
+    With blue/green indexing (per_tender only) the tender ID is an alias of
+    the live generation collection, named <tender_id>-g<milliseconds>.
+    """
+
+    def __init__(
+        self,
+        layout: str = PER_TENDER_LAYOUT,
+        shared_collection: str = DEFAULT_SHARED_COLLECTION,
+        blue_green: bool = False,
+    ):
+        if layout not in (PER_TENDER_LAYOUT, SHARED_LAYOUT):
+            raise ValueError(f"Unknown storage layout '{layout}'")
+        self.layout = layout
+        self.shared_collection = shared_collection
+        self.blue_green = blue_green and not self.shared
+
+    @property
+    def shared(self) -> bool:
+        return self.layout == SHARED_LAYOUT
+
+    def collection_name(self, tender_id: uuid.UUID) -> str:
+        return self.shared_collection if self.shared else str(tender_id)
+
+    @staticmethod
+    def new_generation(tender_id: uuid.UUID) -> str:
+        return f"{tender_id}{GENERATION_MARKER}{time.time_ns() // 1_000_000}"
+
+    @staticmethod
+    def generations(tender_id: uuid.UUID, collection_names: List[str]) -> List[str]:
+        """The tender's generation collections among collection_names, oldest first."""
+        prefix = f"{tender_id}{GENERATION_MARKER}"
+        generations = [
+            name for name in collection_names if name.startswith(prefix) and name[len(prefix) :].isdigit()
+        ]
+        return sorted(generations, key=lambda name: int(name[len(prefix) :]))
+
+    def tender_filter(self, tender_id: uuid.UUID) -> Optional[models.Filter]:
+        """Filter restricting a search to one tender, None if the collection holds only that tender."""
+        if not self.shared:
+            return None
+        return models.Filter(
+            must=[
+                models.FieldCondition(
+                    key=TENDER_ID_FIELD, match=models.MatchValue(value=str(tender_id))
+                )
+            ]
+        )
+
+    def tenders_filter(self, tender_ids: List[uuid.UUID]) -> models.Filter:
+        return models.Filter(
+            must=[
+                models.FieldCondition(
+                    key=TENDER_ID_FIELD,
+                    match=models.MatchAny(any=[str(tender_id) for tender_id in tender_ids]),
+                )
+            ]
+        )
+
+
+@lru_cache
+def get_tender_collections() -> TenderCollections:
+    storage_config = _load_config().get("rag", {}).get("storage", {})
+    return TenderCollections(
+        layout=storage_config.get("layout", PER_TENDER_LAYOUT),
+        shared_collection=storage_config.get("shared_collection", DEFAULT_SHARED_COLLECTION),
+        blue_green=storage_config.get("blue_green", False),
+    )
@@ -1,11 +1,25 @@
 from app.config.settings import SettingsDep
-from app.config.app_config import get_embedding_provider
+from app.config.provider_registry import EmbeddingProviderDep, RerankerDep
+from app.database.mongo import MongoClientDep
+from app.database.qdrant import AsyncQdrantClientDep
+from app.repos.index_manifest_repo import IndexManifestRepo
 from app.services.external.minio_service import MinioService
 from app.services.rag.rag_service import RagService
 
 def get_minio_service(settings: SettingsDep) -> MinioService:
     return MinioService(settings)
 
-def get_rag_service(settings: SettingsDep) -> RagService:
-    embedding_provider = get_embedding_provider(settings)
-    return RagService(settings, embedding_provider)
\ No newline at end of file
+def get_rag_service(
+    settings: SettingsDep,
+    embedding_provider: EmbeddingProviderDep,
+    client: AsyncQdrantClientDep,
+    mongo_client: MongoClientDep,
+    reranker: RerankerDep,
+) -> RagService:
+    return RagService(
+        settings,
+        embedding_provider,
+        client,
+        IndexManifestRepo(mongo_client),
+        reranker=reranker,
+    )
@@ -0,0 +1,223 @@
+"""
+Memory, latency and recall of Qdrant collection profiles.
+
+Every profile (HNSW parameters, quantization, on-disk storage) is applied to a
+fresh collection holding the same vectors. For each profile this reports
+p50/p95 search latency, recall@k against an exact (brute-force) search of the
+same collection on its original vectors, and "estimated_ram_mb": the memory the
+profile should keep resident, computed from its settings (vectors, quantized
+vectors, HNSW links) rather than measured on the server.
+
+Needs a Qdrant server: the embedded local mode ignores HNSW, quantization and
+on-disk settings.
+
+Usage:
+    python -m benchmarks.collection_profiles --corpus ./processed_markdown --corpus-size 20000
+    python -m benchmarks.collection_profiles --synthetic 200000 --dimension 768 --profile scalar binary
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import time
+from typing import Dict, List
+
+import numpy as np
+from qdrant_client import AsyncQdrantClient, models
+
+from app.config.app_config import _load_config, get_embedding_provider
+from app.config.settings import get_settings
+from app.services.rag import collection_settings
+from benchmarks.corpus import extraction_queries, load_corpus
+
+UPLOAD_BATCH_SIZE = 256
+EMBED_BATCH_SIZE = 64
+DEFAULT_HNSW_M = 16
+
+PROFILES: Dict[str, dict] = {
+    "default": {},
+    "configured": _load_config().get("rag", {}).get("collection", {}),
+    "scalar": {
+        "quantization": {"type": "scalar", "rescore": True, "oversampling": 2.0},
+        "on_disk_vectors": True,
+    },
+    "binary": {
+        "quantization": {"type": "binary", "rescore": True, "oversampling": 3.0},
+        "on_disk_vectors": True,
+    },
+    "on_disk": {
+        "hnsw": {"on_disk": True},
+        "on_disk_vectors": True,
+        "on_disk_payload": True,
+    },
+    "high_recall": {
+        "hnsw": {"m": 32, "ef_construct": 256},
+        "search_ef": 256,
+    },
+}
+
+
+def estimated_ram_mb(profile: dict, num_vectors: int, dimension: int) -> float:
+    """Estimated resident size of vectors, quantized vectors and the HNSW graph, payloads excluded."""
+    quantization = profile.get("quantization") or {}
+    hnsw = profile.get("hnsw", {})
+
+    total = 0 if profile.get("on_disk_vectors") else num_vectors * dimension * 4
+    if quantization.get("always_ram", True):
+        if quantization.get("type") == "scalar":
+            total += num_vectors * dimension
+        elif quantization.get("type") == "binary":
+            total += num_vectors * math.ceil(dimension / 8)
+    if not hnsw.get("on_disk"):
+        # Level 0 holds 2*m links of 4 bytes per node, upper levels are negligible
+        total += num_vectors * 2 * hnsw.get("m", DEFAULT_HNSW_M) * 4
+    return total / 1024**2
+
+
+async def embed_all(provider, texts: List[str]) -> np.ndarray:
+    batches = [
+        await provider.embed_documents(texts[i : i + EMBED_BATCH_SIZE])
+        for i in range(0, len(texts), EMBED_BATCH_SIZE)
+    ]
+    return np.concatenate(batches, axis=0)
+
+
+def synthetic_vectors(count: int, dimension: int, seed: int) -> np.ndarray:
+    vectors = np.random.default_rng(seed).standard_normal((count, dimension), dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+async def wait_until_indexed(client: AsyncQdrantClient, collection_name: str) -> float:
+    start = time.perf_counter()
+    while (await client.get_collection(collection_name)).status != models.CollectionStatus.GREEN:
+        await asyncio.sleep(0.5)
+    return time.perf_counter() - start
+
+
+async def benchmark_profile(
+    client: AsyncQdrantClient,
+    name: str,
+    profile: dict,
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    top_k: int,
+) -> dict:
+    collection_name = f"benchmark_{name}"
+    if await client.collection_exists(collection_name):
+        await client.delete_collection(collection_name)
+
+    num_vectors, dimension = vectors.shape
+    await client.create_collection(
+        collection_name=collection_name,
+        vectors_config=models.VectorParams(
+            size=dimension,
+            distance=models.Distance.COSINE,
+            on_disk=profile.get("on_disk_vectors"),
+        ),
+        hnsw_config=collection_settings.hnsw_config(profile),
+        quantization_config=collection_settings.quantization_config(profile),
+        optimizers_config=collection_settings.optimizers_config(profile),
+        on_disk_payload=profile.get("on_disk_payload"),
+    )
+
+    start = time.perf_counter()
+    for i in range(0, num_vectors, UPLOAD_BATCH_SIZE):
+        batch = vectors[i : i + UPLOAD_BATCH_SIZE]
+        await client.upsert(
+            collection_name=collection_name,
+            points=models.Batch(
+                ids=list(range(i, i + len(batch))),
+                vectors=batch.tolist(),
+                payloads=[{"position": i + j} for j in range(len(batch))],
+            ),
+            wait=True,
+        )
+    upload_seconds = time.perf_counter() - start
+    index_seconds = await wait_until_indexed(client, collection_name)
+
+    search_params = collection_settings.search_params(profile)
+    # Ground truth: brute force over the original vectors, not the quantized ones
+    exact_params = models.SearchParams(
+        exact=True, quantization=models.QuantizationSearchParams(ignore=True)
+    )
+
+    latencies = []
+    recalls = []
+    for query in queries:
+        start = time.perf_counter()
+        found = await client.query_points(
+            collection_name=collection_name, query=query, search_params=search_params, limit=top_k
+        )
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        exact = await client.query_points(
+            collection_name=collection_name, query=query, search_params=exact_params, limit=top_k
+        )
+        expected = {point.id for point in exact.points}
+        recalls.append(len(expected & {point.id for point in found.points}) / max(len(expected), 1))
+
+    await client.delete_collection(collection_name)
+
+    return {
+        "profile": name,
+        "settings": profile,
+        "estimated_ram_mb": round(estimated_ram_mb(profile, num_vectors, dimension), 2),
+        "upload_seconds": round(upload_seconds, 3),
+        "index_seconds": round(index_seconds, 3),
+        "latency_ms": {
+            "p50": round(float(np.percentile(latencies, 50)), 3),
+            "p95": round(float(np.percentile(latencies, 95)), 3),
+        },
+        f"recall_at_{top_k}": round(float(np.mean(recalls)), 4),
+    }
+
+
+async def run(args) -> dict:
+    settings = get_settings()
+    client = AsyncQdrantClient(url=args.url or settings.QDRANT_URI, api_key=settings.QDRANT_API_KEY)
+
+    if args.synthetic:
+        vectors = synthetic_vectors(args.synthetic, args.dimension, seed=42)
+        queries = synthetic_vectors(args.queries, args.dimension, seed=7)
+    else:
+        provider = get_embedding_provider(settings)
+        vectors = await embed_all(provider, load_corpus(args.corpus, args.corpus_size))
+        query_texts = extraction_queries()
+        queries = await embed_all(provider, [query_texts[i % len(query_texts)] for i in range(args.queries)])
+
+    results = []
+    for name in args.profile:
+        results.append(await benchmark_profile(client, name, PROFILES[name], vectors, queries, args.top_k))
+
+    await client.close()
+    return {
+        "vectors": len(vectors),
+        "dimension": int(vectors.shape[1]),
+        "queries": len(queries),
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=None, help="Qdrant URL (default: QDRANT_URI)")
+    parser.add_argument("--profile", nargs="+", choices=list(PROFILES), default=list(PROFILES))
+    parser.add_argument("--corpus", default=None, help="Directory of processed tender files (default: synthetic text)")
+    parser.add_argument("--corpus-size", type=int, default=5000)
+    parser.add_argument("--synthetic", type=int, default=0, help="Use this many random vectors instead of embeddings")
+    parser.add_argument("--dimension", type=int, default=768, help="Dimension of the random vectors")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--output", default=None, help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    output = json.dumps(asyncio.run(run(args)), indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
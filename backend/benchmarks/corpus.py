@@ -0,0 +1,107 @@
+"""Corpus and query loading shared by the benchmarks."""
+
+import random
+from pathlib import Path
+from typing import List, Optional
+
+from app.services.data_extraction.queries import (
+    BASE_INFORMATION_QUERIES,
+    EXCLUSION_CRITERIA_QUERIES,
+)
+
+_SUBJECTS = [
+    "Der Auftragnehmer",
+    "Der Bieter",
+    "Die Bietergemeinschaft",
+    "Der Auftraggeber",
+    "Das eingesetzte Personal",
+    "Der Nachunternehmer",
+]
+_OBLIGATIONS = [
+    "muss einen Mindestumsatz von {amount} EUR in den letzten drei Geschäftsjahren nachweisen",
+    "hat bis zum {date} um 12:00 Uhr ein vollständiges Angebot einzureichen",
+    "ist an das Angebot bis zum {date} gebunden (Bindefrist)",
+    "legt eine Zertifizierung nach ISO 27001 oder gleichwertig vor",
+    "benennt mindestens {count} Referenzprojekte vergleichbarer Größe",
+    "gibt eine Eigenerklärung zu den Russland-Sanktionen gemäß Art. 5k der Verordnung (EU) 833/2014 ab",
+    "stellt Bieterfragen ausschließlich über die Vergabeplattform bis zum {date}",
+    "erbringt die Leistungen im Zeitraum vom {date} für eine Vertragslaufzeit von {count} Monaten",
+]
+_CONTEXTS = [
+    "Die Nachweise sind mit dem Teilnahmeantrag vorzulegen.",
+    "Fehlende Unterlagen können nachgefordert werden.",
+    "Die Wertung erfolgt gemäß der Bewertungsmatrix in Anlage 3.",
+    "Es gelten die Bestimmungen der VgV und der VOL/B.",
+    "Nebenangebote sind nicht zugelassen.",
+    "Die Kommunikation erfolgt ausschließlich in deutscher Sprache.",
+]
+
+
+def synthetic_corpus(size: int, seed: int = 42) -> List[str]:
+    """Generate tender-like German text chunks of varying length."""
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(size):
+        sentences = []
+        for _ in range(rng.randint(2, 12)):
+            obligation = rng.choice(_OBLIGATIONS).format(
+                amount=f"{rng.randint(1, 50) * 100_000:,}".replace(",", "."),
+                date=f"{rng.randint(1, 28):02d}.{rng.randint(1, 12):02d}.2025",
+                count=rng.randint(2, 48),
+            )
+            sentences.append(f"{rng.choice(_SUBJECTS)} {obligation}. {rng.choice(_CONTEXTS)}")
+        corpus.append(f"## Abschnitt {i + 1}\n\n" + " ".join(sentences))
+    return corpus
+
+
+def load_corpus(path: Optional[str], size: int, seed: int = 42) -> List[str]:
+    """
+    Load up to `size` chunks from a directory of processed (Markdown) tender files,
+    split on blank lines, or generate a synthetic corpus if no path is given.
+    """
+    if not path:
+        return synthetic_corpus(size, seed)
+
+    paragraphs: List[str] = []
+    for file in sorted(Path(path).rglob("*")):
+        if not file.is_file():
+            continue
+        text = file.read_text(encoding="utf-8", errors="ignore")
+        paragraphs.extend(p.strip() for p in text.split("\n\n") if len(p.strip()) > 50)
+
+    if not paragraphs:
+        raise ValueError(f"No text chunks found in {path}")
+
+    rng = random.Random(seed)
+    rng.shuffle(paragraphs)
+    return paragraphs[:size]
+
+
+def load_documents(path: Optional[str], count: int, sections: int = 200, seed: int = 42) -> List[str]:
+    """
+    Load up to `count` whole processed (Markdown) tender files, or generate
+    synthetic documents of `sections` sections each if no path is given.
+    """
+    if not path:
+        return [
+            "\n\n".join(synthetic_corpus(sections, seed + i)) for i in range(count)
+        ]
+
+    documents = [
+        file.read_text(encoding="utf-8", errors="ignore")
+        for file in sorted(Path(path).rglob("*"))
+        if file.is_file()
+    ]
+    documents = [document for document in documents if document.strip()]
+    if not documents:
+        raise ValueError(f"No documents found in {path}")
+    return documents[:count]
+
+
+def extraction_queries() -> List[str]:
+    """The queries the extraction pipeline actually sends, question plus keyword terms."""
+    queries = {**BASE_INFORMATION_QUERIES, **EXCLUSION_CRITERIA_QUERIES}
+    return [
+        f"{query.question} Relevante Keywords: {' '.join(query.terms)}"
+        for query in queries.values()
+    ]
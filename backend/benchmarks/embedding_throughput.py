@@ -0,0 +1,214 @@
+"""
+Embedding throughput benchmark.
+
+For every provider and batch size this reports texts/sec and tokens/sec for
+batch embedding, p50/p95 latency of single-query embedding and the peak RSS of
+the process. Each provider runs in its own process so peak RSS is not shared.
+
+Usage:
+    python -m benchmarks.embedding_throughput \\
+        --provider sentence_transformer:./models/all-MiniLM-L6-v2 \\
+        --provider onnx:./models/all-MiniLM-L6-v2 \\
+        --provider ollama:embeddinggemma \\
+        --batch-sizes 1 16 64 --output results.json
+
+Providers are given as NAME[:MODEL]; MODEL may be a local model directory,
+in which case Hugging Face Hub is kept offline. Without --provider the
+provider configured in config.yaml is benchmarked. Providers are built by the
+app's factory, so the rest of the embedding config (output_dimension, the
+provider's options) applies as in production.
+
+Tokens are counted with tiktoken's cl100k_base, which is downloaded on first
+use; offline, words are counted instead (see "token_counter" in the report).
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import time
+from queue import Empty
+from typing import List, Optional
+
+import numpy as np
+import tiktoken
+
+from benchmarks.corpus import extraction_queries, load_corpus
+
+RESULT_POLL_SECONDS = 5
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+    return peak / 1024**2 if sys.platform == "darwin" else peak / 1024
+
+
+def build_provider(name: Optional[str], model: Optional[str]):
+    """The provider as the app builds it (incl. output_dimension), with name and model overridden."""
+    from app.config.app_config import get_embedding_provider
+    from app.config.settings import get_settings
+
+    return get_embedding_provider(get_settings(), name, model)
+
+
+def token_counter():
+    """
+    Count tokens with cl100k_base, or words if tiktoken can't load it.
+
+    tiktoken downloads the encoding on first use; offline (and without a
+    TIKTOKEN_CACHE_DIR holding it) tokens/sec is reported as words/sec.
+
+    Returns:
+        The counter's name and a function counting the tokens of a list of texts
+    """
+    try:
+        encoding = tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        print(f"cl100k_base is unavailable ({e}), counting words instead", file=sys.stderr)
+        return "words", lambda texts: sum(len(text.split()) for text in texts)
+    return "cl100k_base", lambda texts: sum(len(tokens) for tokens in encoding.encode_batch(texts))
+
+
+async def benchmark_provider(
+    name: str,
+    model: Optional[str],
+    corpus: List[str],
+    batch_sizes: List[int],
+    latency_samples: int,
+) -> dict:
+    load_start = time.perf_counter()
+    provider = build_provider(name, model)
+    dimension = await provider.get_dimension()
+    load_seconds = time.perf_counter() - load_start
+
+    token_counter_name, count_tokens = token_counter()
+    corpus_tokens = count_tokens(corpus)
+
+    batches = []
+    for batch_size in batch_sizes:
+        start = time.perf_counter()
+        for i in range(0, len(corpus), batch_size):
+            await provider.embed_documents(corpus[i : i + batch_size])
+        elapsed = time.perf_counter() - start
+        batches.append(
+            {
+                "batch_size": batch_size,
+                "seconds": round(elapsed, 3),
+                "texts_per_second": round(len(corpus) / elapsed, 2),
+                "tokens_per_second": round(corpus_tokens / elapsed, 2),
+            }
+        )
+
+    queries = extraction_queries()
+    latencies = []
+    for i in range(latency_samples):
+        start = time.perf_counter()
+        await provider.embed_query(queries[i % len(queries)])
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    return {
+        "provider": name,
+        "model": model,
+        "dimension": dimension,
+        "token_counter": token_counter_name,
+        "load_seconds": round(load_seconds, 3),
+        "batches": batches,
+        "single_query_latency_ms": {
+            "p50": round(float(np.percentile(latencies, 50)), 3),
+            "p95": round(float(np.percentile(latencies, 95)), 3),
+        },
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def _run_in_child(queue, name, model, corpus, batch_sizes, latency_samples) -> None:
+    if model and os.path.isdir(model):
+        os.environ["HF_HUB_OFFLINE"] = "1"
+    try:
+        result = asyncio.run(
+            benchmark_provider(name, model, corpus, batch_sizes, latency_samples)
+        )
+    except Exception as e:
+        result = {"provider": name, "model": model, "error": str(e)}
+    queue.put(result)
+
+
+def wait_for_result(queue, process, name: str, model: Optional[str], timeout: float) -> dict:
+    """The child's result, or an error if it dies (OOM, import error) or exceeds timeout."""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return queue.get(timeout=RESULT_POLL_SECONDS)
+        except Empty:
+            pass
+
+        if not process.is_alive():
+            # The result may have been queued right before the process exited
+            try:
+                return queue.get(timeout=RESULT_POLL_SECONDS)
+            except Empty:
+                error = f"Benchmark process exited with code {process.exitcode}"
+                return {"provider": name, "model": model, "error": error}
+        if time.monotonic() > deadline:
+            process.terminate()
+            return {"provider": name, "model": model, "error": f"Timed out after {timeout:.0f}s"}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--provider", action="append", default=[], help="NAME[:MODEL], repeatable")
+    parser.add_argument("--corpus", default=None, help="Directory of processed tender files (default: synthetic)")
+    parser.add_argument("--corpus-size", type=int, default=1000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32, 64])
+    parser.add_argument("--latency-samples", type=int, default=100)
+    parser.add_argument("--timeout", type=float, default=3600, help="Seconds per provider before it is aborted")
+    parser.add_argument("--output", default=None, help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus, args.corpus_size)
+    providers = [
+        (entry.split(":", 1)[0], entry.split(":", 1)[1] if ":" in entry else None)
+        for entry in args.provider
+    ]
+    if not providers:
+        from app.config.app_config import _load_config
+
+        providers = [(_load_config().get("embedding", {}).get("provider"), None)]
+
+    context = multiprocessing.get_context("spawn")
+    results = []
+    for name, model in providers:
+        queue = context.Queue()
+        process = context.Process(
+            target=_run_in_child,
+            args=(queue, name, model, corpus, args.batch_sizes, args.latency_samples),
+        )
+        process.start()
+        results.append(wait_for_result(queue, process, name, model, args.timeout))
+        process.join()
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "host": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+        },
+        "corpus_size": len(corpus),
+        "results": results,
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
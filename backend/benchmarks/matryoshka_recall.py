@@ -0,0 +1,95 @@
+"""
+Recall-vs-dimension benchmark for Matryoshka truncation of embeddings.
+
+Embeds a corpus and the extraction queries once at full size, then measures
+how many of the full-size top-k neighbours each truncated dimension keeps.
+
+Usage:
+    python -m benchmarks.matryoshka_recall --dimensions 512 256 128 --top-k 15
+    python -m benchmarks.matryoshka_recall --corpus ./processed_markdown --corpus-size 5000
+"""
+
+import argparse
+import asyncio
+import json
+
+import numpy as np
+
+from app.config.app_config import get_embedding_provider
+from app.config.settings import get_settings
+from app.embedding.utils import truncate_embeddings
+from benchmarks.corpus import extraction_queries, load_corpus
+
+EMBED_BATCH_SIZE = 64
+
+
+def top_k_indices(corpus: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    scores = queries @ corpus.T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+async def embed_all(provider, texts, batch_size: int) -> np.ndarray:
+    batches = [
+        await provider.embed_documents(texts[i : i + batch_size])
+        for i in range(0, len(texts), batch_size)
+    ]
+    return np.concatenate(batches, axis=0)
+
+
+async def run(args) -> dict:
+    provider = get_embedding_provider(get_settings())
+    # Benchmark against the untruncated model output regardless of config
+    provider._output_dimension = None
+
+    corpus = load_corpus(args.corpus, args.corpus_size)
+    queries = extraction_queries()
+
+    corpus_vectors = await embed_all(provider, corpus, EMBED_BATCH_SIZE)
+    query_vectors = await embed_all(provider, queries, EMBED_BATCH_SIZE)
+    full_dimension = corpus_vectors.shape[1]
+    reference = top_k_indices(corpus_vectors, query_vectors, args.top_k)
+
+    results = []
+    for dimension in sorted({full_dimension, *args.dimensions}, reverse=True):
+        if dimension > full_dimension:
+            continue
+        if dimension == full_dimension:
+            truncated_corpus, truncated_queries = corpus_vectors, query_vectors
+        else:
+            truncated_corpus = truncate_embeddings(corpus_vectors, dimension)
+            truncated_queries = truncate_embeddings(query_vectors, dimension)
+
+        found = top_k_indices(truncated_corpus, truncated_queries, args.top_k)
+        recall = np.mean(
+            [len(set(a) & set(b)) / args.top_k for a, b in zip(reference, found)]
+        )
+        results.append(
+            {
+                "dimension": dimension,
+                f"recall_at_{args.top_k}": round(float(recall), 4),
+                "bytes_per_vector": dimension * 4,
+                "vector_memory_mb": round(dimension * 4 * len(corpus) / 1024**2, 2),
+            }
+        )
+
+    return {
+        "corpus_size": len(corpus),
+        "queries": len(queries),
+        "full_dimension": full_dimension,
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=None, help="Directory of processed tender files (default: synthetic)")
+    parser.add_argument("--corpus-size", type=int, default=2000)
+    parser.add_argument("--dimensions", type=int, nargs="+", default=[512, 256, 128])
+    parser.add_argument("--top-k", type=int, default=15)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Parity check and throughput comparison of the ONNX int8 backend against PyTorch.
+
+Usage:
+    python -m benchmarks.onnx_embedding --model all-MiniLM-L6-v2 --threads 4
+
+Exits with a non-zero status if the cosine similarity between the PyTorch and
+the ONNX embeddings of any sample text falls below --min-cosine.
+"""
+
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from app.embedding.provider.onnx import OnnxEmbeddingModel
+from app.embedding.provider.sentence_transformer import EmbeddingModel
+
+SAMPLE_TEXTS = [
+    "Die Angebotsfrist endet am 14.07.2025 um 12:00 Uhr.",
+    "Die Bindefrist des Angebots beträgt 60 Kalendertage ab Ablauf der Angebotsfrist.",
+    "Der Bieter muss einen Mindestumsatz von 2.500.000 EUR in den letzten drei Geschäftsjahren nachweisen.",
+    "Auftraggeber ist die Stadtverwaltung Musterstadt, Rathausplatz 1, 12345 Musterstadt.",
+    "Es ist eine Eigenerklärung zu den Russland-Sanktionen gemäß Art. 5k der Verordnung (EU) 833/2014 vorzulegen.",
+    "Der Vertrag läuft zunächst 24 Monate mit zweimaliger Verlängerungsoption um je 12 Monate.",
+    "Bieterfragen sind bis spätestens zehn Tage vor Ablauf der Angebotsfrist über die Vergabeplattform zu stellen.",
+    "Nachzuweisen sind mindestens drei Referenzprojekte vergleichbarer Größe aus den letzten fünf Jahren.",
+]
+
+
+def measure_throughput(encode, texts, batch_size: int, repeats: int) -> float:
+    encode(texts[:batch_size], batch_size=batch_size)  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeats):
+        encode(texts, batch_size=batch_size)
+    elapsed = time.perf_counter() - start
+    return len(texts) * repeats / elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--corpus-size", type=int, default=256)
+    parser.add_argument("--min-cosine", type=float, default=0.98)
+    parser.add_argument("--no-quantize", action="store_true")
+    args = parser.parse_args()
+
+    torch_model = EmbeddingModel(args.model)
+    onnx_model = OnnxEmbeddingModel(
+        args.model, quantize=not args.no_quantize, num_threads=args.threads
+    )
+
+    torch_embeddings = np.asarray(torch_model.encode(SAMPLE_TEXTS), dtype=np.float32)
+    onnx_embeddings = np.asarray(onnx_model.encode(SAMPLE_TEXTS), dtype=np.float32)
+    # Both are L2-normalized, so the row-wise dot product is the cosine similarity
+    cosines = np.sum(torch_embeddings * onnx_embeddings, axis=1)
+
+    corpus = [SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)] for i in range(args.corpus_size)]
+    report = {
+        "model": args.model,
+        "quantized": not args.no_quantize,
+        "threads": args.threads,
+        "batch_size": args.batch_size,
+        "parity": {
+            "min_cosine": round(float(cosines.min()), 6),
+            "mean_cosine": round(float(cosines.mean()), 6),
+            "threshold": args.min_cosine,
+            "passed": bool(cosines.min() >= args.min_cosine),
+        },
+        "texts_per_second": {
+            "torch": round(measure_throughput(torch_model.encode, corpus, args.batch_size, args.repeats), 2),
+            "onnx": round(measure_throughput(onnx_model.encode, corpus, args.batch_size, args.repeats), 2),
+        },
+    }
+    print(json.dumps(report, indent=2))
+
+    return 0 if report["parity"]["passed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""
+Token-aware splitter benchmark.
+
+Splits the same documents with LangChain's RecursiveCharacterTextSplitter
+(token length function, the splitter used before TokenTextSplitter) and with
+TokenTextSplitter, and reports the split time of both, the speedup and how
+many chunks the two produce identically. Both should agree; a difference
+means a piece tokenizes differently on its own than inside the document
+further than BOUNDARY_CHARS from its ends (e.g. long runs without spaces).
+
+Usage:
+    python -m benchmarks.splitter --corpus ./processed_markdown --chunk-size 1000 --chunk-overlap 100
+    python -m benchmarks.splitter --documents 20 --sections 500
+"""
+
+import argparse
+import json
+import time
+from typing import Callable, List
+
+import tiktoken
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from app.services.rag.splitter.recursiv_splitter import MARKDOWN_SEPARATORS, toke_length_function
+from app.services.rag.splitter.token_splitter import TokenTextSplitter
+from benchmarks.corpus import load_documents
+
+
+def timed_split(split: Callable[[str], List[str]], documents: List[str], repeats: int) -> tuple:
+    """Best wall time over `repeats` runs and the chunks of every document."""
+    best = float("inf")
+    chunks: List[List[str]] = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        chunks = [split(document) for document in documents]
+        best = min(best, time.perf_counter() - start)
+    return best, chunks
+
+
+def run(args) -> dict:
+    documents = load_documents(args.corpus, args.documents, args.sections)
+    # Load the encoding before timing, both splitters share tiktoken's cached instance
+    tiktoken.get_encoding("cl100k_base")
+
+    langchain_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=args.chunk_size,
+        chunk_overlap=args.chunk_overlap,
+        strip_whitespace=True,
+        separators=MARKDOWN_SEPARATORS,
+        length_function=toke_length_function,
+    )
+    token_splitter = TokenTextSplitter(
+        chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap, separators=MARKDOWN_SEPARATORS
+    )
+    token_splitter.split_text(documents[0][:1000])  # builds the token length table once
+
+    langchain_seconds, expected = timed_split(langchain_splitter.split_text, documents, args.repeats)
+    token_seconds, actual = timed_split(token_splitter.split_text, documents, args.repeats)
+
+    expected_count = sum(len(chunks) for chunks in expected)
+    identical = sum(len(set(e) & set(a)) for e, a in zip(expected, actual))
+    identical_documents = sum(e == a for e, a in zip(expected, actual))
+    return {
+        "documents": len(documents),
+        "characters": sum(len(document) for document in documents),
+        "chunk_size": args.chunk_size,
+        "chunk_overlap": args.chunk_overlap,
+        "langchain": {"seconds": round(langchain_seconds, 4), "chunks": expected_count},
+        "token_splitter": {
+            "seconds": round(token_seconds, 4),
+            "chunks": sum(len(chunks) for chunks in actual),
+            "max_chunk_tokens": max(
+                (toke_length_function(chunk) for chunks in actual for chunk in chunks), default=0
+            ),
+        },
+        "speedup": round(langchain_seconds / max(token_seconds, 1e-9), 2),
+        "identical_chunks": round(identical / max(expected_count, 1), 4),
+        "identical_documents": round(identical_documents / max(len(documents), 1), 4),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=None, help="Directory of processed tender files (default: synthetic text)")
+    parser.add_argument("--documents", type=int, default=10)
+    parser.add_argument("--sections", type=int, default=200, help="Sections per synthetic document")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--chunk-overlap", type=int, default=100)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--output", default=None, help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    output = json.dumps(run(args), indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+Move per-tender Qdrant collections into the shared multi-tenant collection.
+
+Every point is copied with its vector, gets the tender_id payload the shared
+layout filters on and is re-keyed to its deterministic chunk ID (legacy
+integer IDs would collide between tenders). The index manifest of the tender
+is rewritten to the new IDs. Source collections are only deleted with
+--delete-source, after the copied point count has been verified.
+
+Switch rag.storage.layout to "shared" in config.yaml once the migration is done.
+
+Usage:
+    python -m scripts.migrate_to_shared_collection --dry-run
+    python -m scripts.migrate_to_shared_collection --delete-source
+"""
+
+import argparse
+import asyncio
+import uuid
+from typing import List, Optional
+
+from qdrant_client import AsyncQdrantClient, models
+
+from app.config.app_config import get_embedding_provider
+from app.config.logger import logger
+from app.config.settings import get_settings
+from app.database.mongo import get_mongo_client
+from app.database.qdrant import get_async_qdrant_client
+from app.repos.index_manifest_repo import IndexManifestRepo
+from app.services.rag.rag_service import (
+    LEVEL_FIELD,
+    SCROLL_PAGE_SIZE,
+    SPARSE_VECTOR_NAME,
+    RagService,
+    chunk_point_id,
+)
+from app.services.rag.sparse.bm25_encoder import Bm25Encoder
+from app.services.rag.splitter.hierarchical_splitter import PARENT_LEVEL
+from app.services.rag.tender_collections import (
+    SHARED_LAYOUT,
+    TENDER_ID_FIELD,
+    TenderCollections,
+    get_tender_collections,
+)
+
+
+def parse_tender_id(collection_name: str) -> Optional[uuid.UUID]:
+    try:
+        return uuid.UUID(collection_name)
+    except ValueError:
+        return None
+
+
+def shared_point(
+    tender_id: uuid.UUID, point: models.Record, sparse_encoder: Optional[Bm25Encoder]
+) -> models.PointStruct:
+    payload = dict(point.payload or {})
+    payload[TENDER_ID_FIELD] = str(tender_id)
+    content = payload.get("content")
+    hierarchical = payload.get(LEVEL_FIELD) is not None
+    # Hierarchical points are already keyed deterministically and referenced by parent_id/child_ids
+    point_id = (
+        chunk_point_id(payload.get("file_id") or "", content)
+        if content and not hierarchical
+        else str(point.id)
+    )
+    vector = point.vector
+    searchable = payload.get(LEVEL_FIELD) != PARENT_LEVEL
+    if sparse_encoder and content and searchable and not isinstance(vector, dict):
+        # Dense-only source collection, add the BM25 vector the shared collection expects
+        vector = {"": vector, SPARSE_VECTOR_NAME: sparse_encoder.encode_document(content)}
+    return models.PointStruct(id=point_id, vector=vector, payload=payload)
+
+
+async def migrate_collection(
+    client: AsyncQdrantClient,
+    tender_id: uuid.UUID,
+    shared_collection: str,
+    manifest_repo: Optional[IndexManifestRepo],
+    delete_source: bool,
+    sparse_encoder: Optional[Bm25Encoder] = None,
+) -> int:
+    source = str(tender_id)
+    point_ids: List[str] = []
+    offset = None
+    while True:
+        points, offset = await client.scroll(
+            collection_name=source,
+            limit=SCROLL_PAGE_SIZE,
+            offset=offset,
+            with_payload=True,
+            with_vectors=True,
+        )
+        if points:
+            batch = [shared_point(tender_id, point, sparse_encoder) for point in points]
+            await client.upsert(collection_name=shared_collection, points=batch, wait=True)
+            point_ids.extend(str(point.id) for point in batch)
+        if offset is None:
+            break
+
+    # Chunks with identical content collapse into one point
+    point_ids = list(dict.fromkeys(point_ids))
+    copied = (
+        await client.count(
+            collection_name=shared_collection,
+            count_filter=TenderCollections(SHARED_LAYOUT, shared_collection).tender_filter(tender_id),
+            exact=True,
+        )
+    ).count
+    if copied < len(point_ids):
+        raise RuntimeError(
+            f"Only {copied} of {len(point_ids)} points of {source} arrived in {shared_collection}"
+        )
+
+    if manifest_repo:
+        manifest_repo.save_point_ids(tender_id, point_ids)
+
+    if delete_source:
+        collection_names = [collection.name for collection in (await client.get_collections()).collections]
+        generations = TenderCollections.generations(tender_id, collection_names)
+        if generations:
+            # Blue/green indexed tender: the source is an alias of its live generation
+            await client.update_collection_aliases(
+                change_aliases_operations=[
+                    models.DeleteAliasOperation(delete_alias=models.DeleteAlias(alias_name=source))
+                ]
+            )
+            for collection_name in generations:
+                await client.delete_collection(collection_name)
+        else:
+            await client.delete_collection(source)
+
+    logger.info(f"Migrated {len(point_ids)} points of tender {tender_id}")
+    return len(point_ids)
+
+
+async def run(args) -> None:
+    settings = get_settings()
+    client = get_async_qdrant_client()
+    collections = TenderCollections(SHARED_LAYOUT, args.collection)
+
+    # Blue/green indexed tenders are reached through their alias
+    names = [collection.name for collection in (await client.get_collections()).collections]
+    names += [alias.alias_name for alias in (await client.get_aliases()).aliases]
+    tender_ids = [tender_id for name in names if (tender_id := parse_tender_id(name))]
+    logger.info(f"Found {len(tender_ids)} per-tender collections")
+
+    if args.dry_run:
+        for tender_id in tender_ids:
+            count = (await client.count(collection_name=str(tender_id), exact=True)).count
+            print(f"{tender_id}: {count} points")
+        return
+
+    # Creates the shared collection with its tenant index and checks the vector size
+    rag_service = RagService(
+        settings, get_embedding_provider(settings), client, collections=collections
+    )
+    await rag_service.create_collection(collections.shared_collection)
+
+    manifest_repo = None if args.skip_manifests else IndexManifestRepo(get_mongo_client())
+
+    failed = []
+    for tender_id in tender_ids:
+        try:
+            await migrate_collection(
+                client,
+                tender_id,
+                collections.shared_collection,
+                manifest_repo,
+                args.delete_source,
+                rag_service.sparse_encoder,
+            )
+        except Exception as e:
+            logger.error(f"Failed to migrate tender {tender_id}: {e}")
+            failed.append(tender_id)
+
+    logger.info(f"Migrated {len(tender_ids) - len(failed)} of {len(tender_ids)} tenders")
+    if failed:
+        raise SystemExit(1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--collection",
+        default=get_tender_collections().shared_collection,
+        help="Shared collection to migrate into (default: rag.storage.shared_collection)",
+    )
+    parser.add_argument("--delete-source", action="store_true", help="Delete each per-tender collection once copied")
+    parser.add_argument("--skip-manifests", action="store_true", help="Don't rewrite the index manifests in MongoDB")
+    parser.add_argument("--dry-run", action="store_true", help="Only list the collections that would be migrated")
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
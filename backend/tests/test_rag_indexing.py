@@ -0,0 +1,74 @@
+"""Run from backend/ with: python -m unittest discover tests"""
+
+import asyncio
+import threading
+import unittest
+import uuid
+from typing import List
+
+import numpy as np
+from langchain_core.documents import Document
+
+from app.embedding.provider.base_embedding import BaseEmbedding
+from app.services.rag.rag_service import RagService
+from app.services.rag.tender_collections import TenderCollections
+
+BATCH_SIZE = 2
+# Upper bound for the second batch to wait on the first upsert, reached only if they don't overlap
+OVERLAP_TIMEOUT_SECONDS = 5
+
+
+class UpsertGatedEmbedding(BaseEmbedding):
+    """Embeds the second batch only once the first batch's upsert has completed."""
+
+    def __init__(self, first_upsert_done: threading.Event):
+        super().__init__(settings=None, model_name="test")
+        self.first_upsert_done = first_upsert_done
+        self.batches = 0
+        self.overlapped = False
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        self.batches += 1
+        if self.batches == 2:
+            # Blocks the provider's thread, the event loop has to send the upsert meanwhile
+            self.overlapped = self.first_upsert_done.wait(OVERLAP_TIMEOUT_SECONDS)
+        return np.ones((len(texts), 4), dtype=np.float32)
+
+    async def _embed_documents(self, texts: List[str]) -> np.ndarray:
+        return await self._run_model(self._encode, texts)
+
+
+class RecordingClient:
+    """Stands in for AsyncQdrantClient, upserts take a network round trip."""
+
+    def __init__(self, first_upsert_done: threading.Event):
+        self.first_upsert_done = first_upsert_done
+        self.upserted: List[str] = []
+
+    async def upsert(self, collection_name: str, points, wait: bool) -> None:
+        await asyncio.sleep(0.01)
+        self.upserted.extend(points.ids)
+        self.first_upsert_done.set()
+
+
+class UpsertChunksTest(unittest.IsolatedAsyncioTestCase):
+    async def test_upsert_runs_while_next_batch_is_embedded(self):
+        first_upsert_done = threading.Event()
+        embedding = UpsertGatedEmbedding(first_upsert_done)
+        client = RecordingClient(first_upsert_done)
+        rag_service = RagService(None, embedding, client=client, collections=TenderCollections())
+        rag_service.indexing_config = {"batch_size": BATCH_SIZE, "parallelism": 2}
+
+        chunks = [Document(page_content=f"chunk {i}", metadata={"file_id": "f"}) for i in range(3 * BATCH_SIZE)]
+        point_ids = [str(uuid.uuid4()) for _ in chunks]
+        vectors = await rag_service._upsert_chunks(
+            "collection", uuid.uuid4(), point_ids, chunks, with_sparse=False
+        )
+
+        self.assertTrue(embedding.overlapped)
+        self.assertEqual(sorted(client.upserted), sorted(point_ids))
+        self.assertEqual(vectors.shape, (len(chunks), 4))
+
+
+if __name__ == "__main__":
+    unittest.main()